@@ -0,0 +1,91 @@
+""" Compares bytes on disk and query latency of cold readings as plain csv, gzipped csv and block-compressed archives
+
+The readings are one second apart. Each layout is timed on opening the file and querying
+one hour of readings (cold), the same query again (warm) and fetching random readings by
+sequence number. The csv files are loaded whole by the csv reading manager, the gzipped one
+after decompressing it; the archives only decompress the blocks a query can match, so
+smaller blocks trade bytes for latency.
+
+Usage: python -m benchmarks.benchmark_archive_storage [size]
+(defaults to 500k readings)
+"""
+from managers.temperature_reading_manager import TemperatureReadingManager
+from managers.reading_archive import ReadingArchive
+from readings.temperature_reading import TemperatureReading
+from benchmarks.benchmark_data import TEMP_START, write_temperature_csv, temp_csv_path
+import datetime
+import gzip
+import os
+import random
+import shutil
+import sys
+import time
+
+DEFAULT_SIZE = 500000
+BLOCK_ROWS = (1024, 4096, 16384)
+LOOKUPS = 100
+
+def time_call(function, *args):
+    """ Returns the seconds taken by a call and its result """
+
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+def open_gzip_csv(gzip_filename, csv_filename):
+    """ Returns a csv reading manager on a gzipped csv file, decompressed to csv_filename first """
+
+    with gzip.open(gzip_filename, "rb") as gzip_file, open(csv_filename, "wb") as csv_file:
+        shutil.copyfileobj(gzip_file, csv_file)
+
+    return TemperatureReadingManager(csv_filename)
+
+def run(open_file, size):
+    """ Returns the timings of every query against a freshly opened file """
+
+    start = TEMP_START + datetime.timedelta(seconds=size // 2)
+    end = start + datetime.timedelta(hours=1)
+    seq_nums = random.sample(range(1, size + 1), LOOKUPS)
+
+    open_seconds, readings = time_call(open_file)
+    query_seconds, matched = time_call(readings.get_readings_between, start, end)
+    timings = {"open + query": open_seconds + query_seconds,
+               "query": time_call(readings.get_readings_between, start, end)[0],
+               "%d lookups" % LOOKUPS: time_call(lambda: [readings.get_reading(seq_num) for seq_num in seq_nums])[0]}
+    return timings, len(matched)
+
+def main(size):
+    """ Runs the benchmark and prints the results """
+
+    csv_filename = temp_csv_path("benchmark_archive_storage.csv")
+    gzip_filename = csv_filename + ".gz"
+    gunzipped_filename = temp_csv_path("benchmark_archive_storage_gunzipped.csv")
+    write_temperature_csv(csv_filename, size)
+    with open(csv_filename, "rb") as csv_file, gzip.open(gzip_filename, "wb") as gzip_file:
+        shutil.copyfileobj(csv_file, gzip_file)
+
+    layouts = [("csv", csv_filename, lambda: TemperatureReadingManager(csv_filename)),
+               ("gzip csv", gzip_filename, lambda: open_gzip_csv(gzip_filename, gunzipped_filename))]
+    readings = TemperatureReadingManager(csv_filename).get_all_readings()
+    codecs = [ReadingArchive.GZIP_CODEC] + ([ReadingArchive.ZSTD_CODEC] if ReadingArchive.get_default_codec() == ReadingArchive.ZSTD_CODEC else [])
+    for codec in codecs:
+        for block_rows in BLOCK_ROWS:
+            filename = temp_csv_path("benchmark_archive_storage_%s_%d.arc" % (codec, block_rows))
+            ReadingArchive(filename, TemperatureReading).write_readings(readings, codec, block_rows)
+            layouts.append(("%s archive %d" % (codec, block_rows), filename,
+                            lambda filename=filename: ReadingArchive(filename, TemperatureReading)))
+
+    random.seed(1)
+    print("%d readings, one per second, one hour queried" % size)
+    for name, filename, open_file in layouts:
+        timings, count = run(open_file, size)
+        print("  %-20s %7.2f MB  %s  (%d matched)" % (name, os.path.getsize(filename) / 1e6,
+              "  ".join("%s %7.4f s" % (operation, seconds) for operation, seconds in timings.items()), count))
+
+    for path in [gunzipped_filename, gunzipped_filename + ".seq"] + [path for name, filename, open_file in layouts
+                                                                      for path in (filename, filename + ".seq")]:
+        if os.path.exists(path):
+            os.remove(path)
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_SIZE)
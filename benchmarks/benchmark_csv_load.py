@@ -0,0 +1,51 @@
+""" Compares strptime and the fixed-format timestamp parsers, and times a full csv load
+
+Usage: python -m benchmarks.benchmark_csv_load [size]
+(defaults to 500k readings per file)
+"""
+from managers.temperature_reading_manager import TemperatureReadingManager
+from managers.pressure_reading_manager import PressureReadingManager
+from managers.timestamp_parser import TimestampParser
+from benchmarks.benchmark_data import write_temperature_csv, write_pressure_csv, temp_csv_path
+import csv
+import datetime
+import os
+import sys
+import time
+
+DEFAULT_SIZE = 500000
+
+def time_parse(parse, values):
+    """ Returns the seconds taken to parse every value """
+
+    start = time.perf_counter()
+    for value in values:
+        parse(value)
+    return time.perf_counter() - start
+
+def main(size):
+    """ Runs the benchmark and prints the results """
+
+    for manager_class, write_csv, use_cache in ((TemperatureReadingManager, write_temperature_csv, False),
+                                                (PressureReadingManager, write_pressure_csv, True)):
+        filename = temp_csv_path("benchmark_csv_load.csv")
+        write_csv(filename, size)
+        with open(filename) as f:
+            values = [row[manager_class.TIMESTAMP_INDEX] for row in csv.reader(f)]
+
+        timestamp_format = manager_class.TIMESTAMP_PARSER.get_format()
+        strptime_time = time_parse(lambda value: datetime.datetime.strptime(value, timestamp_format), values)
+        parser_time = time_parse(TimestampParser(timestamp_format, use_cache).parse, values)
+
+        start = time.perf_counter()
+        manager_class(filename)
+        load_time = time.perf_counter() - start
+
+        print("%s, %d rows" % (manager_class.__name__, size))
+        print("  strptime:          %8.3f s" % strptime_time)
+        print("  TimestampParser:   %8.3f s (%.1fx)" % (parser_time, strptime_time / parser_time))
+        print("  full manager load: %8.3f s" % load_time)
+        os.remove(filename)
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_SIZE)
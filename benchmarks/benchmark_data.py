@@ -0,0 +1,29 @@
+import datetime
+import os
+import tempfile
+
+TEMP_START = datetime.datetime(2018, 9, 23, 19, 56, 1, 345000)
+PRES_START = datetime.datetime(2018, 9, 23, 19, 56)
+
+def write_temperature_csv(filename, count):
+    """ Writes count synthetic temperature readings, one per second, to a csv file """
+
+    with open(filename, "w") as f:
+        for i in range(count):
+            timestamp = TEMP_START + datetime.timedelta(seconds=i)
+            status = "OK" if i % 100 else "HIGH_TEMP"
+            f.write("%s,%d,ABC Sensor Temp M301A,20.152,21.367,22.005,%s\n" % (timestamp, i + 1, status))
+
+def write_pressure_csv(filename, count):
+    """ Writes count synthetic pressure readings, four per minute, to a csv file """
+
+    with open(filename, "w") as f:
+        for i in range(count):
+            timestamp = (PRES_START + datetime.timedelta(minutes=i // 4)).strftime("%Y-%m-%d %H:%M")
+            status = "GOOD" if i % 100 else "LOW_PRESSURE"
+            f.write("%s,ABC Sensor Pres M10%d,%d,50.163,51.435,52.103,%s\n" % (timestamp, i % 4, i + 1, status))
+
+def temp_csv_path(name):
+    """ Returns a path for a benchmark data file in the system temp directory """
+
+    return os.path.join(tempfile.gettempdir(), name)
@@ -0,0 +1,58 @@
+""" Compares ingest throughput and latency of single appends and group commit, with and without fsync
+
+Usage: python -m benchmarks.benchmark_group_commit [threads] [readings per thread]
+(defaults to 64 threads adding 50 readings each)
+"""
+from managers.temperature_reading_manager import TemperatureReadingManager
+from readings.temperature_reading import TemperatureReading
+from benchmarks.benchmark_data import TEMP_START, temp_csv_path
+import os
+import sys
+import threading
+import time
+
+DEFAULT_THREADS = 64
+DEFAULT_READINGS = 50
+CONFIGURATIONS = (("single appends", {}),
+                  ("group commit 2 ms", {"commit_delay": 2}),
+                  ("single appends + fsync", {"use_fsync": True}),
+                  ("group commit 2 ms + fsync", {"commit_delay": 2, "use_fsync": True}),
+                  ("group commit 10 ms + fsync", {"commit_delay": 10, "use_fsync": True}))
+
+def add_readings(reading_manager, count, latencies):
+    """ Thread worker - adds readings one at a time and records how long each call took """
+
+    for i in range(count):
+        reading = TemperatureReading.from_trusted_values(TEMP_START, 0, "ABC Sensor Temp M301A", 20.152, 21.367, 22.005, "OK")
+        start = time.perf_counter()
+        reading_manager.add_reading(reading)
+        latencies.append(time.perf_counter() - start)
+
+def main(thread_count, count):
+    """ Runs the benchmark and prints the results """
+
+    filename = temp_csv_path("benchmark_group_commit.csv")
+    print("%d threads adding %d readings each" % (thread_count, count))
+    for name, options in CONFIGURATIONS:
+        open(filename, "w").close()
+        reading_manager = TemperatureReadingManager(filename, **options)
+        latencies = []
+        threads = [threading.Thread(target=add_readings, args=(reading_manager, count, latencies)) for i in range(thread_count)]
+
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        latencies.sort()
+        print("  %-28s %8.0f readings/s, latency p50 %6.2f ms, p99 %6.2f ms" %
+              (name, thread_count * count / elapsed, latencies[len(latencies) // 2] * 1000,
+               latencies[len(latencies) * 99 // 100] * 1000))
+
+    os.remove(filename)
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_THREADS,
+         int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_READINGS)
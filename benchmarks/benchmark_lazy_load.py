@@ -0,0 +1,44 @@
+""" Times manager startup and a few lookups with the object store and the lazy memory-mapped store
+
+Usage: python -m benchmarks.benchmark_lazy_load [size]
+(defaults to 1M readings)
+"""
+from managers.temperature_reading_manager import TemperatureReadingManager
+from managers.reading_stores import LazyReadingStore
+from benchmarks.benchmark_data import write_temperature_csv, temp_csv_path
+import os
+import sys
+import time
+
+DEFAULT_SIZE = 1000000
+LOOKUPS = 1000
+
+def time_manager(filename, size, store):
+    """ Returns the seconds taken to start a manager and to look up readings by sequence number """
+
+    start = time.perf_counter()
+    reading_manager = TemperatureReadingManager(filename, store=store)
+    start_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for seq_num in range(1, size + 1, max(1, size // LOOKUPS)):
+        reading_manager.get_reading(seq_num)
+    return start_time, time.perf_counter() - start
+
+def main(size):
+    """ Runs the benchmark and prints the results """
+
+    filename = temp_csv_path("benchmark_lazy_load.csv")
+    index_filename = filename + LazyReadingStore.INDEX_FILE_SUFFIX
+    write_temperature_csv(filename, size)
+
+    print("TemperatureReadingManager, %d rows" % size)
+    for label, store in (("objects", "objects"), ("lazy, building index", "lazy"), ("lazy, sidecar index", "lazy")):
+        start_time, lookup_time = time_manager(filename, size, store)
+        print("  %-22s start %8.3f s, %d lookups %7.3f s" % (label, start_time, LOOKUPS, lookup_time))
+
+    os.remove(filename)
+    os.remove(index_filename)
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_SIZE)
@@ -0,0 +1,36 @@
+""" Times a full csv load parsed in-process and in 2, 4 and 8 worker processes
+
+Usage: python -m benchmarks.benchmark_parallel_load [size]
+(defaults to 1M readings per file)
+"""
+from managers.temperature_reading_manager import TemperatureReadingManager
+from managers.pressure_reading_manager import PressureReadingManager
+from benchmarks.benchmark_data import write_temperature_csv, write_pressure_csv, temp_csv_path
+import os
+import sys
+import time
+
+DEFAULT_SIZE = 1000000
+WORKER_COUNTS = (1, 2, 4, 8)
+
+def main(size):
+    """ Runs the benchmark and prints the results """
+
+    print("%d cores available" % os.cpu_count())
+    for manager_class, write_csv in ((TemperatureReadingManager, write_temperature_csv),
+                                     (PressureReadingManager, write_pressure_csv)):
+        filename = temp_csv_path("benchmark_parallel_load.csv")
+        write_csv(filename, size)
+
+        print("%s, %d rows" % (manager_class.__name__, size))
+        serial_time = None
+        for load_workers in WORKER_COUNTS:
+            start = time.perf_counter()
+            manager_class(filename, load_workers=load_workers)
+            load_time = time.perf_counter() - start
+            serial_time = serial_time or load_time
+            print("  %d worker(s): %8.3f s (%.2fx)" % (load_workers, load_time, serial_time / load_time))
+        os.remove(filename)
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_SIZE)
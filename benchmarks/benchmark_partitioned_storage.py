@@ -0,0 +1,84 @@
+""" Compares one csv file per sensor type with a partition per sensor model and day
+
+Readings of several models are spread over several days. Each layout is timed on a
+restart followed by a query for one model's readings on one day, the query alone, and
+updates without the journal, which rewrite the whole file or only the reading's partition.
+
+Usage: python -m benchmarks.benchmark_partitioned_storage [size] [models]
+(defaults to 200k readings of 10 models)
+"""
+from managers.temperature_reading_manager import TemperatureReadingManager
+from managers.partitioned_reading_manager import PartitionedReadingManager
+from readings.temperature_reading import TemperatureReading
+from benchmarks.benchmark_data import TEMP_START, temp_csv_path
+import datetime
+import os
+import random
+import shutil
+import sys
+import time
+
+DEFAULT_SIZE = 200000
+DEFAULT_MODELS = 10
+UPDATES = 20
+# Ten days of readings whatever the size
+DAYS = 10
+
+def create_readings(count, models):
+    """ Returns count temperature readings spread evenly over DAYS days, the model cycling per reading """
+
+    step = datetime.timedelta(days=DAYS) / count
+    return [TemperatureReading.from_trusted_values(TEMP_START + step * i, 0, "ABC Sensor Temp M%03d" % (i % models),
+                                                   20.152, 21.367, 22.005, "OK" if i % 100 else "HIGH_TEMP")
+            for i in range(count)]
+
+def time_call(function, *args):
+    """ Returns the seconds taken by a call and its result """
+
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+def run(create_manager, size, models):
+    """ Returns the timings of every operation against a manager holding no readings """
+
+    create_manager().add_readings(create_readings(size, models))
+    start = TEMP_START + datetime.timedelta(days=DAYS // 2)
+    end = start + datetime.timedelta(hours=23)
+    model = "ABC Sensor Temp M%03d" % (models // 2)
+
+    timings = {}
+    seconds, reading_manager = time_call(create_manager)
+    query_seconds, readings = time_call(reading_manager.get_readings_between, start, end, model)
+    timings["restart + query"] = seconds + query_seconds
+    timings["query"] = time_call(reading_manager.get_readings_between, start, end, model)[0]
+
+    updates = random.sample(readings, min(UPDATES, len(readings)))
+    timings["%d updates" % len(updates)] = time_call(lambda: [reading_manager.update_reading(r) for r in updates])[0]
+    return timings, len(readings)
+
+def main(size, models):
+    """ Runs the benchmark and prints the results """
+
+    csv_filename = temp_csv_path("benchmark_partitioned_storage.csv")
+    directory = temp_csv_path("benchmark_partitioned_storage")
+    open(csv_filename, "w").close()
+    layouts = (("single csv", lambda: TemperatureReadingManager(csv_filename)),
+               ("partitioned", lambda: PartitionedReadingManager(directory, TemperatureReadingManager, partition_period="day")))
+
+    random.seed(1)
+    print("%d readings of %d models over %d days" % (size, models, DAYS))
+    for name, create_manager in layouts:
+        timings, count = run(create_manager, size, models)
+        print("  %s (%d readings matched)" % (name, count))
+        for operation, seconds in timings.items():
+            print("    %-16s %8.3f s" % (operation, seconds))
+
+    for filename in (csv_filename, csv_filename + ".seq"):
+        if os.path.exists(filename):
+            os.remove(filename)
+    shutil.rmtree(directory, ignore_errors=True)
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_SIZE,
+         int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_MODELS)
@@ -0,0 +1,50 @@
+""" Compares validated and trusted reading construction, and full csv load time
+
+Usage: python -m benchmarks.benchmark_reading_construction [size]
+(defaults to 200k readings)
+"""
+from managers.temperature_reading_manager import TemperatureReadingManager
+from readings.temperature_reading import TemperatureReading
+from benchmarks.benchmark_data import write_temperature_csv, temp_csv_path
+import datetime
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+DEFAULT_SIZE = 200000
+TIMESTAMP = datetime.datetime(2018, 9, 23, 19, 56, 1, 345000)
+
+def build(create, size):
+    """ Returns the readings built with create, the elapsed time and the bytes and gc objects they hold """
+
+    gc.collect()
+    objects_before = len(gc.get_objects())
+    tracemalloc.start()
+    start = time.perf_counter()
+    readings = [create(TIMESTAMP, i, "ABC Sensor Temp M301A", 20.152, 21.367, 22.005, "OK") for i in range(size)]
+    elapsed = time.perf_counter() - start
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    objects = len(gc.get_objects()) - objects_before
+    return readings, elapsed, held, objects
+
+def main(size):
+    """ Runs the benchmark and prints the results """
+
+    print("%12s %12s %14s %14s" % ("construction", "time (s)", "bytes/reading", "gc objs/reading"))
+    for name, create in (("validated", TemperatureReading), ("trusted", TemperatureReading.from_trusted_values)):
+        readings, elapsed, held, objects = build(create, size)
+        print("%12s %12.3f %14.1f %14.2f" % (name, elapsed, held / size, objects / size))
+        del readings
+
+    filename = temp_csv_path("benchmark_reading_construction.csv")
+    write_temperature_csv(filename, size)
+    start = time.perf_counter()
+    TemperatureReadingManager(filename)
+    print("\ncsv load of %d readings: %.3f s" % (size, time.perf_counter() - start))
+    os.remove(filename)
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_SIZE)
@@ -0,0 +1,43 @@
+""" Compares the memory held by the object and columnar reading stores
+
+Usage: python -m benchmarks.benchmark_reading_store [size ...]
+(defaults to 10k, 100k and 1M pressure readings)
+"""
+from managers.pressure_reading_manager import PressureReadingManager
+from benchmarks.benchmark_data import write_pressure_csv, temp_csv_path
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+DEFAULT_SIZES = [10000, 100000, 1000000]
+
+def measure(filename, store):
+    """ Returns the bytes held after loading the file and the load time in seconds """
+
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    manager = PressureReadingManager(filename, store=store)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del manager
+    return held, peak, elapsed
+
+def main(sizes):
+    """ Runs the benchmark for each size and prints bytes per reading for both stores """
+
+    filename = temp_csv_path("benchmark_reading_store.csv")
+    print("%10s %10s %14s %14s %10s" % ("readings", "store", "held B/read", "peak B/read", "load (s)"))
+    for size in sizes:
+        write_pressure_csv(filename, size)
+        for store in (PressureReadingManager.OBJECT_STORE, PressureReadingManager.COLUMNAR_STORE):
+            held, peak, elapsed = measure(filename, store)
+            print("%10d %10s %14.1f %14.1f %10.2f" % (size, store, held / size, peak / size, elapsed))
+    os.remove(filename)
+
+if __name__ == "__main__":
+    main([int(size) for size in sys.argv[1:]] or DEFAULT_SIZES)
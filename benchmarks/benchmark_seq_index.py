@@ -0,0 +1,34 @@
+""" Measures get_reading latency against the number of loaded readings
+
+Usage: python -m benchmarks.benchmark_seq_index [size ...]
+(defaults to 1k, 10k, 100k and 1M readings; pass 10000000 for the 10M case)
+"""
+from managers.temperature_reading_manager import TemperatureReadingManager
+from benchmarks.benchmark_data import write_temperature_csv, temp_csv_path
+import os
+import random
+import sys
+import timeit
+
+DEFAULT_SIZES = [1000, 10000, 100000, 1000000]
+LOOKUPS = 10000
+
+def main(sizes):
+    """ Runs the benchmark for each size and prints the mean lookup latency """
+
+    filename = temp_csv_path("benchmark_seq_index.csv")
+    print("%12s %16s %16s" % ("readings", "get_reading (ns)", "miss (ns)"))
+    for size in sizes:
+        write_temperature_csv(filename, size)
+        manager = TemperatureReadingManager(filename)
+        seq_nums = [random.randint(1, size) for _ in range(LOOKUPS)]
+
+        hit_time = timeit.timeit(lambda: [manager.get_reading(s) for s in seq_nums], number=1)
+        miss_time = timeit.timeit(lambda: [manager.get_reading(-s) for s in seq_nums], number=1)
+        print("%12d %16.0f %16.0f" % (size, hit_time / LOOKUPS * 1e9, miss_time / LOOKUPS * 1e9))
+
+        del manager
+    os.remove(filename)
+
+if __name__ == "__main__":
+    main([int(size) for size in sys.argv[1:]] or DEFAULT_SIZES)
@@ -0,0 +1,77 @@
+""" Compares the JSON encoding of readings before and after the ReadingSerializer
+
+The old path built a dict of strings per reading and encoded it with json.dumps, pretty-printed
+for single readings. The serializer fills a precompiled template with the standard library, or
+hands orjson dicts in a fixed key order when it is installed, with string or numeric values.
+Each encoder is timed on single readings and on one list of every reading.
+
+Usage: python -m benchmarks.benchmark_serialization [size]
+(defaults to 100k readings)
+"""
+from readings.temperature_reading import TemperatureReading
+from readings.reading_serializer import ReadingSerializer, orjson
+from benchmarks.benchmark_data import TEMP_START
+import datetime
+import json
+import sys
+import time
+
+DEFAULT_SIZE = 100000
+
+def reading_to_dict(reading):
+    """ The old list encoding - a dict of stringified values per reading """
+
+    return {
+        "timestamp": str(reading.get_timestamp()),
+        "sequencenum": str(reading.get_sequence_num()),
+        "sensormodel": reading.get_sensor_model(),
+        "min": str(reading.get_min_value()),
+        "avg": str(reading.get_avg_value()),
+        "max": str(reading.get_max_value()),
+        "status": reading.get_status()
+    }
+
+def old_dumps(reading):
+    """ The old single reading encoding - pretty-printed json.dumps """
+
+    return json.dumps(reading_to_dict(reading), indent=4)
+
+def old_dumps_list(readings):
+    """ The old list encoding """
+
+    return json.dumps([reading_to_dict(reading) for reading in readings])
+
+def time_encoder(dumps, dumps_list, readings):
+    """ Returns the seconds taken to encode every reading on its own, as one list, and the list size """
+
+    start = time.perf_counter()
+    for reading in readings:
+        dumps(reading)
+    single_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    data = dumps_list(readings)
+    return single_seconds, time.perf_counter() - start, len(data)
+
+def main(size):
+    """ Runs the benchmark and prints the results """
+
+    readings = [TemperatureReading.from_trusted_values(TEMP_START + datetime.timedelta(seconds=i), i + 1, "ABC Sensor Temp M301A",
+                                                       20.152, 21.367, 22.005, "OK" if i % 100 else "HIGH_TEMP")
+                for i in range(size)]
+
+    encoders = [("json.dumps dicts", old_dumps, old_dumps_list)]
+    for use_orjson in ([False, True] if orjson is not None else [False]):
+        for numeric in (False, True):
+            serializer = ReadingSerializer(ReadingSerializer.LIST_FIELDS, numeric, use_orjson)
+            name = "%s %s" % ("orjson" if use_orjson else "template", "numeric" if numeric else "strings")
+            encoders.append((name, serializer.dumps, serializer.dumps_list))
+
+    print("%d readings" % size)
+    for name, dumps, dumps_list in encoders:
+        single_seconds, list_seconds, list_size = time_encoder(dumps, dumps_list, readings)
+        print("  %-18s single %6.2f us/reading   list %6.2f us/reading, %6.1f MB" %
+              (name, single_seconds / size * 1e6, list_seconds / size * 1e6, list_size / 1e6))
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_SIZE)
@@ -0,0 +1,49 @@
+""" Times manager startup from the csv file, from a fresh snapshot and from a snapshot plus appended rows
+
+Usage: python -m benchmarks.benchmark_snapshot_load [size]
+(defaults to 1M readings per file)
+"""
+from managers.temperature_reading_manager import TemperatureReadingManager
+from managers.pressure_reading_manager import PressureReadingManager
+from managers.reading_snapshot import ReadingSnapshot
+from benchmarks.benchmark_data import write_temperature_csv, write_pressure_csv, temp_csv_path
+import os
+import sys
+import time
+
+DEFAULT_SIZE = 1000000
+APPENDED = 1000
+
+def time_start(manager_class, filename):
+    """ Returns the seconds taken to start a manager using the snapshot, and the manager """
+
+    start = time.perf_counter()
+    reading_manager = manager_class(filename, use_snapshot=True)
+    return time.perf_counter() - start, reading_manager
+
+def main(size):
+    """ Runs the benchmark and prints the results """
+
+    for manager_class, write_csv in ((TemperatureReadingManager, write_temperature_csv),
+                                     (PressureReadingManager, write_pressure_csv)):
+        filename = temp_csv_path("benchmark_snapshot_load.csv")
+        write_csv(filename, size)
+
+        full_time, reading_manager = time_start(manager_class, filename)
+        snapshot_time, reading_manager = time_start(manager_class, filename)
+        reading = reading_manager.get_reading(1)
+        reading_manager.add_readings([reading.from_trusted_values(reading.get_timestamp(), 0, reading.get_sensor_model(),
+                                                                  reading.get_min_value(), reading.get_avg_value(),
+                                                                  reading.get_max_value(), reading.get_status())
+                                      for i in range(APPENDED)])
+        appended_time, reading_manager = time_start(manager_class, filename)
+
+        print("%s, %d rows" % (manager_class.__name__, size))
+        print("  csv parse and snapshot write: %8.3f s" % full_time)
+        print("  snapshot:                     %8.3f s (%.1fx)" % (snapshot_time, full_time / snapshot_time))
+        print("  snapshot + %d appended:     %8.3f s" % (APPENDED, appended_time))
+        os.remove(filename)
+        os.remove(filename + ReadingSnapshot.FILE_SUFFIX)
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_SIZE)
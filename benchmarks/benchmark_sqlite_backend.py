@@ -0,0 +1,77 @@
+""" Compares the csv and SQLite backends: batch load, single adds, updates, lookups and time-range queries
+
+Usage: python -m benchmarks.benchmark_sqlite_backend [size]
+(defaults to 200k readings)
+"""
+from managers.temperature_reading_manager import TemperatureReadingManager
+from managers.sqlite_reading_manager import SqliteReadingManager
+from readings.temperature_reading import TemperatureReading
+from benchmarks.benchmark_data import TEMP_START, temp_csv_path
+import datetime
+import os
+import random
+import sys
+import time
+
+DEFAULT_SIZE = 200000
+OPERATIONS = 1000
+
+def create_readings(count):
+    """ Returns count temperature readings, one per second """
+
+    return [TemperatureReading.from_trusted_values(TEMP_START + datetime.timedelta(seconds=i), 0, "ABC Sensor Temp M301A",
+                                                   20.152, 21.367, 22.005, "OK" if i % 100 else "HIGH_TEMP")
+            for i in range(count)]
+
+def time_call(function, *args):
+    """ Returns the seconds taken by a call """
+
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+def run(create_manager, size):
+    """ Returns the timings of every operation against a manager holding no readings """
+
+    reading_manager = create_manager()
+    timings = {}
+    timings["batch load"] = time_call(reading_manager.add_readings, create_readings(size))
+    timings["%d adds" % OPERATIONS] = time_call(lambda: [reading_manager.add_reading(r) for r in create_readings(OPERATIONS)])
+
+    updates = create_readings(OPERATIONS)
+    for reading in updates:
+        reading.set_sequence_num(random.randint(1, size))
+    timings["%d updates" % OPERATIONS] = time_call(lambda: [reading_manager.update_reading(r) for r in updates])
+
+    seq_nums = [random.randint(1, size) for i in range(OPERATIONS)]
+    timings["%d lookups" % OPERATIONS] = time_call(lambda: [reading_manager.get_reading(s) for s in seq_nums])
+
+    start = TEMP_START + datetime.timedelta(seconds=size // 2)
+    timings["1h range x 100"] = time_call(lambda: [reading_manager.get_readings_between(start, start + datetime.timedelta(hours=1))
+                                                   for i in range(100)])
+    timings["restart"] = time_call(create_manager)
+    return timings
+
+def main(size):
+    """ Runs the benchmark and prints the results """
+
+    csv_filename = temp_csv_path("benchmark_sqlite_backend.csv")
+    db_filename = temp_csv_path("benchmark_sqlite_backend.db")
+    open(csv_filename, "w").close()
+    # Without the journal every csv update rewrites the whole file, so it is compared as the API runs it
+    backends = (("csv + journal", lambda: TemperatureReadingManager(csv_filename, use_journal=True)),
+                ("sqlite", lambda: SqliteReadingManager(db_filename, TemperatureReading)))
+
+    random.seed(1)
+    print("%d readings" % size)
+    for name, create_manager in backends:
+        timings = run(create_manager, size)
+        print("  %s" % name)
+        for operation, seconds in timings.items():
+            print("    %-16s %8.3f s" % (operation, seconds))
+    for filename in (csv_filename, csv_filename + ".journal", db_filename, db_filename + "-wal", db_filename + "-shm"):
+        if os.path.exists(filename):
+            os.remove(filename)
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_SIZE)
@@ -0,0 +1,58 @@
+""" Compares file size, load time and append throughput of the csv and binary storage formats
+
+Usage: python -m benchmarks.benchmark_storage_format [size]
+(defaults to 1M readings per file)
+"""
+from managers.temperature_reading_manager import TemperatureReadingManager
+from managers.pressure_reading_manager import PressureReadingManager
+from managers.binary_reading_file import BinaryReadingFile
+from benchmarks.benchmark_data import write_temperature_csv, write_pressure_csv, temp_csv_path
+import os
+import sys
+import time
+
+DEFAULT_SIZE = 1000000
+APPENDS = 2000
+
+def time_load(manager_class, filename, storage_format):
+    """ Returns the seconds taken to start a manager, and the manager """
+
+    start = time.perf_counter()
+    reading_manager = manager_class(filename, storage_format=storage_format)
+    return time.perf_counter() - start, reading_manager
+
+def time_appends(reading_manager):
+    """ Returns the seconds taken to add readings one at a time """
+
+    reading = reading_manager.get_reading(1)
+    start = time.perf_counter()
+    for i in range(APPENDS):
+        reading_manager.add_reading(reading.from_trusted_values(reading.get_timestamp(), 0, reading.get_sensor_model(),
+                                                                reading.get_min_value(), reading.get_avg_value(),
+                                                                reading.get_max_value(), reading.get_status()))
+    return time.perf_counter() - start
+
+def main(size):
+    """ Runs the benchmark and prints the results """
+
+    for manager_class, write_csv in ((TemperatureReadingManager, write_temperature_csv),
+                                     (PressureReadingManager, write_pressure_csv)):
+        csv_filename = temp_csv_path("benchmark_storage_format.csv")
+        binary_filename = temp_csv_path("benchmark_storage_format.bin")
+        write_csv(csv_filename, size)
+        csv_manager = manager_class(csv_filename)
+        csv_manager.export_readings(binary_filename, "binary")
+
+        print("%s, %d rows" % (manager_class.__name__, size))
+        for storage_format, filename in (("csv", csv_filename), ("binary", binary_filename)):
+            file_size = os.path.getsize(filename)
+            load_time, reading_manager = time_load(manager_class, filename, storage_format)
+            append_time = time_appends(reading_manager)
+            print("  %-6s %7.1f MB, load %7.3f s (%9.0f rows/s), %d appends %6.3f s" %
+                  (storage_format, file_size / 1e6, load_time, size / load_time, APPENDS, append_time))
+
+        for filename in (csv_filename, binary_filename, binary_filename + BinaryReadingFile.DICTIONARY_FILE_SUFFIX):
+            os.remove(filename)
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_SIZE)
@@ -0,0 +1,150 @@
+""" Compares the Flask and asyncio reading servers under many slow sensor connections
+
+Each server runs in its own process on empty csv files in a temporary directory. Every
+simulated sensor posts readings over its own connection, sending the headers of each
+request, pausing as a slow link would, then sending the body. The threaded Flask server
+ties up a thread per connection for the whole pause, the asyncio server a coroutine.
+
+Usage: python -m benchmarks.load_test_reading_api [connections] [requests per connection] [pause ms]
+(defaults to 500 connections, 5 requests each and a 200 ms pause)
+"""
+import reading_api
+import reading_api_async
+import asyncio
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+DEFAULT_CONNECTIONS = 500
+DEFAULT_REQUESTS = 5
+DEFAULT_PAUSE = 200
+SERVERS = ("flask", "async")
+START_TIMEOUT = 30
+REQUEST_TIMEOUT = 60
+
+def serve(server, data_dir, port):
+    """ Server process - points reading_api at data_dir and runs the chosen server """
+
+    reading_api.temp_readings_file = os.path.join(data_dir, "temperature_readings.csv")
+    reading_api.pres_readings_file = os.path.join(data_dir, "pressure_readings.csv")
+    if server == "flask":
+        from werkzeug.serving import run_simple, ThreadedWSGIServer
+        # The default listen backlog is too short for hundreds of connections at once
+        ThreadedWSGIServer.request_queue_size = 4096
+        run_simple("127.0.0.1", port, reading_api.app, threaded=True)
+    else:
+        asyncio.run(reading_api_async.serve("127.0.0.1", port))
+
+def start_server(server, data_dir):
+    """ Starts a server process on a free port and waits until it accepts connections """
+
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+
+    process = subprocess.Popen([sys.executable, "-m", "benchmarks.load_test_reading_api", "serve", server, data_dir, str(port)],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + START_TIMEOUT
+    while True:
+        try:
+            socket.create_connection(("127.0.0.1", port)).close()
+            return process, port
+        except OSError:
+            if time.monotonic() > deadline:
+                process.kill()
+                raise RuntimeError("%s server did not start" % server)
+            time.sleep(0.1)
+
+async def sensor(port, requests, pause, body, latencies, failures):
+    """ One slow sensor - posts readings, pausing between headers and body, reconnecting when the server closes the connection """
+
+    writer = None
+    headers = b"POST /sensor/temperature/reading HTTP/1.1\r\nHost: sensor\r\nContent-Type: application/json\r\nContent-Length: %d\r\n\r\n" % len(body)
+    try:
+        for i in range(requests):
+            start = time.perf_counter()
+            if writer is None:
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(headers)
+            await writer.drain()
+            await asyncio.sleep(pause)
+            writer.write(body)
+            await writer.drain()
+
+            status = int((await asyncio.wait_for(reader.readline(), REQUEST_TIMEOUT)).split()[1])
+            length = 0
+            keep_alive = True
+            while True:
+                line = await reader.readline()
+                if line == b"\r\n":
+                    break
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":")[1])
+                if line.lower().startswith(b"connection:") and b"close" in line.lower():
+                    keep_alive = False
+            await reader.readexactly(length)
+            if not keep_alive:
+                writer.close()
+                writer = None
+
+            latencies.append(time.perf_counter() - start - pause)
+            if status != 200:
+                failures.append(status)
+    except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, IndexError, ValueError):
+        failures.append("connection")
+    finally:
+        if writer is not None:
+            writer.close()
+
+async def run_sensors(port, connections, requests, pause):
+    """ Runs every sensor at once, returns the elapsed time, latencies and failures """
+
+    with open("json_templates/post_temp.json") as template:
+        body = json.dumps(json.load(template)).encode()
+
+    latencies = []
+    failures = []
+    start = time.perf_counter()
+    await asyncio.gather(*[sensor(port, requests, pause, body, latencies, failures) for i in range(connections)])
+    return time.perf_counter() - start, sorted(latencies), failures
+
+def main(connections, requests, pause):
+    """ Runs the load test against each server and prints throughput and latency """
+
+    print("%d connections x %d requests, %d ms pause between headers and body" % (connections, requests, pause))
+    for server in SERVERS:
+        data_dir = tempfile.mkdtemp()
+        for name in ("temperature_readings.csv", "pressure_readings.csv"):
+            open(os.path.join(data_dir, name), "w").close()
+
+        process, port = start_server(server, data_dir)
+        try:
+            elapsed, latencies, failures = asyncio.run(run_sensors(port, connections, requests, pause / 1000))
+        finally:
+            process.terminate()
+            process.wait()
+
+        with open(os.path.join(data_dir, "temperature_readings.csv")) as readings_file:
+            rows = sum(1 for line in readings_file)
+        shutil.rmtree(data_dir)
+
+        if latencies:
+            median = latencies[len(latencies) // 2] * 1000
+            p99 = latencies[min(len(latencies) - 1, len(latencies) * 99 // 100)] * 1000
+        else:
+            median = p99 = float("nan")
+        print("  %-6s %6.2f s, %6.0f requests/s, latency after body median %7.1f ms p99 %7.1f ms, %d failed, %d rows written" %
+              (server, elapsed, len(latencies) / elapsed, median, p99, len(failures), rows))
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "serve":
+        serve(sys.argv[2], sys.argv[3], int(sys.argv[4]))
+    else:
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_CONNECTIONS,
+             int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_REQUESTS,
+             int(sys.argv[3]) if len(sys.argv) > 3 else DEFAULT_PAUSE)
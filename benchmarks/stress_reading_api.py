@@ -0,0 +1,100 @@
+""" Hammers the reading API from many threads, then checks the csv files are intact
+
+Every thread posts, updates, deletes and lists readings through the Flask test client, so
+the view functions run concurrently the way they do under a threaded WSGI server.
+
+Usage: python -m benchmarks.stress_reading_api [threads] [requests per thread]
+(defaults to 16 threads and 200 requests each)
+"""
+from managers.temperature_reading_manager import TemperatureReadingManager
+from managers.pressure_reading_manager import PressureReadingManager
+import reading_api
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+DEFAULT_THREADS = 16
+DEFAULT_REQUESTS = 200
+TEMPLATES = {"temperature": "json_templates/post_temp.json", "pressure": "json_templates/post_pres_.json"}
+
+def hammer(client, requests, results, lock):
+    """ Thread worker - sends a random mix of requests and records the sequence numbers it created and deleted """
+
+    created = {sensor_type: [] for sensor_type in TEMPLATES}
+    deleted = {sensor_type: [] for sensor_type in TEMPLATES}
+    errors = 0
+    for i in range(requests):
+        sensor_type = random.choice(list(TEMPLATES))
+        with open(TEMPLATES[sensor_type]) as template:
+            body = json.load(template)
+        operation = random.random()
+
+        if operation < 0.5 or not created[sensor_type]:
+            response = client.post("/sensor/%s/reading" % sensor_type, json=body)
+            if response.status_code == 200:
+                created[sensor_type].append(int(response.get_json()["sequence_num"]))
+        elif operation < 0.7:
+            body["status"] = "UPDATED"
+            response = client.put("/sensor/%s/reading/%d" % (sensor_type, random.choice(created[sensor_type])), json=body)
+        elif operation < 0.8:
+            seq_num = created[sensor_type].pop()
+            response = client.delete("/sensor/%s/reading/%d" % (sensor_type, seq_num))
+            deleted[sensor_type].append(seq_num)
+        else:
+            response = client.get("/sensor/%s/reading/all?limit=100" % sensor_type)
+
+        errors += response.status_code != 200
+
+    with lock:
+        for sensor_type in TEMPLATES:
+            results["created"][sensor_type] += created[sensor_type]
+            results["deleted"][sensor_type] += deleted[sensor_type]
+        results["errors"] += errors
+
+def main(thread_count, requests):
+    """ Runs the stress test and prints whether the files are intact """
+
+    data_dir = tempfile.mkdtemp()
+    reading_api.temp_readings_file = os.path.join(data_dir, "temperature_readings.csv")
+    reading_api.pres_readings_file = os.path.join(data_dir, "pressure_readings.csv")
+    for filename in (reading_api.temp_readings_file, reading_api.pres_readings_file):
+        open(filename, "w").close()
+
+    results = {"created": {sensor_type: [] for sensor_type in TEMPLATES},
+               "deleted": {sensor_type: [] for sensor_type in TEMPLATES}, "errors": 0}
+    lock = threading.Lock()
+    client = reading_api.app.test_client()
+    threads = [threading.Thread(target=hammer, args=(client, requests, results, lock)) for i in range(thread_count)]
+
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    print("%d requests from %d threads in %.2f s (%.0f requests/s), %d failed" %
+          (thread_count * requests, thread_count, elapsed, thread_count * requests / elapsed, results["errors"]))
+
+    intact = results["errors"] == 0
+    for sensor_type, manager_class, filename in (("temperature", TemperatureReadingManager, reading_api.temp_readings_file),
+                                                 ("pressure", PressureReadingManager, reading_api.pres_readings_file)):
+        created = results["created"][sensor_type]
+        # A fresh manager re-parses the csv and journal, so a torn or interleaved row fails here
+        seq_nums = [r.get_sequence_num() for r in manager_class(filename, use_journal=True).get_all_readings()]
+        unique = len(created) == len(set(created))
+        matches = sorted(created) == seq_nums
+        print("  %-11s %5d readings, seq nums unique: %s, file matches responses: %s" % (sensor_type, len(seq_nums), unique, matches))
+        intact = intact and unique and matches
+
+    shutil.rmtree(data_dir)
+    print("OK" if intact else "FAILED")
+    return 0 if intact else 1
+
+if __name__ == "__main__":
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_THREADS,
+                  int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_REQUESTS))
@@ -0,0 +1,39 @@
+""" Converts a reading file between the csv and binary storage formats
+
+Usage: python convert_readings.py temperature|pressure csv|binary SOURCE TARGET
+(the second argument is the format to convert to, the source is read in the other one)
+"""
+from managers.abstract_reading_manager import AbstractReadingManager
+from managers.temperature_reading_manager import TemperatureReadingManager
+from managers.pressure_reading_manager import PressureReadingManager
+import sys
+
+MANAGER_CLASSES = {"temperature": TemperatureReadingManager, "pressure": PressureReadingManager}
+OTHER_FORMATS = {AbstractReadingManager.CSV_FORMAT: AbstractReadingManager.BINARY_FORMAT,
+                 AbstractReadingManager.BINARY_FORMAT: AbstractReadingManager.CSV_FORMAT}
+
+def convert_readings(sensor_type, storage_format, source, target):
+    """ Converts the source file to the target file in storage_format, returns the number of readings """
+
+    if sensor_type not in MANAGER_CLASSES:
+        raise ValueError("Sensor type must be temperature or pressure")
+    if storage_format not in OTHER_FORMATS:
+        raise ValueError("Storage format must be csv or binary")
+
+    reading_manager = MANAGER_CLASSES[sensor_type](source, storage_format=OTHER_FORMATS[storage_format])
+    reading_manager.export_readings(target, storage_format)
+    return len(reading_manager.get_all_readings())
+
+def main(argv):
+    """ Runs the converter from the command line """
+
+    if len(argv) != 5:
+        print(__doc__.strip())
+        return 2
+
+    count = convert_readings(*argv[1:])
+    print("Converted %d readings from %s to %s" % (count, argv[3], argv[4]))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
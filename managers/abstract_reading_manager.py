@@ -1,46 +1,223 @@
+from managers.reading_journal import ReadingJournal
+from managers.timestamp_index import TimestampIndex
+from managers.error_index import ErrorIndex
+from managers.reading_stats import ReadingStats
+from managers.reading_snapshot import ReadingSnapshot
+from managers.binary_reading_file import BinaryReadingFile
+from managers.csv_reading_file import CsvReadingFile
+from managers.reading_locks import ReadWriteLock, FileLock
+from managers.group_commit_writer import GroupCommitWriter
+from managers.reading_stores import ObjectReadingStore, ColumnarReadingStore, LazyReadingStore
+from managers.reading_query_mixin import ReadingQueryMixin
+from concurrent.futures import ProcessPoolExecutor
+import contextlib
 import csv
+import datetime
+import heapq
+import io
+import itertools
+import operator
+import os
+import threading
+import zlib
 
-class AbstractReadingManager:
+# Versions come from one process-wide sequence, so a manager reloaded from disk never repeats a version of the one it replaces
+_versions = itertools.count(1)
+
+class AbstractReadingManager(ReadingQueryMixin):
     """ Abstract Reading Manager """
 
     FILENAME = "File Name"
     SEQ_NUM = "Sequence Number"
+    LIMIT = "Limit"
+    LOAD_CHUNK_SIZE = 10000
+    LOAD_WORKERS = "Load Workers"
+    # Files smaller than this are always parsed in-process, starting workers would cost more
+    PARALLEL_LOAD_MIN_SIZE = 1024 * 1024
+    OBJECT_STORE = "objects"
+    COLUMNAR_STORE = "columnar"
+    LAZY_STORE = "lazy"
+    CSV_FORMAT = "csv"
+    BINARY_FORMAT = "binary"
+    READING_CLASS = None
+    SEQ_FILE_SUFFIX = ".seq"
+    TEMP_FILE_SUFFIX = ".tmp"
+    # Journal size in bytes past which it is folded back into the csv file
+    JOURNAL_COMPACT_SIZE = 4 * 1024 * 1024
+    # Block size used to checksum the csv bytes covered by a snapshot
+    CHECKSUM_BLOCK_SIZE = 1024 * 1024
+    COMMIT_DELAY = "Commit Delay"
+    COMMIT_ROWS = "Commit Rows"
+    DEFAULT_COMMIT_ROWS = 256
+
+    def __init__(self, filename, use_journal=False, store=OBJECT_STORE, load_workers=1, use_snapshot=False,
+                 storage_format=CSV_FORMAT, use_file_lock=False, commit_delay=0, commit_rows=DEFAULT_COMMIT_ROWS,
+                 use_fsync=False):
+        """ Initializes the reading manager, optionally journaling updates and deletes
+
+        store selects how readings are held in memory: "objects" keeps a reading object per row,
+        "columnar" keeps typed arrays and builds reading objects only when they are handed out,
+        "lazy" memory-maps the csv file and parses a row only when it is read.
+        load_workers above 1 parses the csv file in that many processes, and use_snapshot keeps a binary
+        snapshot of the parsed readings next to the csv file so restarts don't parse it again.
+        storage_format "binary" keeps the readings in fixed-width binary records instead of csv rows,
+        the lazy store, load_workers and use_snapshot only apply to csv files.
 
-    def __init__(self, filename):
-        """ Initializes the reading manager """
+        Reads run in parallel and writes one at a time within the process. use_file_lock also
+        serializes writes across processes sharing the file (e.g. several server workers), and
+        reloads the file before a write when another process changed it.
+
+        commit_delay above 0 groups new readings from concurrent callers into one append, written
+        once commit_rows readings are waiting or commit_delay milliseconds after the first one, and
+        add_reading returns once its group is written. use_fsync flushes each append to disk """
 
         AbstractReadingManager._validate_string_input(AbstractReadingManager.FILENAME, filename)
+        if store not in (AbstractReadingManager.OBJECT_STORE, AbstractReadingManager.COLUMNAR_STORE,
+                         AbstractReadingManager.LAZY_STORE):
+            raise ValueError("Store must be objects, columnar or lazy")
+        if storage_format not in (AbstractReadingManager.CSV_FORMAT, AbstractReadingManager.BINARY_FORMAT):
+            raise ValueError("Storage format must be csv or binary")
+        AbstractReadingManager._validate_int(AbstractReadingManager.LOAD_WORKERS, load_workers)
+        AbstractReadingManager._validate_int(AbstractReadingManager.COMMIT_DELAY, commit_delay)
+        AbstractReadingManager._validate_int(AbstractReadingManager.COMMIT_ROWS, commit_rows)
+        if commit_delay and use_file_lock:
+            # Sequence numbers handed out before a delayed write could clash with another process
+            raise ValueError("Group commit can't be combined with the file lock")
         self._filename = filename
-        self._readings = []
-        self._read_reading_from_file()
+        self._store = store
+        # Reads, appends and rewrites go through the file of the storage format
+        self._reading_file = self._create_reading_file(filename, storage_format)
+        # Mapping, snapshots and parallel loads work on the csv bytes, binary files are always read whole
+        is_csv = storage_format == AbstractReadingManager.CSV_FORMAT
+        self._map_file = is_csv and store == AbstractReadingManager.LAZY_STORE
+        self._load_workers = load_workers if is_csv else 1
+        # Readings keyed by sequence number, kept in ascending sequence number order
+        self._readings = self._create_store()
+        # Readings sorted by timestamp for range queries, built on first use
+        self._timestamp_index = None
+        # Error readings by status, sorted by timestamp, built on first use
+        self._error_index = None
+        # Aggregates of closed stats buckets keyed by (bucket, bucket start)
+        self._stats_cache = {}
+        # Highest sequence number ever handed out, so deleted numbers are never reused
+        self._last_seq_num = 0
+        # Changes whenever the readings change, see get_version
+        self._version = 0
+        # Lazily built caches are only ever replaced whole, so readers racing to build one is harmless
+        self._lock = ReadWriteLock()
+        self._file_lock = FileLock(filename) if use_file_lock else None
+        self._journal = ReadingJournal(filename) if use_journal else None
+        self._snapshot = ReadingSnapshot(filename) if use_snapshot and is_csv else None
+        self._use_fsync = use_fsync
+        self._commit_writer = None
+        if commit_delay:
+            self._commit_writer = GroupCommitWriter(self._write_committed_readings, self._lock.write_locked,
+                                                    commit_delay, commit_rows)
+        self._compacting = False
+        self._file_signature = None
+        if self._file_lock is None:
+            self._read_reading_from_file()
+        else:
+            # A writer in another process may be in the middle of appending
+            with self._file_lock.shared():
+                self._read_reading_from_file()
+        self._file_signature = self._get_file_signature()
 
     def add_reading(self, reading):
         """ Adds reading to a csv file """
         
-        if not reading:
+        if not reading or reading.__class__ != self.READING_CLASS:
+            return None
+
+        batch = None
+        with self._locked_for_write():
+            # Set new reading's seq num to largest sequence number handed out so far + 1
+            self._last_seq_num = max(self._last_seq_num, reading.get_sequence_num()) + 1
+            reading.set_sequence_num(self._last_seq_num)
+
+            self._put_reading(reading)
+            if self._commit_writer is not None:
+                batch = self._commit_writer.submit([reading])
+            else:
+                self._write_committed_readings([reading])
+
+        if batch is not None:
+            # Waiting outside the lock lets other callers join the batch
+            batch.wait()
+
+    def add_readings(self, readings):
+        """ Adds a batch of readings with a contiguous block of sequence numbers in one write, returns how many were added
+
+        Entries that are not readings of this manager's type are skipped """
+
+        if not readings:
+            return None
+
+        readings = AbstractReadingManager._filter_readings(readings, self.READING_CLASS)
+        if not readings:
+            return 0
+
+        batch = None
+        with self._locked_for_write():
+            first_seq_num = self._last_seq_num + 1
+            for seq_num, reading in enumerate(readings, first_seq_num):
+                reading.set_sequence_num(seq_num)
+                self._put_reading(reading)
+            self._last_seq_num = first_seq_num + len(readings) - 1
+
+            if self._commit_writer is not None:
+                batch = self._commit_writer.submit(readings)
+            else:
+                self._write_committed_readings(readings)
+
+        if batch is not None:
+            batch.wait()
+
+        return len(readings)
+
+    def insert_readings(self, readings):
+        """ Adds readings that already have sequence numbers, e.g. handed out by a partitioned manager """
+
+        if not readings:
             return None
 
-        # Set new reading's seq num to largest sequence number in the readings list + 1
-        for r in self._readings:
-            if r.get_sequence_num() > reading.get_sequence_num():
-                reading.set_sequence_num(r.get_sequence_num())
-        reading.set_sequence_num(reading.get_sequence_num() + 1)
+        batch = None
+        with self._locked_for_write():
+            for reading in readings:
+                if reading.get_sequence_num() in self._readings:
+                    raise ValueError("Sequence number %d is already in use" % reading.get_sequence_num())
 
-        self._readings.append(reading)
-        self._write_reading_row(reading)
+            for reading in readings:
+                self._put_reading(reading)
+            self._last_seq_num = max(self._last_seq_num, max(reading.get_sequence_num() for reading in readings))
+
+            if self._commit_writer is not None:
+                batch = self._commit_writer.submit(readings)
+            else:
+                self._write_committed_readings(readings)
+
+        if batch is not None:
+            batch.wait()
+
+        return len(readings)
 
     def update_reading(self, reading):
         """ Updates reading in a csv file """
 
-        if not self._readings or reading.__class__ != self._readings[0].__class__:
+        if not len(self._readings) or reading.__class__ != self.READING_CLASS:
             return None
 
         count = 0
-        for i, r in enumerate(self._readings):
-            if r.get_sequence_num() == reading.get_sequence_num():
-                self._readings[i] = reading
+        with self._locked_for_write():
+            if reading.get_sequence_num() in self._readings:
+                self._put_reading(reading)
                 count += 1
-        self._write_readings_to_file()
+
+            if self._journal is None:
+                self._write_readings_to_file()
+            elif count:
+                self._journal.append_update(self._reading_to_list(reading))
+                self._journal_changed()
         return count
 
     def delete_reading(self, seq_num):
@@ -48,67 +225,486 @@ class AbstractReadingManager:
 
         AbstractReadingManager._validate_int(AbstractReadingManager.SEQ_NUM, seq_num)
         count = 0
-        for i, r in enumerate(self._readings):
-            if r.get_sequence_num() == seq_num:
-                self._readings.pop(i)
+        with self._locked_for_write():
+            if self._remove_reading(seq_num) is not None:
                 count += 1
-        self._write_readings_to_file()
+                if seq_num == self._last_seq_num:
+                    # The csv no longer holds the highest sequence number, so keep it on the side
+                    self._write_last_seq_num()
+
+            if self._journal is None:
+                self._write_readings_to_file()
+            elif count:
+                self._journal.append_delete(seq_num)
+                self._journal_changed()
         return count
 
     def get_reading(self, seq_num):
         """ Returns reading that mathes sequence number from a scv file """
 
         AbstractReadingManager._validate_int(AbstractReadingManager.SEQ_NUM, seq_num)
-        reading = None
-        for r in self._readings:
-            if r.get_sequence_num() == seq_num:
-                reading = r
-        return reading
+        with self._lock.read_locked():
+            return self._readings.get(seq_num)
         
     def get_all_readings(self):
         """ Returns a list of all readings """
 
-        return self._readings
+        with self._lock.read_locked():
+            return list(self._readings.values())
+
+    def get_readings_after(self, seq_num, limit=None):
+        """ Returns up to limit readings with a sequence number greater than seq_num, in order """
+
+        AbstractReadingManager._validate_int(AbstractReadingManager.SEQ_NUM, seq_num)
+        if limit is not None:
+            AbstractReadingManager._validate_int(AbstractReadingManager.LIMIT, limit)
+
+        with self._lock.read_locked():
+            return self._readings.get_after(seq_num, limit)
+
+    def get_readings_between(self, start=None, end=None, model=None):
+        """ Returns the readings with start <= timestamp <= end in timestamp order (None leaves a side open), optionally of one sensor model """
+
+        with self._lock.read_locked():
+            timestamp_index = self._get_timestamp_index()
+            readings = self._readings.get_many(timestamp_index.get_seq_nums_between(start, end))
+
+        if model is None:
+            return readings
+
+        return [reading for reading in readings if reading.get_sensor_model() == model]
+
+    def get_error_readings(self, start=None, end=None, status=None):
+        """ Returns the error readings with start <= timestamp <= end in timestamp order, optionally only those with a status """
+
+        with self._lock.read_locked():
+            error_index = self._get_error_index()
+            return self._readings.get_many(error_index.get_seq_nums_between(start, end, status))
+
+    def get_stats(self, bucket, start=None, end=None):
+        """ Returns min/avg/max/range and error counts per minute, hour or day bucket within a time range """
+
+        ReadingStats.validate_bucket(bucket)
+        bucket_size = ReadingStats.BUCKET_SIZES[bucket]
+        now = datetime.datetime.now()
+
+        stats = []
+        with self._lock.read_locked():
+            timestamp_index = self._get_timestamp_index()
+            buckets = timestamp_index.iter_buckets(lambda timestamp: ReadingStats.get_bucket_start(timestamp, bucket),
+                                                   bucket_size, start, end)
+            for bucket_start, first, last in buckets:
+                bucket_end = bucket_start + bucket_size
+                # Buckets cut by the range hold only part of their readings and can't be shared
+                whole_bucket = (start is None or bucket_start >= start) and (end is None or bucket_end <= end)
+                bucket_stats = self._stats_cache.get((bucket, bucket_start)) if whole_bucket else None
+
+                if bucket_stats is None:
+                    readings = self._readings.get_many(timestamp_index.get_seq_nums_at(first, last))
+                    bucket_stats = ReadingStats.aggregate(bucket_start, readings)
+                    if whole_bucket and bucket_end <= now:
+                        self._stats_cache[(bucket, bucket_start)] = bucket_stats
+
+                stats.append(bucket_stats)
+
+        return stats
+
+    def get_version(self):
+        """ Returns a number that changes whenever the readings change, e.g. to validate cached responses """
+
+        return self._version
+
+    def export_readings(self, filename, storage_format):
+        """ Writes every reading to another file in the given storage format, keeping their sequence numbers """
+
+        AbstractReadingManager._validate_string_input(AbstractReadingManager.FILENAME, filename)
+        reading_file = self._create_reading_file(filename, storage_format)
+        with self._lock.read_locked():
+            readings = list(self._readings.values())
+
+        reading_file.write_readings(readings)
+
+    def is_stale(self):
+        """ Returns True if the csv file was changed by someone else since it was loaded """
+
+        # A writer changes the file before it records the new signature, so wait for it to finish
+        with self._lock.read_locked():
+            return self._get_file_signature() != self._file_signature
+
+    def refresh(self):
+        """ Loads the readings other processes appended to the file and journal since they were read
+
+        Returns False, loading nothing, if either was replaced or shrunk since, so the manager has
+        to be opened again """
+
+        with self._lock.write_locked():
+            if self._file_lock is None:
+                return self._load_appended()
+
+            # Writers hold the lock exclusively while they append, so no row is read half-written
+            with self._file_lock.shared():
+                return self._load_appended()
+
+    def _get_file_signature(self):
+        """ Returns the inode, size and modification time of the csv file and journal """
+
+        filenames = [self._filename]
+        if self._journal is not None:
+            filenames.append(self._journal.get_filename())
+
+        signature = []
+        for filename in filenames:
+            try:
+                file_stat = os.stat(filename)
+                signature.append((file_stat.st_ino, file_stat.st_size, file_stat.st_mtime_ns))
+            except OSError:
+                signature.append(None)
+
+        return tuple(signature)
+
+    def compact_journal(self):
+        """ Folds the journal into the csv file and empties it """
+
+        if self._journal is None:
+            return
+
+        with self._locked_for_write():
+            try:
+                self._write_readings_to_file()
+                # Replaying records already in the csv is harmless, so a crash before this point loses nothing
+                self._journal.truncate()
+                self._file_signature = self._get_file_signature()
+            finally:
+                self._compacting = False
+
+    @contextlib.contextmanager
+    def _locked_for_write(self):
+        """ Holds the write lock, and the file lock if enabled, for the duration of a with block """
+
+        with self._lock.write_locked():
+            if self._file_lock is None:
+                yield
+                return
+
+            with self._file_lock.exclusive():
+                # Catch up with writes from other processes so sequence numbers stay unique
+                if self.is_stale():
+                    self._catch_up()
+                yield
+
+    def _catch_up(self):
+        """ Loads what other processes wrote to the file and journal since they were read, called with both locks held
+
+        Only a file that was replaced or shrunk, by a rewrite or a compaction, is read again in full """
+
+        if not self._load_appended():
+            self._read_reading_from_file()
+            self._file_signature = self._get_file_signature()
+
+    def _load_appended(self):
+        """ Loads what other processes appended to the file and journal since they were read, called with the write lock held
+
+        Returns False, loading nothing, if either was replaced or shrunk since """
+
+        signature = self._get_file_signature()
+        file_offset = AbstractReadingManager._get_appended_offset(self._file_signature[0], signature[0])
+        journal_offset = 0
+        if self._journal is not None:
+            journal_offset = AbstractReadingManager._get_appended_offset(self._file_signature[1], signature[1])
+        if file_offset is None or journal_offset is None:
+            return False
+
+        for reading in self._reading_file.read_readings(self.READING_CLASS, file_offset):
+            self._put_reading(reading)
+            self._last_seq_num = max(self._last_seq_num, reading.get_sequence_num())
+        self._read_last_seq_num()
+        if self._journal is not None:
+            self._replay_journal(journal_offset)
+
+        self._file_signature = signature
+        return True
+
+    @staticmethod
+    def _get_appended_offset(loaded, current):
+        """ Returns the size a file had when loaded if it has only grown since, None if it was replaced or shrunk """
+
+        if loaded is None:
+            return 0
+        if current is None or current[0] != loaded[0] or current[1] < loaded[1]:
+            return None
+
+        return loaded[1]
+
+    def _journal_changed(self):
+        """ Refreshes the file signature and starts a background compaction once the journal is large """
+
+        self._file_signature = self._get_file_signature()
+        if not self._compacting and self._journal.get_size() > self.JOURNAL_COMPACT_SIZE:
+            self._compacting = True
+            threading.Thread(target=self.compact_journal, daemon=True).start()
+
+    def _replay_journal(self, offset=0):
+        """ Applies the journaled updates and deletes on top of the readings loaded from the csv file """
+
+        for operation, row in self._journal.read_records(offset):
+            if operation == ReadingJournal.UPDATE:
+                reading = self._load_reading_row(row)
+                if reading.get_sequence_num() in self._readings:
+                    self._put_reading(reading)
+            elif operation == ReadingJournal.DELETE:
+                self._remove_reading(int(row[0]))
+            else:
+                raise ValueError("Invalid journal entry")
+
+    def _get_timestamp_index(self):
+        """ Returns the timestamp index, building it on first use """
+
+        if self._timestamp_index is None:
+            self._timestamp_index = TimestampIndex(self._readings.iter_timestamp_entries())
+
+        return self._timestamp_index
+
+    def _get_error_index(self):
+        """ Returns the error index, building it on first use """
+
+        if self._error_index is None:
+            self._error_index = ErrorIndex(self._readings.values())
+
+        return self._error_index
+
+    def _invalidate_stats(self, timestamp):
+        """ Drops the cached stats of every bucket the timestamp falls in """
+
+        if not self._stats_cache:
+            return
+
+        for bucket in ReadingStats.BUCKET_SIZES:
+            self._stats_cache.pop((bucket, ReadingStats.get_bucket_start(timestamp, bucket)), None)
+
+    def _put_reading(self, reading):
+        """ Stores a new or updated reading and keeps the secondary indexes in step """
+
+        seq_num = reading.get_sequence_num()
+        old_reading = self._readings.put(reading)
+
+        if self._timestamp_index is not None:
+            if old_reading is not None:
+                self._timestamp_index.remove(old_reading.get_timestamp(), seq_num)
+            self._timestamp_index.add(reading.get_timestamp(), seq_num)
+
+        if self._error_index is not None:
+            if old_reading is not None:
+                self._error_index.remove(old_reading)
+            self._error_index.add(reading)
+
+        if old_reading is not None:
+            self._invalidate_stats(old_reading.get_timestamp())
+        self._invalidate_stats(reading.get_timestamp())
+        self._version = AbstractReadingManager._next_version()
+
+    def _remove_reading(self, seq_num):
+        """ Removes a reading and its secondary index entries, returns None if it was not found """
+
+        reading = self._readings.remove(seq_num)
+        if reading is None:
+            return None
+
+        if self._timestamp_index is not None:
+            self._timestamp_index.remove(reading.get_timestamp(), seq_num)
+        if self._error_index is not None:
+            self._error_index.remove(reading)
+        self._invalidate_stats(reading.get_timestamp())
+        self._version = AbstractReadingManager._next_version()
+
+        return reading
+
+    def _create_store(self):
+        """ Returns an empty reading store of the configured kind """
+
+        if self._store == AbstractReadingManager.COLUMNAR_STORE:
+            return ColumnarReadingStore(self.READING_CLASS)
+
+        if self._store == AbstractReadingManager.LAZY_STORE:
+            return LazyReadingStore(self._load_reading_line, self.SEQ_NUM_INDEX)
+
+        return ObjectReadingStore()
+
+    def _create_reading_file(self, filename, storage_format):
+        """ Returns the reading file of a storage format """
+
+        if storage_format == AbstractReadingManager.CSV_FORMAT:
+            return CsvReadingFile(filename, self._load_reading_chunks, self._reading_to_list)
+
+        if storage_format == AbstractReadingManager.BINARY_FORMAT:
+            return BinaryReadingFile(filename)
+
+        raise ValueError("Storage format must be csv or binary")
 
     def _read_reading_from_file(self):
         """ Reads reading from a csv file """
 
-        with open(self._filename) as csv_file:
-            csv_reader = csv.reader(csv_file, delimiter=',')
+        if self._map_file:
+            self._readings.map_file(self._filename)
+        elif self._snapshot is not None:
+            self._readings.load(self._read_readings_from_snapshot())
+        elif self._load_workers > 1 and os.path.getsize(self._filename) >= self.PARALLEL_LOAD_MIN_SIZE:
+            self._readings.load(self._read_readings_in_parallel())
+        else:
+            self._readings.load(self._reading_file.read_readings(self.READING_CLASS))
 
-            for row in csv_reader:
-                reading = self._load_reading_row(row)
-                self._readings.append(reading)
+        self._timestamp_index = None
+        self._error_index = None
+        self._stats_cache = {}
+        self._last_seq_num = self._readings.get_last_seq_num()
+        self._read_last_seq_num()
+        self._version = AbstractReadingManager._next_version()
+
+        if self._journal is not None:
+            self._replay_journal()
 
-        self._readings.sort(key=lambda reading: reading.get_sequence_num())
+    def _read_readings_from_snapshot(self):
+        """ Returns the readings in the snapshot plus the rows appended to the csv file since, refreshing the snapshot if needed """
+
+        readings = None
+        snapshot = self._snapshot.read(self.READING_CLASS)
+        with open(self._filename, "rb") as csv_file:
+            if snapshot is not None:
+                csv_size, csv_crc, snapshot_readings = snapshot
+                crc, size = self._checksum_csv_prefix(csv_file, csv_size)
+                if size == csv_size and crc == csv_crc:
+                    readings = snapshot_readings
+
+            if readings is None:
+                # The csv was rewritten or truncated since the snapshot, so it is parsed in full
+                csv_file.seek(0)
+                readings, crc, size = [], 0, 0
+
+            appended = csv_file.read()
+
+        if appended or not size:
+            rows = csv.reader(io.TextIOWrapper(io.BytesIO(appended)), delimiter=',')
+            readings.extend(self._load_reading_chunks(rows))
+            self._snapshot.write(size + len(appended), zlib.crc32(appended, crc), readings)
+
+        return readings
+
+    def _checksum_csv_prefix(self, csv_file, size):
+        """ Returns the CRC-32 and length of up to size bytes read from the csv file """
+
+        crc = 0
+        read_size = 0
+        while read_size < size:
+            block = csv_file.read(min(self.CHECKSUM_BLOCK_SIZE, size - read_size))
+            if not block:
+                break
+            crc = zlib.crc32(block, crc)
+            read_size += len(block)
+
+        return crc, read_size
+
+    def _read_readings_in_parallel(self):
+        """ Parses the csv file split on line boundaries in a process pool, returns the readings merged by sequence number """
+
+        file_size = os.path.getsize(self._filename)
+        boundaries = {0, file_size}
+        with open(self._filename, "rb") as csv_file:
+            for i in range(1, self._load_workers):
+                csv_file.seek(file_size * i // self._load_workers)
+                # Move to the start of the next line so no row is split between two chunks
+                csv_file.readline()
+                boundaries.add(csv_file.tell())
+
+        boundaries = sorted(boundaries)
+        chunks = [(self.__class__, self._filename, start, end) for start, end in zip(boundaries, boundaries[1:])]
+        with ProcessPoolExecutor(max_workers=self._load_workers) as executor:
+            sorted_chunks = list(executor.map(_load_csv_file_chunk, chunks))
+
+        # Workers send back plain field tuples, they pickle far faster than reading objects
+        merged = heapq.merge(*sorted_chunks, key=operator.itemgetter(1))
+        return itertools.starmap(self.READING_CLASS.from_trusted_values, merged)
+
+    def _load_reading_chunks(self, rows):
+        """ Yields the readings of the rows, parsing them a chunk at a time """
+
+        rows = iter(rows)
+        while True:
+            chunk = list(itertools.islice(rows, self.LOAD_CHUNK_SIZE))
+            if not chunk:
+                return
+            yield from self._load_reading_rows(chunk)
+
+    def _read_last_seq_num(self):
+        """ Raises the sequence number high-water mark to the value saved next to the csv file """
+
+        seq_filename = self._filename + AbstractReadingManager.SEQ_FILE_SUFFIX
+        if not os.path.exists(seq_filename):
+            return
+
+        try:
+            with open(seq_filename) as seq_file:
+                saved_seq_num = int(seq_file.read().strip())
+        except ValueError:
+            # The csv file still bounds the high-water mark from below
+            return
+
+        self._last_seq_num = max(self._last_seq_num, saved_seq_num)
+
+    def _write_last_seq_num(self):
+        """ Saves the sequence number high-water mark next to the csv file through a temporary file
+
+        A crash while writing in place would leave an empty file, and the csv alone can't tell
+        which deleted numbers were handed out """
+
+        seq_filename = self._filename + AbstractReadingManager.SEQ_FILE_SUFFIX
+        temp_filename = seq_filename + AbstractReadingManager.TEMP_FILE_SUFFIX
+        with open(temp_filename, "w") as seq_file:
+            seq_file.write(str(self._last_seq_num))
+            seq_file.flush()
+            os.fsync(seq_file.fileno())
+        os.replace(temp_filename, seq_filename)
 
     def _write_readings_to_file(self):
-        """ Writes readings to a csv file """
+        """ Writes readings to a temporary csv file and atomically swaps it in """
         
-        readings = []
-        for reading in self._readings:
-            lreading = self._reading_to_list(reading)
-            readings.append(lreading)
-            
-        with open(self._filename, mode="w", newline="") as f:
-            reading_writer = csv.writer(f, delimiter=",")
-            reading_writer.writerows(readings)
+        if self._commit_writer is not None:
+            # The rewrite holds every reading already, so waiting appends must land first, not after it
+            self._commit_writer.flush()
+
+        self._reading_file.write_readings(self._readings.values())
+        self._file_signature = self._get_file_signature()
+
+    def _write_committed_readings(self, readings):
+        """ Appends new readings to the file and records its new signature, called with the write lock held """
+
+        self._reading_file.append_readings(readings, self._use_fsync)
+        self._file_signature = self._get_file_signature()
 
     def _load_reading_row(self, row):
         """ Abstract Method - Gets reading from a csv file """
 
         raise NotImplementedError("Must be implemented")
 
-    def _write_reading_row(self, reading):
-        """ Abstract Method - Writes reading to a csv file """
+    def _load_reading_line(self, line):
+        """ Gets reading from a single csv line """
 
-        raise NotImplementedError("Must be implemented")
+        return self._load_reading_row(next(csv.reader([line], delimiter=',')))
+
+    def _load_reading_rows(self, rows):
+        """ Gets readings from a chunk of csv rows, subclasses can parse the chunk in one go """
+
+        return [self._load_reading_row(row) for row in rows]
 
     def _reading_to_list(self, reading):
         """ Abstract Method - Returns reading object formated as list """
 
         raise NotImplementedError("Must be implemented")
 
+    @staticmethod
+    def _filter_readings(readings, reading_class):
+        """ Returns the entries of a batch that are readings of the reading class, in order """
+
+        return [reading for reading in readings if reading and reading.__class__ == reading_class]
+
     @staticmethod
     def _validate_string_input(display_name, input_value):
         """ Private helper to validate input values as not None or an empty string """
@@ -124,4 +720,27 @@ class AbstractReadingManager:
         """ Private method to validate the input value is an integer type """
 
         if type(input_value) != int:
-            raise ValueError(display_name, " must be an integer type")
\ No newline at end of file
+            raise ValueError(display_name, " must be an integer type")
+
+    @staticmethod
+    def _next_version():
+        """ Returns the next version from the process-wide sequence """
+
+        return next(_versions)
+
+def _load_csv_file_chunk(chunk):
+    """ Process pool worker - parses the rows between two byte offsets of a csv file
+
+    Returns the field values of each reading as a tuple, sorted by sequence number """
+
+    manager_class, filename, start, end = chunk
+    with open(filename, "rb") as csv_file:
+        csv_file.seek(start)
+        data = csv_file.read(end - start)
+
+    # Only the row parser is needed, so the manager is created without loading its file
+    manager = manager_class.__new__(manager_class)
+    readings = manager._load_reading_rows(list(csv.reader(io.TextIOWrapper(io.BytesIO(data)), delimiter=',')))
+    readings.sort(key=lambda reading: reading.get_sequence_num())
+    return [(r.get_timestamp(), r.get_sequence_num(), r.get_sensor_model(), r.get_min_value(), r.get_avg_value(),
+             r.get_max_value(), r.get_status()) for r in readings]
@@ -0,0 +1,182 @@
+import datetime
+import os
+import struct
+
+class BinaryReadingFile:
+    """ Reading file of fixed-width binary records, an alternative to the csv format
+
+    Each record packs the sequence number, the timestamp as microseconds since the epoch,
+    min/avg/max as doubles and the model and status as codes into a dictionary file kept
+    next to it, one string per line. Since every record has the same size, record n can be
+    read without reading the ones before it. """
+
+    DICTIONARY_FILE_SUFFIX = ".dict"
+    TEMP_FILE_SUFFIX = ".tmp"
+    # Magic, format version and record size
+    HEADER = struct.Struct("<4sHH")
+    MAGIC = b"RBIN"
+    VERSION = 1
+    # Sequence number, timestamp, min, avg, max, model code and status code
+    RECORD = struct.Struct("<qqdddII")
+    EPOCH = datetime.datetime(1970, 1, 1)
+    ONE_MICROSECOND = datetime.timedelta(microseconds=1)
+
+    def __init__(self, filename):
+        """ Initializes the binary file and loads its dictionary """
+
+        self._filename = filename
+        self._dictionary_filename = filename + BinaryReadingFile.DICTIONARY_FILE_SUFFIX
+        self._read_dictionary()
+
+    def get_record_count(self):
+        """ Returns the number of complete records in the file """
+
+        size = os.path.getsize(self._filename)
+        if not size:
+            return 0
+
+        return (size - BinaryReadingFile.HEADER.size) // BinaryReadingFile.RECORD.size
+
+    def read_readings(self, reading_class, offset=0):
+        """ Returns every record from a byte offset on as a reading_class object, in file order
+
+        An offset inside a record starts at the record after it """
+
+        with open(self._filename, "rb") as binary_file:
+            header = binary_file.read(BinaryReadingFile.HEADER.size)
+            if offset > BinaryReadingFile.HEADER.size:
+                record_count = -(-(offset - BinaryReadingFile.HEADER.size) // BinaryReadingFile.RECORD.size)
+                binary_file.seek(BinaryReadingFile.HEADER.size + record_count * BinaryReadingFile.RECORD.size)
+            data = binary_file.read()
+
+        if not header:
+            return []
+
+        self._check_header(header)
+        # A partial last record is a torn write from a crash, the reading was never acknowledged
+        end = len(data) - len(data) % BinaryReadingFile.RECORD.size
+        records = BinaryReadingFile.RECORD.iter_unpack(memoryview(data)[:end])
+
+        return [self._to_reading(reading_class, record) for record in records]
+
+    def read_reading(self, record_num, reading_class):
+        """ Returns the record at a zero-based record number as a reading_class object, None past the end """
+
+        if type(record_num) != int or record_num < 0:
+            raise ValueError("Record number must be a non-negative integer")
+
+        with open(self._filename, "rb") as binary_file:
+            header = binary_file.read(BinaryReadingFile.HEADER.size)
+            if not header:
+                return None
+            self._check_header(header)
+
+            binary_file.seek(BinaryReadingFile.HEADER.size + record_num * BinaryReadingFile.RECORD.size)
+            data = binary_file.read(BinaryReadingFile.RECORD.size)
+
+        if len(data) < BinaryReadingFile.RECORD.size:
+            return None
+
+        return self._to_reading(reading_class, BinaryReadingFile.RECORD.unpack(data))
+
+    def append_readings(self, readings, fsync=False):
+        """ Appends readings to the end of the file in a single write, optionally flushed to disk """
+
+        records = self._to_records(readings)
+        with open(self._filename, "ab") as binary_file:
+            size = binary_file.tell()
+            if size == 0:
+                binary_file.write(self._pack_header())
+            elif (size - BinaryReadingFile.HEADER.size) % BinaryReadingFile.RECORD.size:
+                # Drop a torn last record so the new ones start on a record boundary
+                binary_file.truncate(size - (size - BinaryReadingFile.HEADER.size) % BinaryReadingFile.RECORD.size)
+            binary_file.write(records)
+            if fsync:
+                binary_file.flush()
+                os.fsync(binary_file.fileno())
+
+    def write_readings(self, readings):
+        """ Writes the readings to a temporary file and atomically swaps it in """
+
+        records = self._to_records(readings)
+        temp_filename = self._filename + BinaryReadingFile.TEMP_FILE_SUFFIX
+        with open(temp_filename, "wb") as binary_file:
+            binary_file.write(self._pack_header())
+            binary_file.write(records)
+            binary_file.flush()
+            os.fsync(binary_file.fileno())
+        os.replace(temp_filename, self._filename)
+
+    def _read_dictionary(self):
+        """ Loads the model and status strings, their line number is their code """
+
+        self._strings = []
+        if os.path.exists(self._dictionary_filename):
+            with open(self._dictionary_filename, newline="") as dictionary_file:
+                # A last line without a newline is a torn write, no record uses its code yet
+                self._strings = [line[:-1] for line in dictionary_file if line.endswith("\n")]
+
+        self._string_codes = {value: code for code, value in enumerate(self._strings)}
+
+    def _get_codes(self, values):
+        """ Returns the codes of the strings, saving new ones to the dictionary before any record uses them """
+
+        new_strings = []
+        for value in values:
+            if value not in self._string_codes:
+                if "\n" in value or "\r" in value:
+                    raise ValueError("Invalid data entry")
+                self._string_codes[value] = len(self._strings)
+                self._strings.append(value)
+                new_strings.append(value)
+
+        if new_strings:
+            with open(self._dictionary_filename, "a", newline="") as dictionary_file:
+                dictionary_file.write("".join(value + "\n" for value in new_strings))
+                dictionary_file.flush()
+                os.fsync(dictionary_file.fileno())
+
+        return [self._string_codes[value] for value in values]
+
+    def _to_records(self, readings):
+        """ Returns the packed records of the readings """
+
+        readings = list(readings)
+        models = self._get_codes([reading.get_sensor_model() for reading in readings])
+        statuses = self._get_codes([reading.get_status() for reading in readings])
+
+        pack = BinaryReadingFile.RECORD.pack
+        records = bytearray()
+        try:
+            for reading, model, status in zip(readings, models, statuses):
+                timestamp = (reading.get_timestamp() - BinaryReadingFile.EPOCH) // BinaryReadingFile.ONE_MICROSECOND
+                records += pack(reading.get_sequence_num(), timestamp, reading.get_min_value(),
+                                reading.get_avg_value(), reading.get_max_value(), model, status)
+        except (struct.error, TypeError):
+            raise ValueError("Invalid data entry")
+
+        return records
+
+    def _to_reading(self, reading_class, record):
+        """ Builds a reading from an unpacked record """
+
+        seq_num, timestamp, min, avg, max, model, status = record
+        if model >= len(self._strings) or status >= len(self._strings):
+            # Another process may have added strings since the dictionary was loaded
+            self._read_dictionary()
+            if model >= len(self._strings) or status >= len(self._strings):
+                raise ValueError("Invalid data entry")
+
+        return reading_class.from_trusted_values(BinaryReadingFile.EPOCH + BinaryReadingFile.ONE_MICROSECOND * timestamp,
+                                                 seq_num, self._strings[model], min, avg, max, self._strings[status])
+
+    def _pack_header(self):
+        """ Returns the file header """
+
+        return BinaryReadingFile.HEADER.pack(BinaryReadingFile.MAGIC, BinaryReadingFile.VERSION, BinaryReadingFile.RECORD.size)
+
+    def _check_header(self, header):
+        """ Raises ValueError if the header is not one this class writes """
+
+        if header != self._pack_header():
+            raise ValueError("Invalid data entry")
@@ -0,0 +1,62 @@
+import csv
+import io
+import os
+
+class CsvReadingFile:
+    """ Reading file of csv rows, the default storage format
+
+    Offers the same methods as BinaryReadingFile, so the reading managers pick a format once
+    and read, append and rewrite through it. Rows are parsed and formatted by the manager,
+    which knows the column layout of its sensor type. """
+
+    TEMP_FILE_SUFFIX = ".tmp"
+
+    def __init__(self, filename, load_reading_chunks, reading_to_list):
+        """ Initializes the csv file, load_reading_chunks turns csv rows into readings and reading_to_list a reading into a row """
+
+        self._filename = filename
+        self._load_reading_chunks = load_reading_chunks
+        self._reading_to_list = reading_to_list
+
+    def read_readings(self, reading_class, offset=0):
+        """ Yields every row as a reading, in file order, so a store can load them without holding them all
+
+        A non-zero offset must be the start of a row, such as the size of the file when it was last read.
+        reading_class is implied by the manager's row parser """
+
+        if offset:
+            with open(self._filename, "rb") as csv_file:
+                csv_file.seek(offset)
+                rows = io.StringIO(csv_file.read().decode(), newline="")
+            yield from self._load_reading_chunks(csv.reader(rows, delimiter=','))
+            return
+
+        with open(self._filename) as csv_file:
+            csv_reader = csv.reader(csv_file, delimiter=',')
+
+            yield from self._load_reading_chunks(csv_reader)
+
+    def append_readings(self, readings, fsync=False):
+        """ Appends readings to the end of the file in a single buffered write, optionally flushed to disk """
+
+        rows = io.StringIO()
+        csv.writer(rows).writerows([self._reading_to_list(reading) for reading in readings])
+
+        with open(self._filename, "a", newline="") as csv_file:
+            csv_file.write(rows.getvalue())
+            if fsync:
+                csv_file.flush()
+                os.fsync(csv_file.fileno())
+
+    def write_readings(self, readings):
+        """ Writes the readings to a temporary file and atomically swaps it in """
+
+        rows = [self._reading_to_list(reading) for reading in readings]
+
+        temp_filename = self._filename + CsvReadingFile.TEMP_FILE_SUFFIX
+        with open(temp_filename, mode="w", newline="") as f:
+            reading_writer = csv.writer(f, delimiter=",")
+            reading_writer.writerows(rows)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_filename, self._filename)
@@ -0,0 +1,55 @@
+from managers.timestamp_index import TimestampIndex
+import heapq
+
+class ErrorIndex:
+    """ Timestamp index of the error readings, one per error status
+
+    Only readings whose is_error() is True are indexed, so finding recent errors costs a
+    lookup in a few small indexes rather than a scan of every reading. """
+
+    def __init__(self, readings=()):
+        """ Initializes the index from an iterable of readings """
+
+        entries = {}
+        for reading in readings:
+            if reading.is_error():
+                entries.setdefault(reading.get_status(), []).append((reading.get_timestamp(), reading.get_sequence_num()))
+
+        self._indexes = {status: TimestampIndex(status_entries) for status, status_entries in entries.items()}
+
+    def add(self, reading):
+        """ Adds a reading if it is an error """
+
+        if reading.is_error():
+            status = reading.get_status()
+            if status not in self._indexes:
+                self._indexes[status] = TimestampIndex()
+            self._indexes[status].add(reading.get_timestamp(), reading.get_sequence_num())
+
+    def remove(self, reading):
+        """ Removes a reading if it is an error """
+
+        if not reading.is_error():
+            return
+
+        status = reading.get_status()
+        index = self._indexes.get(status)
+        if index is not None:
+            index.remove(reading.get_timestamp(), reading.get_sequence_num())
+            if not len(index):
+                del self._indexes[status]
+
+    def get_statuses(self):
+        """ Returns the error statuses that have readings, sorted """
+
+        return sorted(self._indexes)
+
+    def get_seq_nums_between(self, start=None, end=None, status=None):
+        """ Returns the sequence numbers of the errors with start <= timestamp <= end in timestamp order, optionally of one status """
+
+        if status is not None:
+            index = self._indexes.get(status)
+            return [] if index is None else index.get_seq_nums_between(start, end)
+
+        entries = heapq.merge(*[index.get_entries_between(start, end) for index in self._indexes.values()])
+        return [seq_num for timestamp, seq_num in entries]
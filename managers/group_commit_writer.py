@@ -0,0 +1,100 @@
+import threading
+import time
+
+class GroupCommitBatch:
+    """ Items written together by a GroupCommitWriter, callers wait on it for their write """
+
+    def __init__(self):
+        """ Initializes an empty batch """
+
+        self._items = []
+        self._done = threading.Event()
+        self._error = None
+
+    def wait(self):
+        """ Blocks until the batch is written, raises the error if the write failed """
+
+        self._done.wait()
+        if self._error is not None:
+            raise self._error
+
+
+class GroupCommitWriter:
+    """ Collects items appended by concurrent callers and writes them in one call
+
+    A batch is written once it holds max_rows items or max_delay milliseconds after its first
+    item arrived, whichever comes first, by a background thread holding the given lock. Every
+    caller waiting on the batch is released once it is written, trading a bounded latency for
+    far fewer writes. """
+
+    def __init__(self, write, lock, max_delay, max_rows):
+        """ Initializes the writer, write(items) is called with the lock context held """
+
+        self._write = write
+        self._lock = lock
+        self._max_delay = max_delay / 1000
+        self._max_rows = max_rows
+        self._condition = threading.Condition(threading.Lock())
+        self._batch = GroupCommitBatch()
+        self._batch_start = None
+        self._thread = None
+
+    def submit(self, items):
+        """ Adds items to the current batch and returns the batch to wait on """
+
+        with self._condition:
+            batch = self._batch
+            batch._items.extend(items)
+            if self._batch_start is None:
+                self._batch_start = time.monotonic()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+        return batch
+
+    def flush(self):
+        """ Writes the current batch now, in the calling thread """
+
+        with self._lock():
+            batch = self._take_batch()
+            if batch._items:
+                self._write_batch(batch)
+
+    def _take_batch(self):
+        """ Swaps in an empty batch and returns the current one """
+
+        with self._condition:
+            batch = self._batch
+            self._batch = GroupCommitBatch()
+            self._batch_start = None
+
+        return batch
+
+    def _write_batch(self, batch):
+        """ Writes a batch and releases its waiters """
+
+        try:
+            self._write(batch._items)
+        except Exception as error:
+            batch._error = error
+        batch._done.set()
+
+    def _run(self):
+        """ Background thread - writes each batch once it is full or old enough """
+
+        while True:
+            with self._condition:
+                while True:
+                    if self._batch_start is None:
+                        self._condition.wait()
+                        continue
+
+                    remaining = self._batch_start + self._max_delay - time.monotonic()
+                    if remaining <= 0 or len(self._batch._items) >= self._max_rows:
+                        break
+                    self._condition.wait(remaining)
+
+            # The batch is taken under the lock so a flush from a writer holding it sees every item
+            self.flush()
@@ -0,0 +1,633 @@
+from managers.abstract_reading_manager import AbstractReadingManager
+from managers.reading_locks import ReadWriteLock, FileLock
+from managers.reading_stats import ReadingStats
+from managers.reading_archive import ReadingArchive
+from managers.reading_query_mixin import ReadingQueryMixin
+import contextlib
+import datetime
+import glob
+import heapq
+import itertools
+import json
+import operator
+import os
+import threading
+import time
+
+class PartitionedReadingManager(ReadingQueryMixin):
+    """ Reading manager splitting the readings of one sensor type into files per sensor model and/or time period
+
+    Offers the same API as the csv reading managers. Each partition is a csv file managed by
+    its own reading_manager_class instance, opened on first use, so an update rewrites only its own
+    partition and holds only its lock. A manifest in the directory lists the partitions with
+    the range of timestamps and sequence numbers they hold; queries skip the partitions whose
+    model or ranges can't match. Sequence numbers are handed out by this manager and stay
+    unique across partitions. Adds to existing partitions append the new ranges and the last
+    sequence number to a log next to the manifest, which is folded into it when it is rewritten.
+
+    Partitioned by time period only, the partitions are time segments: writes roll over to a
+    new file every hour or day, and a retention policy drops the old ones or compresses them
+    into archives that are still queried. """
+
+    FILENAME = "File Name"
+    MANAGER_CLASS = "Manager Class"
+    RETENTION_DAYS = "Retention Days"
+    MANIFEST_FILE = "manifest.json"
+    MANIFEST_VERSION = 1
+    MANIFEST_LOG_SUFFIX = ".log"
+    # The manifest is rewritten and its log emptied once the log is larger than this
+    MANIFEST_LOG_COMPACT_SIZE = 1024 * 1024
+    PARTITION_FILE = "partition-%05d.csv"
+    ARCHIVE_FILE_SUFFIX = ReadingArchive.FILE_SUFFIX
+    TEMP_FILE_SUFFIX = ".tmp"
+    RETENTION_DROP = "drop"
+    RETENTION_ARCHIVE = "archive"
+    # Seconds between background retention runs, checked when readings are added
+    RETENTION_INTERVAL = 60
+
+    def __init__(self, filename, reading_manager_class, partition_by_model=True, partition_period=None,
+                 retention_days=None, retention_action=RETENTION_DROP, archive_codec=None,
+                 archive_block_rows=ReadingArchive.BLOCK_ROWS, **manager_options):
+        """ Initializes the reading manager on a partition directory, creating it if it doesn't exist
+
+        partition_by_model gives each sensor model its own partitions, and partition_period
+        ("hour" or "day") splits them by the period of the reading timestamps. The manager
+        options are passed to every partition's manager. use_file_lock locks the manifest too,
+        so several processes can share the directory.
+
+        retention_days applies a retention policy in the background: partitions whose newest
+        reading is older than that are dropped, or with retention_action "archive" compressed
+        into read-only archives that are still queried, and restored if a reading in them changes.
+        Archives are compressed in blocks of archive_block_rows readings with archive_codec, "gzip"
+        or "zstd" (defaults to zstd if the zstandard package is installed, gzip otherwise). """
+
+        AbstractReadingManager._validate_string_input(PartitionedReadingManager.FILENAME, filename)
+        if reading_manager_class is None:
+            raise ValueError(PartitionedReadingManager.MANAGER_CLASS + " cannot be undefined.")
+        if partition_period is not None:
+            ReadingStats.validate_bucket(partition_period)
+        if retention_days is not None:
+            AbstractReadingManager._validate_int(PartitionedReadingManager.RETENTION_DAYS, retention_days)
+        if retention_action not in (PartitionedReadingManager.RETENTION_DROP, PartitionedReadingManager.RETENTION_ARCHIVE):
+            raise ValueError("Retention action must be drop or archive")
+        if archive_codec is not None:
+            ReadingArchive.validate_codec(archive_codec)
+        self._directory = filename
+        self._manager_class = reading_manager_class
+        self._partition_by_model = partition_by_model
+        self._partition_period = partition_period
+        self._retention = None if retention_days is None else datetime.timedelta(days=retention_days)
+        self._retention_action = retention_action
+        self._archive_codec = archive_codec
+        self._archive_block_rows = archive_block_rows
+        self._retention_running = False
+        self._retention_checked = None
+        self._manager_options = manager_options
+        self._use_fsync = manager_options.get("use_fsync", False)
+        self._manifest_filename = os.path.join(filename, PartitionedReadingManager.MANIFEST_FILE)
+        self._manifest_log_filename = self._manifest_filename + PartitionedReadingManager.MANIFEST_LOG_SUFFIX
+        os.makedirs(filename, exist_ok=True)
+
+        # Guards the manifest and is held across adds and queries, so a query never sees a reading
+        # without the ones numbered before it. Updates and deletes only hold their partition's lock
+        self._lock = ReadWriteLock()
+        self._file_lock = FileLock(self._manifest_filename) if manager_options.get("use_file_lock") else None
+        # Partition managers keyed by partition file, opened on first use
+        self._managers = {}
+        self._managers_lock = threading.Lock()
+        # Changes whenever the readings change, see get_version
+        self._version = 0
+        self._version_lock = threading.Lock()
+        if self._file_lock is None:
+            self._read_manifest()
+        else:
+            with self._file_lock.shared():
+                self._read_manifest()
+
+    def add_reading(self, reading):
+        """ Adds reading to the partition of its model and/or period """
+
+        if not reading or reading.__class__ != self._manager_class.READING_CLASS:
+            return None
+
+        self.add_readings([reading])
+
+    def add_readings(self, readings):
+        """ Adds a batch of readings with a contiguous block of sequence numbers, one write per partition, returns how many were added
+
+        Entries that are not readings of the partitions' type are skipped """
+
+        if not readings:
+            return None
+
+        readings = AbstractReadingManager._filter_readings(readings, self._manager_class.READING_CLASS)
+        if not readings:
+            return 0
+
+        with self._locked_for_write():
+            first_seq_num = self._last_seq_num + 1
+            partitions = {}
+            widened = {}
+            for seq_num, reading in enumerate(readings, first_seq_num):
+                reading.set_sequence_num(seq_num)
+                partition = self._get_partition(reading)
+                if self._widen_partition(partition, reading):
+                    widened[partition["file"]] = partition
+                partitions.setdefault(partition["file"], (partition, []))[1].append(reading)
+            self._last_seq_num = first_seq_num + len(readings) - 1
+
+            # The manifest covers the new readings before they are written, so a crash leaves gaps, never reused numbers
+            self._save_manifest(widened.values())
+            for partition, partition_readings in partitions.values():
+                self._get_manager(partition).insert_readings(partition_readings)
+            self._record_change(len(readings))
+
+        self._check_retention()
+        return len(readings)
+
+    def update_reading(self, reading):
+        """ Updates reading, moving it to another partition if its model or period changed """
+
+        if reading.__class__ != self._manager_class.READING_CLASS:
+            return None
+
+        seq_num = reading.get_sequence_num()
+        with self._lock.read_locked():
+            partition = self._find_partition(seq_num)
+            if partition is None:
+                return 0
+            if (not partition["archived"] and self._get_partition_key(reading) == (partition["model"], partition["period_start"])
+                    and not self._widen_partition(dict(partition), reading)):
+                # Rewriting the partition only needs its own lock
+                return self._record_change(self._get_manager(partition).update_reading(reading))
+
+        with self._locked_for_write():
+            old_partition = self._find_partition(seq_num)
+            if old_partition is None:
+                return 0
+            self._restore_partition(old_partition)
+
+            partition = self._get_partition(reading)
+            self._widen_partition(partition, reading)
+            self._save_manifest([partition])
+
+            if partition is old_partition:
+                return self._record_change(self._get_manager(partition).update_reading(reading))
+
+            if not self._get_manager(old_partition).delete_reading(seq_num):
+                return 0
+            self._get_manager(partition).insert_readings([reading])
+            return self._record_change(1)
+
+    def delete_reading(self, seq_num):
+        """ Deletes reading from its partition """
+
+        AbstractReadingManager._validate_int(AbstractReadingManager.SEQ_NUM, seq_num)
+        with self._lock.read_locked():
+            partition = self._find_partition(seq_num)
+            if partition is None:
+                return 0
+            if not partition["archived"]:
+                return self._record_change(self._get_manager(partition).delete_reading(seq_num))
+
+        with self._locked_for_write():
+            partition = self._find_partition(seq_num)
+            if partition is None:
+                return 0
+            self._restore_partition(partition)
+            return self._record_change(self._get_manager(partition).delete_reading(seq_num))
+
+    def get_reading(self, seq_num):
+        """ Returns reading that matches sequence number, None if not found """
+
+        AbstractReadingManager._validate_int(AbstractReadingManager.SEQ_NUM, seq_num)
+        with self._lock.read_locked():
+            partition = self._find_partition(seq_num)
+            return None if partition is None else self._get_manager(partition).get_reading(seq_num)
+
+    def get_readings_after(self, seq_num, limit=None):
+        """ Returns up to limit readings with a sequence number greater than seq_num, in order """
+
+        AbstractReadingManager._validate_int(AbstractReadingManager.SEQ_NUM, seq_num)
+        if limit is not None:
+            AbstractReadingManager._validate_int(AbstractReadingManager.LIMIT, limit)
+
+        with self._lock.read_locked():
+            partitions = self._select_partitions(lambda partition: partition["max_seq_num"] > seq_num)
+            pages = [self._get_manager(partition).get_readings_after(seq_num, limit) for partition in partitions]
+
+        readings = heapq.merge(*pages, key=operator.methodcaller("get_sequence_num"))
+        return list(itertools.islice(readings, limit))
+
+    def get_readings_between(self, start=None, end=None, model=None):
+        """ Returns the readings with start <= timestamp <= end in timestamp order (None leaves a side open), optionally of one sensor model """
+
+        with self._lock.read_locked():
+            partitions = self._select_partitions(lambda partition: self._overlaps(partition, start, end, model))
+            return self._merge_by_timestamp([self._get_manager(partition).get_readings_between(start, end, model)
+                                             for partition in partitions])
+
+    def get_error_readings(self, start=None, end=None, status=None):
+        """ Returns the error readings with start <= timestamp <= end in timestamp order, optionally only those with a status """
+
+        with self._lock.read_locked():
+            partitions = self._select_partitions(lambda partition: self._overlaps(partition, start, end, None))
+            return self._merge_by_timestamp([self._get_manager(partition).get_error_readings(start, end, status)
+                                             for partition in partitions])
+
+    def get_models(self):
+        """ Returns the sensor models that have a partition of their own, sorted """
+
+        with self._lock.read_locked():
+            return sorted({partition["model"] for partition in self._partitions.values() if partition["model"] is not None})
+
+    def apply_retention(self, now=None):
+        """ Drops or archives the partitions whose newest reading is older than the retention period, returns how many """
+
+        if self._retention is None:
+            return 0
+
+        cutoff = (now or datetime.datetime.now()) - self._retention
+        with self._locked_for_write():
+            expired = self._select_partitions(lambda partition: partition["max_timestamp"] < cutoff and
+                                              not (partition["archived"] and self._retention_action == PartitionedReadingManager.RETENTION_ARCHIVE))
+            for partition in expired:
+                if self._retention_action == PartitionedReadingManager.RETENTION_ARCHIVE:
+                    self._archive_partition(partition)
+                else:
+                    del self._partitions[(partition["model"], partition["period_start"])]
+                    # Gone from the manifest first, so a crash leaves stray files rather than missing ones
+                    self._write_manifest()
+                    self._close_manager(partition)
+                    self._remove_files(partition["file"])
+                    self._record_change(1)
+
+        return len(expired)
+
+    def get_version(self):
+        """ Returns a number that changes whenever the readings change, e.g. to validate cached responses """
+
+        return self._version
+
+    def is_stale(self):
+        """ Returns True if the manifest or an open partition was changed by someone else since it was loaded """
+
+        with self._lock.read_locked():
+            if self._get_manifest_signature() != self._manifest_signature:
+                return True
+
+        with self._managers_lock:
+            managers = list(self._managers.values())
+
+        return any(manager.is_stale() for manager in managers)
+
+    @contextlib.contextmanager
+    def _locked_for_write(self):
+        """ Holds the manifest write lock, and the file lock if enabled, for the duration of a with block """
+
+        with self._lock.write_locked():
+            if self._file_lock is None:
+                yield
+                return
+
+            with self._file_lock.exclusive():
+                # Catch up with partitions and sequence numbers added by other processes
+                if not self._load_appended_manifest_log():
+                    self._read_manifest()
+                yield
+
+    def refresh(self):
+        """ Loads the partition ranges and readings other processes added since they were read
+
+        Returns False, loading nothing, if the manifest was rewritten since, so the manager has to be
+        opened again. Partitions whose files were replaced are opened again on their next use """
+
+        with self._lock.write_locked():
+            if self._file_lock is None:
+                return self._refresh_partitions()
+
+            with self._file_lock.shared():
+                return self._refresh_partitions()
+
+    def _refresh_partitions(self):
+        """ Refreshes the manifest and the open partition managers, called with the write lock held """
+
+        if not self._load_appended_manifest_log():
+            return False
+
+        with self._managers_lock:
+            managers = list(self._managers.items())
+
+        for partition_file, manager in managers:
+            if manager.is_stale():
+                if not manager.refresh():
+                    with self._managers_lock:
+                        self._managers.pop(partition_file, None)
+                self._record_change(1)
+
+        return True
+
+    def _load_appended_manifest_log(self):
+        """ Replays the entries other processes appended to the manifest log, called with the write lock held
+
+        Returns False, loading nothing, if the manifest was rewritten or the log emptied since it was read """
+
+        signature = self._get_manifest_signature()
+        if signature == self._manifest_signature:
+            return True
+
+        log_offset = AbstractReadingManager._get_appended_offset(self._manifest_signature[1], signature[1])
+        if signature[0] != self._manifest_signature[0] or log_offset is None:
+            return False
+
+        self._replay_manifest_log(log_offset)
+        self._record_change(1)
+        self._manifest_signature = signature
+        return True
+
+    def _record_change(self, count):
+        """ Moves to a new version if count readings changed, returns count """
+
+        if count:
+            with self._version_lock:
+                self._version = AbstractReadingManager._next_version()
+
+        return count
+
+    def _check_retention(self):
+        """ Starts a background retention run if one is due """
+
+        if self._retention is None or self._retention_running:
+            return
+        if self._retention_checked is not None and time.monotonic() - self._retention_checked < self.RETENTION_INTERVAL:
+            return
+
+        self._retention_running = True
+        self._retention_checked = time.monotonic()
+        threading.Thread(target=self._run_retention, daemon=True).start()
+
+    def _run_retention(self):
+        """ Background thread - applies the retention policy once """
+
+        try:
+            self.apply_retention()
+        finally:
+            self._retention_running = False
+
+    def _find_partition(self, seq_num):
+        """ Returns the partition holding the sequence number, None if no partition does, called with the lock held """
+
+        partitions = self._select_partitions(lambda partition: partition["min_seq_num"] <= seq_num <= partition["max_seq_num"])
+        for partition in partitions:
+            if self._get_manager(partition).get_reading(seq_num) is not None:
+                return partition
+
+        return None
+
+    def _select_partitions(self, predicate):
+        """ Returns the partitions the predicate holds for, called with the lock held """
+
+        return [partition for partition in self._partitions.values() if predicate(partition)]
+
+    def _overlaps(self, partition, start, end, model):
+        """ Returns True if the partition may hold readings of the model within the time range """
+
+        return ((model is None or partition["model"] is None or partition["model"] == model) and
+                (start is None or partition["max_timestamp"] >= start) and
+                (end is None or partition["min_timestamp"] <= end))
+
+    def _merge_by_timestamp(self, reading_lists):
+        """ Merges lists of readings sorted by timestamp into one """
+
+        return list(heapq.merge(*reading_lists, key=lambda reading: (reading.get_timestamp(), reading.get_sequence_num())))
+
+    def _get_partition_key(self, reading):
+        """ Returns the model and period start (each None if not partitioned by it) of the partition a reading belongs to """
+
+        model = reading.get_sensor_model() if self._partition_by_model else None
+        period_start = None
+        if self._partition_period is not None:
+            period_start = ReadingStats.get_bucket_start(reading.get_timestamp(), self._partition_period).isoformat()
+
+        return model, period_start
+
+    def _get_partition(self, reading):
+        """ Returns the partition a reading belongs to, creating or restoring it if needed, called with the write lock held """
+
+        key = self._get_partition_key(reading)
+        partition = self._partitions.get(key)
+        if partition is None:
+            partition_file = PartitionedReadingManager.PARTITION_FILE % self._next_partition
+            self._next_partition += 1
+            open(os.path.join(self._directory, partition_file), "a").close()
+            partition = {"model": key[0], "period_start": key[1], "file": partition_file, "archived": False,
+                         "min_timestamp": reading.get_timestamp(), "max_timestamp": reading.get_timestamp(),
+                         "min_seq_num": reading.get_sequence_num(), "max_seq_num": reading.get_sequence_num()}
+            self._partitions[key] = partition
+            self._partitions_changed = True
+        else:
+            self._restore_partition(partition)
+
+        return partition
+
+    def _widen_partition(self, partition, reading):
+        """ Widens the ranges of a partition to cover a reading, returns True if they changed """
+
+        timestamp = reading.get_timestamp()
+        seq_num = reading.get_sequence_num()
+        bounds = (partition["min_timestamp"], partition["max_timestamp"], partition["min_seq_num"], partition["max_seq_num"])
+        partition["min_timestamp"] = min(partition["min_timestamp"], timestamp)
+        partition["max_timestamp"] = max(partition["max_timestamp"], timestamp)
+        partition["min_seq_num"] = min(partition["min_seq_num"], seq_num)
+        partition["max_seq_num"] = max(partition["max_seq_num"], seq_num)
+
+        return bounds != (partition["min_timestamp"], partition["max_timestamp"], partition["min_seq_num"], partition["max_seq_num"])
+
+    def _archive_partition(self, partition):
+        """ Replaces a partition's csv file and sidecars with a block-compressed archive, called with the write lock held """
+
+        csv_file = partition["file"]
+        archive_file = csv_file + PartitionedReadingManager.ARCHIVE_FILE_SUFFIX
+        archive_path = os.path.join(self._directory, archive_file)
+        readings = self._get_manager(partition).get_all_readings()
+        ReadingArchive(archive_path, self._manager_class.READING_CLASS).write_readings(readings, self._archive_codec,
+                                                                                      self._archive_block_rows, self._use_fsync)
+
+        self._close_manager(partition)
+        partition["file"] = archive_file
+        partition["archived"] = True
+        self._write_manifest()
+        self._remove_files(csv_file, archive_path)
+
+    def _restore_partition(self, partition):
+        """ Turns an archived partition back into a csv file so it can be changed, called with the write lock held """
+
+        if not partition["archived"]:
+            return
+
+        archive_file = partition["file"]
+        archive_path = os.path.join(self._directory, archive_file)
+        csv_file = archive_file[:-len(PartitionedReadingManager.ARCHIVE_FILE_SUFFIX)]
+        readings = self._get_manager(partition).get_all_readings()
+        self._close_manager(partition)
+
+        # Leftovers of a restore interrupted before the manifest was written
+        self._remove_files(csv_file, archive_path)
+        open(os.path.join(self._directory, csv_file), "w").close()
+        partition["file"] = csv_file
+        partition["archived"] = False
+        self._get_manager(partition).insert_readings(readings)
+        self._write_manifest()
+        self._remove_files(archive_file)
+
+    def _remove_files(self, partition_file, keep=None):
+        """ Removes a partition file and its sidecar files, except keep """
+
+        path = os.path.join(self._directory, partition_file)
+        for filename in [path] + glob.glob(glob.escape(path) + ".*"):
+            if filename != keep and os.path.exists(filename):
+                os.remove(filename)
+
+    def _get_manager(self, partition):
+        """ Returns the manager of a partition, opening it on first use """
+
+        with self._managers_lock:
+            manager = self._managers.get(partition["file"])
+            if manager is None:
+                filename = os.path.join(self._directory, partition["file"])
+                if partition["archived"]:
+                    # Answers the same queries, decompressing only the blocks they need
+                    manager = ReadingArchive(filename, self._manager_class.READING_CLASS)
+                else:
+                    manager = self._manager_class(filename, **self._manager_options)
+                self._managers[partition["file"]] = manager
+
+        return manager
+
+    def _close_manager(self, partition):
+        """ Forgets the manager of a partition whose file is replaced or removed """
+
+        with self._managers_lock:
+            self._managers.pop(partition["file"], None)
+
+    def _get_manifest_signature(self):
+        """ Returns the inode, size and modification time of the manifest and its log """
+
+        signature = []
+        for filename in (self._manifest_filename, self._manifest_log_filename):
+            try:
+                file_stat = os.stat(filename)
+                signature.append((file_stat.st_ino, file_stat.st_size, file_stat.st_mtime_ns))
+            except OSError:
+                signature.append(None)
+
+        return tuple(signature)
+
+    def _read_manifest(self):
+        """ Loads the partitions and the highest sequence number handed out from the manifest """
+
+        self._partitions = {}
+        self._partitions_changed = False
+        self._last_seq_num = 0
+        self._next_partition = 1
+        if os.path.exists(self._manifest_filename):
+            try:
+                with open(self._manifest_filename) as manifest_file:
+                    manifest = json.load(manifest_file)
+                if manifest["version"] != PartitionedReadingManager.MANIFEST_VERSION:
+                    raise ValueError("Invalid data entry")
+
+                self._last_seq_num = int(manifest["last_seq_num"])
+                self._next_partition = int(manifest["next_partition"])
+                for partition in manifest["partitions"]:
+                    for field in ("min_timestamp", "max_timestamp"):
+                        partition[field] = datetime.datetime.fromisoformat(partition[field])
+                    self._partitions[(partition["model"], partition["period_start"])] = partition
+            except (KeyError, TypeError, ValueError):
+                raise ValueError("Invalid data entry")
+        self._replay_manifest_log(0)
+
+        # Another process may have changed the partitions
+        self._record_change(1)
+
+        self._manifest_signature = self._get_manifest_signature()
+
+    def _replay_manifest_log(self, offset):
+        """ Widens the loaded partitions and raises the last sequence number to the log entries from a byte offset on """
+
+        if not os.path.exists(self._manifest_log_filename):
+            return
+
+        with open(self._manifest_log_filename, "rb") as log_file:
+            log_file.seek(offset)
+            lines = log_file.read().decode().split("\n")
+
+        # The last line is empty, or a torn write from a crash whose readings were never acknowledged
+        for line in lines[:-1]:
+            try:
+                entry = json.loads(line)
+                self._last_seq_num = max(self._last_seq_num, int(entry["last_seq_num"]))
+                for model, period_start, min_timestamp, max_timestamp, min_seq_num, max_seq_num in entry["bounds"]:
+                    partition = self._partitions.get((model, period_start))
+                    if partition is None:
+                        # Dropped by a manifest rewrite interrupted before the log was emptied
+                        continue
+                    partition["min_timestamp"] = min(partition["min_timestamp"], datetime.datetime.fromisoformat(min_timestamp))
+                    partition["max_timestamp"] = max(partition["max_timestamp"], datetime.datetime.fromisoformat(max_timestamp))
+                    partition["min_seq_num"] = min(partition["min_seq_num"], int(min_seq_num))
+                    partition["max_seq_num"] = max(partition["max_seq_num"], int(max_seq_num))
+            except (KeyError, TypeError, ValueError):
+                raise ValueError("Invalid data entry")
+
+    def _save_manifest(self, partitions):
+        """ Records the last sequence number and the ranges of the partitions that widened, called with the write lock held
+
+        Appends them to the manifest log, so an add costs one short line however many partitions there
+        are. The manifest itself is rewritten only when a partition was created or the log is large """
+
+        if self._partitions_changed or self._get_manifest_log_size() > PartitionedReadingManager.MANIFEST_LOG_COMPACT_SIZE:
+            self._write_manifest()
+            return
+
+        bounds = [[partition["model"], partition["period_start"], partition["min_timestamp"].isoformat(),
+                   partition["max_timestamp"].isoformat(), partition["min_seq_num"], partition["max_seq_num"]]
+                  for partition in partitions]
+        with open(self._manifest_log_filename, "a") as log_file:
+            log_file.write(json.dumps({"last_seq_num": self._last_seq_num, "bounds": bounds}) + "\n")
+            if self._use_fsync:
+                log_file.flush()
+                os.fsync(log_file.fileno())
+        self._manifest_signature = self._get_manifest_signature()
+
+    def _get_manifest_log_size(self):
+        """ Returns the size of the manifest log in bytes """
+
+        try:
+            return os.path.getsize(self._manifest_log_filename)
+        except OSError:
+            return 0
+
+    def _write_manifest(self):
+        """ Writes the manifest to a temporary file and atomically swaps it in, then empties the manifest log """
+
+        partitions = []
+        for partition in self._partitions.values():
+            partition = dict(partition)
+            for field in ("min_timestamp", "max_timestamp"):
+                partition[field] = partition[field].isoformat()
+            partitions.append(partition)
+
+        manifest = {"version": PartitionedReadingManager.MANIFEST_VERSION, "last_seq_num": self._last_seq_num,
+                    "next_partition": self._next_partition, "partitions": partitions}
+        temp_filename = self._manifest_filename + PartitionedReadingManager.TEMP_FILE_SUFFIX
+        with open(temp_filename, "w") as manifest_file:
+            json.dump(manifest, manifest_file)
+            if self._use_fsync:
+                manifest_file.flush()
+                os.fsync(manifest_file.fileno())
+        os.replace(temp_filename, self._manifest_filename)
+        # Replaying entries the manifest already covers is harmless, so a crash before this point loses nothing
+        if os.path.exists(self._manifest_log_filename):
+            open(self._manifest_log_filename, "w").close()
+        self._partitions_changed = False
+        self._manifest_signature = self._get_manifest_signature()
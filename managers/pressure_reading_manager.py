@@ -1,7 +1,6 @@
 from managers.abstract_reading_manager import AbstractReadingManager
+from managers.timestamp_parser import TimestampParser
 from readings.pressure_reading import PressureReading
-import datetime
-import csv
 
 class PressureReadingManager(AbstractReadingManager):
     """ Pressure Reading Manager """
@@ -13,25 +12,47 @@ class PressureReadingManager(AbstractReadingManager):
     AVG_INDEX = 4
     MAX_INDEX = 5
     STATUS_INDEX = 6
+    READING_CLASS = PressureReading
+    TIMESTAMP_PARSER = TimestampParser(TimestampParser.MINUTE_FORMAT, use_cache=True)
 
 
     def _load_reading_row(self, row):
         """ Loads list into a PressureReading object """
+        
+        return self._load_reading_rows([row])[0]
+
+    def _load_reading_rows(self, rows):
+        """ Loads a chunk of lists into PressureReading objects """
+
+        # Looked up once per chunk instead of once per row
+        parse_timestamp = PressureReadingManager.TIMESTAMP_PARSER.parse
+        create_reading = PressureReading.from_trusted_values
+        timestamp_index = PressureReadingManager.TIMESTAMP_INDEX
+        seq_num_index = PressureReadingManager.SEQ_NUM_INDEX
+        sensor_model_index = PressureReadingManager.SENSOR_MODEL_INDEX
+        min_index = PressureReadingManager.MIN_INDEX
+        avg_index = PressureReadingManager.AVG_INDEX
+        max_index = PressureReadingManager.MAX_INDEX
+        status_index = PressureReadingManager.STATUS_INDEX
 
+        pres_readings = []
         try:
-            reading_datetime = datetime.datetime.strptime(row[PressureReadingManager.TIMESTAMP_INDEX], "%Y-%m-%d %H:%M")
-            pres_reading = PressureReading(reading_datetime,
-                                int(row[PressureReadingManager.SEQ_NUM_INDEX]),
-                                row[PressureReadingManager.SENSOR_MODEL_INDEX],
-                                float(row[PressureReadingManager.MIN_INDEX]),
-                                float(row[PressureReadingManager.AVG_INDEX]),
-                                float(row[PressureReadingManager.MAX_INDEX]),
-                                row[PressureReadingManager.STATUS_INDEX])
+            for row in rows:
+                sensor_model = row[sensor_model_index]
+                status = row[status_index]
+                if not sensor_model or not status:
+                    raise ValueError("Invalid data entry")
+
+                # The parsed values already have the types the validators check for
+                pres_readings.append(create_reading(parse_timestamp(row[timestamp_index]),
+                                    int(row[seq_num_index]), sensor_model,
+                                    float(row[min_index]), float(row[avg_index]), float(row[max_index]),
+                                    status))
         except:
             raise ValueError("Invalid data entry")
 
-        return pres_reading
-
+        return pres_readings
+    
     def _reading_to_list(self, reading):
         """ Returns reading object formated as list of strings """
 
@@ -45,16 +66,3 @@ class PressureReadingManager(AbstractReadingManager):
             raise ValueError("Invalid data entry")
 
         return pres_reading
-
-    def _write_reading_row(self, reading):
-        """ Writes reading to a csv file """
-
-        if not reading:
-            raise ValueError("Invalid data entry")
-
-        pres_reading = self._reading_to_list(reading)
-        
-        with open(self._filename, "a") as csv_file:
-            writer = csv.writer(csv_file)
-            writer.writerow(pres_reading)
-            
\ No newline at end of file
@@ -0,0 +1,309 @@
+import collections
+import csv
+import datetime
+import gzip
+import io
+import json
+import os
+import struct
+import threading
+import zlib
+
+try:
+    import zstandard
+except ImportError:
+    # zstd is optional, archives fall back to gzip from the standard library
+    zstandard = None
+
+class ReadingArchive:
+    """ Read-only file of readings compressed in independent blocks, for cold data
+
+    The readings are sorted by timestamp and split into blocks of csv rows, each compressed
+    on its own with gzip or zstd. An index at the end of the file records every block's
+    offset and its ranges of timestamps and sequence numbers, models and error count, so a
+    query decompresses only the blocks that can hold a match. The last few decompressed
+    blocks are cached. """
+
+    FILE_SUFFIX = ".arc"
+    TEMP_FILE_SUFFIX = ".tmp"
+    GZIP_CODEC = "gzip"
+    ZSTD_CODEC = "zstd"
+    # Codec ids as stored in the header
+    CODECS = (GZIP_CODEC, ZSTD_CODEC)
+    # Magic, format version and codec id
+    HEADER = struct.Struct("<4sHH")
+    # Index offset, index size and magic
+    TRAILER = struct.Struct("<QQ4s")
+    MAGIC = b"RARC"
+    VERSION = 1
+    BLOCK_ROWS = 4096
+    BLOCK_CACHE_SIZE = 8
+    GZIP_LEVEL = 6
+    ZSTD_LEVEL = 3
+
+    def __init__(self, filename, reading_class):
+        """ Initializes the archive, its index is read on first use """
+
+        self._filename = filename
+        self._reading_class = reading_class
+        self._blocks = None
+        self._codec = None
+        self._file_signature = None
+        # Decompressed blocks by block number, least recently used first
+        self._block_cache = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_default_codec():
+        """ Returns zstd if the zstandard package is installed, gzip otherwise """
+
+        return ReadingArchive.GZIP_CODEC if zstandard is None else ReadingArchive.ZSTD_CODEC
+
+    @staticmethod
+    def validate_codec(codec):
+        """ Raises ValueError if the codec is unknown or its package is not installed """
+
+        if codec not in ReadingArchive.CODECS:
+            raise ValueError("Codec must be gzip or zstd")
+        if codec == ReadingArchive.ZSTD_CODEC and zstandard is None:
+            raise ValueError("The zstd codec needs the zstandard package")
+
+    def write_readings(self, readings, codec=None, block_rows=BLOCK_ROWS, fsync=False):
+        """ Writes the readings to a temporary file in blocks of block_rows and atomically swaps it in """
+
+        codec = codec or ReadingArchive.get_default_codec()
+        ReadingArchive.validate_codec(codec)
+        if type(block_rows) != int or block_rows <= 0:
+            raise ValueError("Block rows must be a positive integer")
+
+        readings = sorted(readings, key=lambda reading: (reading.get_timestamp(), reading.get_sequence_num()))
+        temp_filename = self._filename + ReadingArchive.TEMP_FILE_SUFFIX
+        blocks = []
+        with open(temp_filename, "wb") as archive_file:
+            archive_file.write(ReadingArchive.HEADER.pack(ReadingArchive.MAGIC, ReadingArchive.VERSION,
+                                                          ReadingArchive.CODECS.index(codec)))
+            for start in range(0, len(readings), block_rows):
+                block_readings = readings[start:start + block_rows]
+                data = self._compress(codec, self._to_csv(block_readings).encode())
+                blocks.append(self._describe_block(block_readings, archive_file.tell(), len(data)))
+                archive_file.write(data)
+
+            index = self._compress(codec, json.dumps(blocks).encode())
+            index_offset = archive_file.tell()
+            archive_file.write(index)
+            archive_file.write(ReadingArchive.TRAILER.pack(index_offset, len(index), ReadingArchive.MAGIC))
+            if fsync:
+                archive_file.flush()
+                os.fsync(archive_file.fileno())
+        os.replace(temp_filename, self._filename)
+
+        with self._lock:
+            self._blocks = None
+            self._block_cache.clear()
+
+    def get_codec(self):
+        """ Returns the codec the archive was written with """
+
+        self._get_blocks()
+        return self._codec
+
+    def get_reading(self, seq_num):
+        """ Returns reading that matches sequence number, None if not found """
+
+        for block_num in self._select_blocks(lambda block: block["min_seq_num"] <= seq_num <= block["max_seq_num"]):
+            for reading in self._read_block(block_num):
+                if reading.get_sequence_num() == seq_num:
+                    return reading
+
+        return None
+
+    def get_all_readings(self):
+        """ Returns a list of all readings in sequence number order """
+
+        return self.get_readings_after(0)
+
+    def get_readings_after(self, seq_num, limit=None):
+        """ Returns up to limit readings with a sequence number greater than seq_num, in order """
+
+        readings = []
+        for block_num in self._select_blocks(lambda block: block["max_seq_num"] > seq_num):
+            readings.extend(reading for reading in self._read_block(block_num) if reading.get_sequence_num() > seq_num)
+
+        readings.sort(key=lambda reading: reading.get_sequence_num())
+        return readings if limit is None else readings[:limit]
+
+    def get_readings_between(self, start=None, end=None, model=None):
+        """ Returns the readings with start <= timestamp <= end in timestamp order (None leaves a side open), optionally of one sensor model """
+
+        readings = []
+        for block_num in self._select_blocks(lambda block: self._overlaps(block, start, end, model)):
+            readings.extend(reading for reading in self._read_block(block_num)
+                            if (start is None or reading.get_timestamp() >= start) and
+                            (end is None or reading.get_timestamp() <= end) and
+                            (model is None or reading.get_sensor_model() == model))
+
+        return readings
+
+    def get_error_readings(self, start=None, end=None, status=None):
+        """ Returns the error readings with start <= timestamp <= end in timestamp order, optionally only those with a status """
+
+        readings = []
+        for block_num in self._select_blocks(lambda block: block["errors"] and self._overlaps(block, start, end, None)):
+            readings.extend(reading for reading in self._read_block(block_num)
+                            if reading.is_error() and (status is None or reading.get_status() == status) and
+                            (start is None or reading.get_timestamp() >= start) and
+                            (end is None or reading.get_timestamp() <= end))
+
+        return readings
+
+    def is_stale(self):
+        """ Returns True if the file was replaced since its index was read """
+
+        with self._lock:
+            return self._blocks is not None and self._get_file_signature() != self._file_signature
+
+    def refresh(self):
+        """ Returns False, an archive is rewritten rather than appended to, so a changed one has to be opened again """
+
+        return False
+
+    def _overlaps(self, block, start, end, model):
+        """ Returns True if the block may hold readings of the model within the time range """
+
+        return ((model is None or model in block["models"]) and
+                (start is None or block["max_timestamp"] >= start) and
+                (end is None or block["min_timestamp"] <= end))
+
+    def _select_blocks(self, predicate):
+        """ Returns the numbers of the blocks the predicate holds for """
+
+        return [block_num for block_num, block in enumerate(self._get_blocks()) if predicate(block)]
+
+    def _get_blocks(self):
+        """ Returns the block index, reading it from the end of the file on first use """
+
+        with self._lock:
+            if self._blocks is not None:
+                return self._blocks
+
+            with open(self._filename, "rb") as archive_file:
+                header = archive_file.read(ReadingArchive.HEADER.size)
+                archive_file.seek(0, os.SEEK_END)
+                size = archive_file.tell()
+                if len(header) < ReadingArchive.HEADER.size or size < ReadingArchive.HEADER.size + ReadingArchive.TRAILER.size:
+                    raise ValueError("Invalid data entry")
+                archive_file.seek(size - ReadingArchive.TRAILER.size)
+                index_offset, index_size, magic = ReadingArchive.TRAILER.unpack(archive_file.read(ReadingArchive.TRAILER.size))
+                archive_file.seek(index_offset)
+                index = archive_file.read(index_size)
+
+            header_magic, version, codec_id = ReadingArchive.HEADER.unpack(header)
+            if header_magic != ReadingArchive.MAGIC or magic != ReadingArchive.MAGIC or version != ReadingArchive.VERSION \
+                    or codec_id >= len(ReadingArchive.CODECS):
+                raise ValueError("Invalid data entry")
+            codec = ReadingArchive.CODECS[codec_id]
+            ReadingArchive.validate_codec(codec)
+
+            try:
+                blocks = json.loads(self._decompress(codec, index))
+                for block in blocks:
+                    for field in ("min_timestamp", "max_timestamp"):
+                        block[field] = datetime.datetime.fromisoformat(block[field])
+            except (KeyError, TypeError, ValueError):
+                raise ValueError("Invalid data entry")
+
+            self._codec = codec
+            self._blocks = blocks
+            self._block_cache.clear()
+            self._file_signature = self._get_file_signature()
+            return blocks
+
+    def _read_block(self, block_num):
+        """ Returns the readings of a block, decompressing it unless it is cached """
+
+        with self._lock:
+            readings = self._block_cache.get(block_num)
+            if readings is not None:
+                self._block_cache.move_to_end(block_num)
+                return readings
+            block = self._blocks[block_num]
+            codec = self._codec
+
+        with open(self._filename, "rb") as archive_file:
+            archive_file.seek(block["offset"])
+            data = archive_file.read(block["size"])
+
+        readings = self._from_csv(self._decompress(codec, data).decode(errors="replace"))
+
+        with self._lock:
+            self._block_cache[block_num] = readings
+            if len(self._block_cache) > ReadingArchive.BLOCK_CACHE_SIZE:
+                self._block_cache.popitem(last=False)
+
+        return readings
+
+    def _describe_block(self, readings, offset, size):
+        """ Returns the index entry of a block of readings sorted by timestamp """
+
+        seq_nums = [reading.get_sequence_num() for reading in readings]
+        return {"offset": offset, "size": size, "rows": len(readings),
+                "min_timestamp": readings[0].get_timestamp().isoformat(), "max_timestamp": readings[-1].get_timestamp().isoformat(),
+                "min_seq_num": min(seq_nums), "max_seq_num": max(seq_nums),
+                "models": sorted({reading.get_sensor_model() for reading in readings}),
+                "errors": sum(1 for reading in readings if reading.is_error())}
+
+    def _to_csv(self, readings):
+        """ Returns the readings as csv text """
+
+        rows = io.StringIO()
+        try:
+            csv.writer(rows).writerows([(reading.get_timestamp().isoformat(), reading.get_sequence_num(), reading.get_sensor_model(),
+                                         repr(reading.get_min_value()), repr(reading.get_avg_value()), repr(reading.get_max_value()),
+                                         reading.get_status()) for reading in readings])
+        except AttributeError:
+            raise ValueError("Invalid data entry")
+
+        return rows.getvalue()
+
+    def _from_csv(self, text):
+        """ Returns the readings in csv text """
+
+        create_reading = self._reading_class.from_trusted_values
+        parse_timestamp = datetime.datetime.fromisoformat
+        try:
+            return [create_reading(parse_timestamp(timestamp), int(seq_num), model, float(min), float(avg), float(max), status)
+                    for timestamp, seq_num, model, min, avg, max, status in csv.reader(io.StringIO(text))]
+        except (TypeError, ValueError):
+            raise ValueError("Invalid data entry")
+
+    def _compress(self, codec, data):
+        """ Returns the data compressed with the codec """
+
+        if codec == ReadingArchive.ZSTD_CODEC:
+            return zstandard.ZstdCompressor(level=ReadingArchive.ZSTD_LEVEL).compress(data)
+
+        return gzip.compress(data, ReadingArchive.GZIP_LEVEL, mtime=0)
+
+    def _decompress(self, codec, data):
+        """ Returns the data decompressed with the codec """
+
+        if codec == ReadingArchive.ZSTD_CODEC:
+            try:
+                return zstandard.ZstdDecompressor().decompress(data)
+            except zstandard.ZstdError:
+                raise ValueError("Invalid data entry")
+
+        try:
+            return gzip.decompress(data)
+        except (OSError, EOFError, zlib.error):
+            raise ValueError("Invalid data entry")
+
+    def _get_file_signature(self):
+        """ Returns the inode, size and modification time of the file """
+
+        try:
+            file_stat = os.stat(self._filename)
+        except OSError:
+            return None
+
+        return file_stat.st_ino, file_stat.st_size, file_stat.st_mtime_ns
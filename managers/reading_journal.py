@@ -0,0 +1,66 @@
+import csv
+import io
+import os
+
+class ReadingJournal:
+    """ Append-only log of reading updates and deletes kept next to a csv file """
+
+    FILE_SUFFIX = ".journal"
+    UPDATE = "U"
+    DELETE = "D"
+
+    def __init__(self, filename):
+        """ Initializes the journal for the given csv file """
+
+        self._filename = filename + ReadingJournal.FILE_SUFFIX
+
+    def get_filename(self):
+        """ Getter for the journal file name """
+
+        return self._filename
+
+    def append_update(self, row):
+        """ Appends an update record holding the full reading row """
+
+        self._append([ReadingJournal.UPDATE] + row)
+
+    def append_delete(self, seq_num):
+        """ Appends a delete record for the sequence number """
+
+        self._append([ReadingJournal.DELETE, str(seq_num)])
+
+    def read_records(self, offset=0):
+        """ Returns the (operation, row) records in the order they were written, starting at a byte offset """
+
+        if not os.path.exists(self._filename):
+            return []
+
+        with open(self._filename, "rb") as journal_file:
+            journal_file.seek(offset)
+            lines = io.StringIO(journal_file.read().decode(), newline="").readlines()
+
+        # A last line without a newline is a torn write from a crash, the change was never acknowledged
+        if lines and not lines[-1].endswith("\n"):
+            lines.pop()
+
+        return [(row[0], row[1:]) for row in csv.reader(lines) if row]
+
+    def get_size(self):
+        """ Returns the size of the journal in bytes """
+
+        try:
+            return os.path.getsize(self._filename)
+        except OSError:
+            return 0
+
+    def truncate(self):
+        """ Empties the journal once its records are folded into the csv file """
+
+        open(self._filename, "w").close()
+
+    def _append(self, record):
+        """ Writes a single record to the end of the journal """
+
+        with open(self._filename, "a", newline="") as journal_file:
+            writer = csv.writer(journal_file)
+            writer.writerow(record)
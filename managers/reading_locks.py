@@ -0,0 +1,151 @@
+import contextlib
+import threading
+
+try:
+    import fcntl
+except ImportError:
+    # No advisory file locks on this platform, FileLock falls back to doing nothing
+    fcntl = None
+
+class ReadWriteLock:
+    """ In-process lock letting any number of readers in at once, or a single writer
+
+    Waiting writers are let in before new readers so a steady stream of reads can't starve
+    them. The writer may take the read or write lock again while holding it, but a reader
+    must not ask for the write lock. """
+
+    def __init__(self):
+        """ Initializes an unlocked lock """
+
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = None
+        self._writer_depth = 0
+        self._waiting_writers = 0
+
+    @contextlib.contextmanager
+    def read_locked(self):
+        """ Holds the read lock for the duration of a with block """
+
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextlib.contextmanager
+    def write_locked(self):
+        """ Holds the write lock for the duration of a with block """
+
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+    def acquire_read(self):
+        """ Waits until no writer holds or waits for the lock, then takes a read lock """
+
+        with self._condition:
+            if self._writer == threading.get_ident():
+                self._writer_depth += 1
+                return
+
+            while self._writer is not None or self._waiting_writers:
+                self._condition.wait()
+            self._readers += 1
+
+    def release_read(self):
+        """ Releases a read lock """
+
+        with self._condition:
+            if self._writer == threading.get_ident():
+                self._writer_depth -= 1
+                return
+
+            self._readers -= 1
+            if not self._readers:
+                self._condition.notify_all()
+
+    def acquire_write(self):
+        """ Waits until no reader or other writer holds the lock, then takes the write lock """
+
+        with self._condition:
+            if self._writer == threading.get_ident():
+                self._writer_depth += 1
+                return
+
+            self._waiting_writers += 1
+            while self._writer is not None or self._readers:
+                self._condition.wait()
+            self._waiting_writers -= 1
+            self._writer = threading.get_ident()
+            self._writer_depth = 1
+
+    def release_write(self):
+        """ Releases the write lock """
+
+        with self._condition:
+            self._writer_depth -= 1
+            if not self._writer_depth:
+                self._writer = None
+                self._condition.notify_all()
+
+
+class FileLock:
+    """ Advisory lock on a file next to a reading file, shared between processes
+
+    Uses flock, so it only coordinates processes that take the same lock and does nothing
+    where fcntl isn't available. Callers within one process must already be serialized,
+    since the lock is held by the open file rather than by a thread. """
+
+    FILE_SUFFIX = ".lock"
+
+    def __init__(self, filename):
+        """ Initializes the lock for the given reading file, the lock file is opened on first use """
+
+        self._filename = filename + FileLock.FILE_SUFFIX
+        self._lock_file = None
+
+    def get_filename(self):
+        """ Getter for the lock file name """
+
+        return self._filename
+
+    @contextlib.contextmanager
+    def shared(self):
+        """ Holds a shared lock for the duration of a with block, for reading the file """
+
+        with self._locked(None if fcntl is None else fcntl.LOCK_SH):
+            yield
+
+    @contextlib.contextmanager
+    def exclusive(self):
+        """ Holds an exclusive lock for the duration of a with block, for changing the file """
+
+        with self._locked(None if fcntl is None else fcntl.LOCK_EX):
+            yield
+
+    def close(self):
+        """ Closes the lock file """
+
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+    @contextlib.contextmanager
+    def _locked(self, operation):
+        """ Holds a flock of the given kind for the duration of a with block """
+
+        if operation is None:
+            yield
+            return
+
+        if self._lock_file is None:
+            self._lock_file = open(self._filename, "a")
+
+        fcntl.flock(self._lock_file.fileno(), operation)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
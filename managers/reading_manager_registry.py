@@ -0,0 +1,85 @@
+import threading
+
+class ReadingManagerRegistry:
+    """ Process-wide registry of long-lived reading managers, one per csv file """
+
+    MANAGER_CLASS = "Manager Class"
+    FILENAME = "File Name"
+
+    def __init__(self):
+        """ Initializes an empty registry """
+
+        self._managers = {}
+        # Guards the dictionaries and counters only, so a slow manager never holds up the others
+        self._lock = threading.Lock()
+        # Held while a manager is created or reloaded, one per file
+        self._load_locks = {}
+        self._hits = 0
+        self._misses = 0
+        self._reloads = 0
+        self._refreshes = 0
+
+    def get_manager(self, manager_class, filename, **options):
+        """ Returns the cached manager for the file, catching it up if the file changed on disk
+
+        A manager loads only what other processes appended since it last read the file, and is
+        reloaded if the file was replaced or shrunk. Options are passed to the manager constructor
+        when it is created or reloaded """
+
+        if manager_class is None:
+            raise ValueError(ReadingManagerRegistry.MANAGER_CLASS + " cannot be undefined.")
+        if not filename:
+            raise ValueError(ReadingManagerRegistry.FILENAME + " cannot be empty.")
+
+        key = (manager_class, filename)
+        with self._lock:
+            manager = self._managers.get(key)
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        # is_stale waits for a write in progress on the manager, so it is checked outside the registry lock
+        if manager is not None and not manager.is_stale():
+            with self._lock:
+                self._hits += 1
+            return manager
+
+        with load_lock:
+            with self._lock:
+                current = self._managers.get(key)
+            if current is not None and not current.is_stale():
+                # Another thread caught up or reloaded the manager while this one waited
+                with self._lock:
+                    self._hits += 1
+                return current
+
+            if current is not None and current.refresh():
+                with self._lock:
+                    self._refreshes += 1
+                return current
+
+            reloaded = manager_class(filename, **options)
+            with self._lock:
+                if current is None:
+                    self._misses += 1
+                else:
+                    self._reloads += 1
+                self._managers[key] = reloaded
+
+        return reloaded
+
+    def clear(self):
+        """ Drops all cached managers so the next lookup reloads from disk """
+
+        with self._lock:
+            self._managers.clear()
+
+    def get_stats(self):
+        """ Returns the hit, miss, refresh and reload counters """
+
+        with self._lock:
+            return {
+                "managers": len(self._managers),
+                "hits": self._hits,
+                "misses": self._misses,
+                "reloads": self._reloads,
+                "refreshes": self._refreshes
+            }
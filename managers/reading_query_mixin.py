@@ -0,0 +1,32 @@
+from managers.reading_stats import ReadingStats
+import itertools
+
+class ReadingQueryMixin:
+    """ Read API shared by the reading managers, built on their get_readings_after and get_readings_between
+
+    Managers with a faster way to answer one of these queries override it. """
+
+    PAGE_SIZE = 1000
+
+    def get_all_readings(self):
+        """ Returns a list of all readings """
+
+        return self.get_readings_after(0)
+
+    def get_stats(self, bucket, start=None, end=None):
+        """ Returns min/avg/max/range and error counts per minute, hour or day bucket within a time range """
+
+        ReadingStats.validate_bucket(bucket)
+        readings = self.get_readings_between(start, end)
+        buckets = itertools.groupby(readings, lambda reading: ReadingStats.get_bucket_start(reading.get_timestamp(), bucket))
+        return [ReadingStats.aggregate(bucket_start, list(bucket_readings)) for bucket_start, bucket_readings in buckets]
+
+    def iter_readings(self, seq_num=0, page_size=PAGE_SIZE):
+        """ Yields readings after seq_num one page at a time, so changes while iterating are safe """
+
+        while True:
+            readings = self.get_readings_after(seq_num, page_size)
+            yield from readings
+            if len(readings) < page_size:
+                return
+            seq_num = readings[-1].get_sequence_num()
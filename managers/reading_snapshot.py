@@ -0,0 +1,91 @@
+from array import array
+import datetime
+import os
+import struct
+
+class ReadingSnapshot:
+    """ Binary snapshot of the readings parsed from a csv file, kept next to it for fast restarts
+
+    The snapshot records the size and CRC-32 of the csv bytes it was built from. It can be
+    used as long as the csv still starts with exactly those bytes, in which case only rows
+    appended since then have to be parsed. """
+
+    FILE_SUFFIX = ".snap"
+    TEMP_FILE_SUFFIX = ".tmp"
+    # Magic, csv size, csv CRC-32, reading count and string table size
+    HEADER = struct.Struct("<4sQIQQ")
+    MAGIC = b"RSN1"
+    EPOCH = datetime.datetime(1970, 1, 1)
+    ONE_MICROSECOND = datetime.timedelta(microseconds=1)
+
+    def __init__(self, filename):
+        """ Initializes the snapshot for the given csv file """
+
+        self._filename = filename + ReadingSnapshot.FILE_SUFFIX
+
+    def get_filename(self):
+        """ Getter for the snapshot file name """
+
+        return self._filename
+
+    def read(self, reading_class):
+        """ Returns (csv size, csv CRC-32, readings) from the snapshot, None if there is no usable snapshot
+
+        The readings are built as reading_class objects, in the order they were saved """
+
+        try:
+            with open(self._filename, "rb") as snapshot_file:
+                header = snapshot_file.read(ReadingSnapshot.HEADER.size)
+                magic, csv_size, csv_crc, count, strings_size = ReadingSnapshot.HEADER.unpack(header)
+                if magic != ReadingSnapshot.MAGIC:
+                    return None
+
+                strings = snapshot_file.read(strings_size).decode().split("\n")
+                columns = [array(type_code) for type_code in "qqdddLL"]
+                for column in columns:
+                    column.fromfile(snapshot_file, count)
+        except (OSError, EOFError, struct.error, UnicodeDecodeError):
+            return None
+
+        seq_nums, timestamps, mins, avgs, maxs, models, statuses = columns
+        epoch = ReadingSnapshot.EPOCH
+        one_microsecond = ReadingSnapshot.ONE_MICROSECOND
+        create_reading = reading_class.from_trusted_values
+        readings = [create_reading(epoch + one_microsecond * timestamps[i], seq_nums[i], strings[models[i]],
+                                   mins[i], avgs[i], maxs[i], strings[statuses[i]]) for i in range(count)]
+
+        return csv_size, csv_crc, readings
+
+    def write(self, csv_size, csv_crc, readings):
+        """ Saves readings parsed from the first csv_size bytes of the csv file, skipped if the directory is read-only """
+
+        strings = []
+        string_codes = {}
+        columns = [array(type_code) for type_code in "qqdddLL"]
+        for reading in readings:
+            row = (reading.get_sequence_num(),
+                   (reading.get_timestamp() - ReadingSnapshot.EPOCH) // ReadingSnapshot.ONE_MICROSECOND,
+                   reading.get_min_value(), reading.get_avg_value(), reading.get_max_value(),
+                   reading.get_sensor_model(), reading.get_status())
+            for i, value in enumerate(row):
+                if i >= 5:
+                    code = string_codes.get(value)
+                    if code is None:
+                        code = string_codes[value] = len(strings)
+                        strings.append(value)
+                    value = code
+                columns[i].append(value)
+
+        # Models and statuses come from single csv lines, so they never hold a newline
+        string_table = "\n".join(strings).encode()
+        temp_filename = self._filename + ReadingSnapshot.TEMP_FILE_SUFFIX
+        try:
+            with open(temp_filename, "wb") as snapshot_file:
+                snapshot_file.write(ReadingSnapshot.HEADER.pack(ReadingSnapshot.MAGIC, csv_size, csv_crc,
+                                                                len(columns[0]), len(string_table)))
+                snapshot_file.write(string_table)
+                for column in columns:
+                    column.tofile(snapshot_file)
+            os.replace(temp_filename, self._filename)
+        except OSError:
+            pass
@@ -0,0 +1,52 @@
+import datetime
+
+class ReadingStats:
+    """ Per-bucket aggregates of sensor readings """
+
+    MINUTE = "minute"
+    HOUR = "hour"
+    DAY = "day"
+    BUCKET_SIZES = {
+        MINUTE: datetime.timedelta(minutes=1),
+        HOUR: datetime.timedelta(hours=1),
+        DAY: datetime.timedelta(days=1)
+    }
+
+    @staticmethod
+    def validate_bucket(bucket):
+        """ Raises ValueError if the bucket is not minute, hour or day """
+
+        if bucket not in ReadingStats.BUCKET_SIZES:
+            raise ValueError("Bucket must be one of " + ", ".join(ReadingStats.BUCKET_SIZES))
+
+    @staticmethod
+    def get_bucket_start(timestamp, bucket):
+        """ Returns the start of the bucket the timestamp falls in """
+
+        if bucket == ReadingStats.MINUTE:
+            return timestamp.replace(second=0, microsecond=0)
+        if bucket == ReadingStats.HOUR:
+            return timestamp.replace(minute=0, second=0, microsecond=0)
+
+        return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    @staticmethod
+    def aggregate(bucket_start, readings):
+        """ Returns the count, min, avg, max, range and error count of the readings in a bucket """
+
+        # One pass per column so the builtins do the arithmetic instead of a Python loop per value
+        mins = [reading.get_min_value() for reading in readings]
+        avgs = [reading.get_avg_value() for reading in readings]
+        maxs = [reading.get_max_value() for reading in readings]
+        min_value = min(mins)
+        max_value = max(maxs)
+
+        return {
+            "bucket_start": str(bucket_start),
+            "count": len(readings),
+            "min": min_value,
+            "avg": sum(avgs) / len(avgs),
+            "max": max_value,
+            "range": max_value - min_value,
+            "error_count": sum(1 for reading in readings if reading.is_error())
+        }
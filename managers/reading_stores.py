@@ -0,0 +1,574 @@
+from array import array
+import bisect
+import datetime
+import heapq
+import mmap
+import os
+import struct
+import zlib
+
+class ObjectReadingStore:
+    """ In-memory reading store keeping every reading as an object, keyed by sequence number """
+
+    def __init__(self):
+        """ Initializes an empty store """
+
+        # Insertion order follows sequence number order, since new readings always get the next number
+        self._readings = {}
+        # False once a reading is put out of order, values() then restores the order
+        self._ordered = True
+        # Sorted sequence numbers for paging, built on first use and kept in step after that
+        self._seq_nums = None
+
+    def load(self, readings):
+        """ Replaces the contents of the store, later readings win on duplicate sequence numbers """
+
+        readings = sorted(readings, key=lambda reading: reading.get_sequence_num())
+        self._readings = {reading.get_sequence_num(): reading for reading in readings}
+        self._ordered = True
+        self._seq_nums = None
+
+    def get(self, seq_num):
+        """ Returns the reading with the sequence number, None if not found """
+
+        return self._readings.get(seq_num)
+
+    def put(self, reading):
+        """ Adds or replaces a reading, returns the reading it replaced (or None) """
+
+        seq_num = reading.get_sequence_num()
+        old_reading = self._readings.get(seq_num)
+        if old_reading is None and self._readings and seq_num < next(reversed(self._readings)):
+            self._ordered = False
+            if self._seq_nums is not None:
+                bisect.insort(self._seq_nums, seq_num)
+        elif old_reading is None and self._seq_nums is not None:
+            self._seq_nums.append(seq_num)
+
+        self._readings[seq_num] = reading
+
+        return old_reading
+
+    def remove(self, seq_num):
+        """ Removes a reading, returns it (or None if not found) """
+
+        reading = self._readings.pop(seq_num, None)
+        if reading is not None and self._seq_nums is not None:
+            del self._seq_nums[bisect.bisect_left(self._seq_nums, seq_num)]
+
+        return reading
+
+    def values(self):
+        """ Returns the readings in sequence number order """
+
+        if not self._ordered:
+            self._readings = dict(sorted(self._readings.items()))
+            self._ordered = True
+
+        return self._readings.values()
+
+    def get_after(self, seq_num, limit=None):
+        """ Returns up to limit readings with a sequence number greater than seq_num """
+
+        if self._seq_nums is None:
+            self._seq_nums = sorted(self._readings)
+
+        start = bisect.bisect_right(self._seq_nums, seq_num)
+        end = len(self._seq_nums) if limit is None else start + limit
+        return [self._readings[s] for s in self._seq_nums[start:end]]
+
+    def get_many(self, seq_nums):
+        """ Returns the readings for a list of sequence numbers """
+
+        return [self._readings[s] for s in seq_nums]
+
+    def iter_timestamp_entries(self):
+        """ Yields (timestamp, sequence number) for every reading """
+
+        for seq_num, reading in self._readings.items():
+            yield reading.get_timestamp(), seq_num
+
+    def get_last_seq_num(self):
+        """ Returns the highest sequence number in the store (0 if empty) """
+
+        return max(self._readings, default=0)
+
+    def __contains__(self, seq_num):
+        """ Returns True if the store holds the sequence number """
+
+        return seq_num in self._readings
+
+    def __len__(self):
+        """ Returns the number of readings """
+
+        return len(self._readings)
+
+
+class ColumnarReadingStore:
+    """ In-memory reading store keeping readings in typed arrays, one per field
+
+    Timestamps are int64 microseconds since the epoch, min/avg/max are float64 and
+    model/status are codes into a table of interned strings. Reading objects are
+    only built when a reading is handed out. """
+
+    EPOCH = datetime.datetime(1970, 1, 1)
+    ONE_MICROSECOND = datetime.timedelta(microseconds=1)
+    # Deleted rows are dropped from the arrays once they make up this share of them
+    COMPACT_RATIO = 0.5
+
+    def __init__(self, reading_class):
+        """ Initializes an empty store building readings of the given class """
+
+        self._reading_class = reading_class
+        self._strings = []
+        self._string_codes = {}
+        self._clear()
+
+    def load(self, readings):
+        """ Replaces the contents of the store, later readings win on duplicate sequence numbers """
+
+        self._clear()
+        for reading in readings:
+            self._append(reading)
+
+        if any(self._seq_nums[i] >= self._seq_nums[i + 1] for i in range(len(self._seq_nums) - 1)):
+            self._sort()
+
+    def get(self, seq_num):
+        """ Returns the reading with the sequence number, None if not found """
+
+        i = self._find(seq_num)
+        return None if i < 0 else self._build_reading(i)
+
+    def put(self, reading):
+        """ Adds or replaces a reading, returns the reading it replaced (or None) """
+
+        seq_num = reading.get_sequence_num()
+        i = bisect.bisect_left(self._seq_nums, seq_num)
+
+        if i == len(self._seq_nums):
+            self._append(reading)
+            return None
+
+        if self._seq_nums[i] != seq_num:
+            self._insert(i, reading)
+            return None
+
+        old_reading = None if self._deleted[i] else self._build_reading(i)
+        if self._deleted[i]:
+            self._deleted[i] = 0
+            self._deleted_count -= 1
+        self._set_row(i, reading)
+        return old_reading
+
+    def remove(self, seq_num):
+        """ Removes a reading, returns it (or None if not found) """
+
+        i = self._find(seq_num)
+        if i < 0:
+            return None
+
+        reading = self._build_reading(i)
+        self._deleted[i] = 1
+        self._deleted_count += 1
+        if self._deleted_count > len(self._seq_nums) * ColumnarReadingStore.COMPACT_RATIO:
+            self._compact()
+
+        return reading
+
+    def values(self):
+        """ Yields the readings in sequence number order """
+
+        for i in range(len(self._seq_nums)):
+            if not self._deleted[i]:
+                yield self._build_reading(i)
+
+    def get_after(self, seq_num, limit=None):
+        """ Returns up to limit readings with a sequence number greater than seq_num """
+
+        readings = []
+        i = bisect.bisect_right(self._seq_nums, seq_num)
+        while i < len(self._seq_nums) and (limit is None or len(readings) < limit):
+            if not self._deleted[i]:
+                readings.append(self._build_reading(i))
+            i += 1
+
+        return readings
+
+    def get_many(self, seq_nums):
+        """ Returns the readings for a list of sequence numbers """
+
+        return [self.get(s) for s in seq_nums]
+
+    def iter_timestamp_entries(self):
+        """ Yields (timestamp, sequence number) for every reading """
+
+        for i in range(len(self._seq_nums)):
+            if not self._deleted[i]:
+                yield ColumnarReadingStore.EPOCH + ColumnarReadingStore.ONE_MICROSECOND * self._timestamps[i], self._seq_nums[i]
+
+    def get_last_seq_num(self):
+        """ Returns the highest sequence number in the store (0 if empty) """
+
+        for i in range(len(self._seq_nums) - 1, -1, -1):
+            if not self._deleted[i]:
+                return self._seq_nums[i]
+
+        return 0
+
+    def __contains__(self, seq_num):
+        """ Returns True if the store holds the sequence number """
+
+        return self._find(seq_num) >= 0
+
+    def __len__(self):
+        """ Returns the number of readings """
+
+        return len(self._seq_nums) - self._deleted_count
+
+    def _clear(self):
+        """ Empties all the columns """
+
+        self._seq_nums = array("q")
+        self._timestamps = array("q")
+        self._mins = array("d")
+        self._avgs = array("d")
+        self._maxs = array("d")
+        self._models = array("L")
+        self._statuses = array("L")
+        self._deleted = bytearray()
+        self._deleted_count = 0
+
+    def _find(self, seq_num):
+        """ Returns the row of the sequence number, -1 if not found """
+
+        i = bisect.bisect_left(self._seq_nums, seq_num)
+        if i < len(self._seq_nums) and self._seq_nums[i] == seq_num and not self._deleted[i]:
+            return i
+
+        return -1
+
+    def _get_code(self, value):
+        """ Returns the code of an interned model or status string """
+
+        code = self._string_codes.get(value)
+        if code is None:
+            code = len(self._strings)
+            self._strings.append(value)
+            self._string_codes[value] = code
+
+        return code
+
+    def _to_row(self, reading):
+        """ Returns the column values of a reading """
+
+        timestamp = (reading.get_timestamp() - ColumnarReadingStore.EPOCH) // ColumnarReadingStore.ONE_MICROSECOND
+        return (reading.get_sequence_num(), timestamp, reading.get_min_value(), reading.get_avg_value(),
+                reading.get_max_value(), self._get_code(reading.get_sensor_model()), self._get_code(reading.get_status()))
+
+    def _columns(self):
+        """ Returns the typed columns in row order """
+
+        return (self._seq_nums, self._timestamps, self._mins, self._avgs, self._maxs, self._models, self._statuses)
+
+    def _append(self, reading):
+        """ Appends a reading as the last row """
+
+        for column, value in zip(self._columns(), self._to_row(reading)):
+            column.append(value)
+        self._deleted.append(0)
+
+    def _insert(self, i, reading):
+        """ Inserts a reading before row i """
+
+        for column, value in zip(self._columns(), self._to_row(reading)):
+            column.insert(i, value)
+        self._deleted.insert(i, 0)
+
+    def _set_row(self, i, reading):
+        """ Overwrites row i with a reading """
+
+        for column, value in zip(self._columns(), self._to_row(reading)):
+            column[i] = value
+
+    def _build_reading(self, i):
+        """ Builds the reading object for row i """
+
+        timestamp = ColumnarReadingStore.EPOCH + ColumnarReadingStore.ONE_MICROSECOND * self._timestamps[i]
+        return self._reading_class.from_trusted_values(timestamp, self._seq_nums[i], self._strings[self._models[i]],
+                                                       self._mins[i], self._avgs[i], self._maxs[i],
+                                                       self._strings[self._statuses[i]])
+
+    def _keep_rows(self, rows):
+        """ Rebuilds every column keeping only the given rows, in that order """
+
+        columns = self._columns()
+        self._clear()
+        for old_column, new_column in zip(columns, self._columns()):
+            new_column.extend(old_column[i] for i in rows)
+        self._deleted = bytearray(len(self._seq_nums))
+
+    def _sort(self):
+        """ Sorts the rows by sequence number, later rows win on duplicates """
+
+        order = sorted(range(len(self._seq_nums)), key=self._seq_nums.__getitem__)
+        rows = []
+        for i in order:
+            if rows and self._seq_nums[rows[-1]] == self._seq_nums[i]:
+                rows[-1] = i
+            else:
+                rows.append(i)
+        self._keep_rows(rows)
+
+    def _compact(self):
+        """ Drops deleted rows from the columns """
+
+        self._keep_rows([i for i in range(len(self._seq_nums)) if not self._deleted[i]])
+
+
+class LazyReadingStore:
+    """ Reading store serving a memory-mapped csv file, parsing rows only when they are asked for
+
+    An index of sequence numbers to byte offsets is built on the first load and kept in a
+    sidecar file next to the csv, so later loads only map the file and check the CRC-32 of
+    the indexed bytes if rows were appended since. Added, updated and
+    deleted readings are held in memory on top of the mapped rows, which suits read-mostly
+    managers: the csv on disk is still written as usual. """
+
+    INDEX_FILE_SUFFIX = ".idx"
+    # Magic, csv inode, csv size, csv modification time, CRC-32 of the indexed csv bytes and row count
+    INDEX_HEADER = struct.Struct("<4sqqqIq")
+    INDEX_MAGIC = b"RIX2"
+
+    def __init__(self, load_row, seq_num_index):
+        """ Initializes an empty store, load_row turns a csv line into a reading """
+
+        self._load_row = load_row
+        self._seq_num_index = seq_num_index
+        self._clear()
+
+    def map_file(self, filename):
+        """ Maps the csv file and loads or builds its offset index, without parsing any reading """
+
+        self._clear()
+        with open(filename, "rb") as csv_file:
+            file_stat = os.fstat(csv_file.fileno())
+            if file_stat.st_size:
+                self._map = mmap.mmap(csv_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        index_filename = filename + LazyReadingStore.INDEX_FILE_SUFFIX
+        indexed_size, crc = self._read_index(index_filename, file_stat)
+        if indexed_size != file_stat.st_size:
+            self._index_rows(indexed_size)
+            self._write_index(index_filename, file_stat, self._checksum(indexed_size, file_stat.st_size, crc))
+
+    def load(self, readings):
+        """ Replaces the contents of the store with readings held in memory """
+
+        self._clear()
+        for reading in readings:
+            self._changes[reading.get_sequence_num()] = reading
+
+    def get(self, seq_num):
+        """ Returns the reading with the sequence number, None if not found """
+
+        if seq_num in self._changes:
+            return self._changes[seq_num]
+
+        i = bisect.bisect_left(self._seq_nums, seq_num)
+        if i < len(self._seq_nums) and self._seq_nums[i] == seq_num:
+            return self._load_row(self._read_line(self._offsets[i]))
+
+        return None
+
+    def put(self, reading):
+        """ Adds or replaces a reading, returns the reading it replaced (or None) """
+
+        seq_num = reading.get_sequence_num()
+        old_reading = self.get(seq_num)
+        self._changes[seq_num] = reading
+        return old_reading
+
+    def remove(self, seq_num):
+        """ Removes a reading, returns it (or None if not found) """
+
+        reading = self.get(seq_num)
+        if reading is not None:
+            self._changes[seq_num] = None
+
+        return reading
+
+    def values(self):
+        """ Yields the readings in sequence number order """
+
+        for seq_num in self._iter_seq_nums():
+            yield self.get(seq_num)
+
+    def get_after(self, seq_num, limit=None):
+        """ Returns up to limit readings with a sequence number greater than seq_num """
+
+        readings = []
+        for s in self._iter_seq_nums(seq_num):
+            if limit is not None and len(readings) >= limit:
+                break
+            readings.append(self.get(s))
+
+        return readings
+
+    def get_many(self, seq_nums):
+        """ Returns the readings for a list of sequence numbers """
+
+        return [self.get(s) for s in seq_nums]
+
+    def iter_timestamp_entries(self):
+        """ Yields (timestamp, sequence number) for every reading, parsing every row """
+
+        for reading in self.values():
+            yield reading.get_timestamp(), reading.get_sequence_num()
+
+    def get_last_seq_num(self):
+        """ Returns the highest sequence number in the store (0 if empty) """
+
+        last_seq_num = max((s for s, reading in self._changes.items() if reading is not None), default=0)
+        for i in range(len(self._seq_nums) - 1, -1, -1):
+            if self._seq_nums[i] <= last_seq_num:
+                break
+            if self._changes.get(self._seq_nums[i], True) is not None:
+                return self._seq_nums[i]
+
+        return last_seq_num
+
+    def __contains__(self, seq_num):
+        """ Returns True if the store holds the sequence number """
+
+        if seq_num in self._changes:
+            return self._changes[seq_num] is not None
+
+        return self._is_mapped(seq_num)
+
+    def __len__(self):
+        """ Returns the number of readings """
+
+        count = len(self._seq_nums)
+        for seq_num, reading in self._changes.items():
+            count += (reading is not None) - self._is_mapped(seq_num)
+
+        return count
+
+    def _clear(self):
+        """ Drops the mapping, the index and the in-memory changes """
+
+        self._map = None
+        self._seq_nums = array("q")
+        self._offsets = array("q")
+        # Readings added or updated since the file was mapped, None for deleted ones
+        self._changes = {}
+
+    def _is_mapped(self, seq_num):
+        """ Returns True if the mapped file has a row for the sequence number """
+
+        i = bisect.bisect_left(self._seq_nums, seq_num)
+        return i < len(self._seq_nums) and self._seq_nums[i] == seq_num
+
+    def _iter_seq_nums(self, after=None):
+        """ Yields the sequence numbers held by the store in ascending order, starting after a sequence number """
+
+        start = 0 if after is None else bisect.bisect_right(self._seq_nums, after)
+        mapped = (self._seq_nums[i] for i in range(start, len(self._seq_nums)))
+        changed = sorted(s for s in self._changes if after is None or s > after)
+
+        previous = None
+        for seq_num in heapq.merge(mapped, changed):
+            if seq_num != previous and self._changes.get(seq_num, True) is not None:
+                yield seq_num
+            previous = seq_num
+
+    def _read_line(self, offset):
+        """ Returns the decoded csv line starting at a byte offset of the mapped file """
+
+        end = self._map.find(b"\n", offset)
+        if end < 0:
+            end = len(self._map)
+
+        return self._map[offset:end].rstrip(b"\r").decode()
+
+    def _index_rows(self, offset):
+        """ Adds the rows from a byte offset to the end of the mapped file to the index """
+
+        seq_num_index = self._seq_num_index
+        seq_nums = self._seq_nums
+        offsets = self._offsets
+        in_order = True
+
+        if self._map is not None:
+            self._map.seek(offset)
+            for line in iter(self._map.readline, b""):
+                if line.strip():
+                    try:
+                        seq_num = int(line.split(b",", seq_num_index + 1)[seq_num_index])
+                    except (IndexError, ValueError):
+                        raise ValueError("Invalid data entry")
+                    if seq_nums and seq_num <= seq_nums[-1]:
+                        in_order = False
+                    seq_nums.append(seq_num)
+                    offsets.append(offset)
+                offset += len(line)
+
+        if not in_order:
+            # Later rows win on duplicate sequence numbers, like a full load
+            rows = {}
+            for seq_num, row_offset in zip(seq_nums, offsets):
+                rows[seq_num] = row_offset
+            self._seq_nums = array("q", sorted(rows))
+            self._offsets = array("q", (rows[s] for s in self._seq_nums))
+
+    def _read_index(self, index_filename, file_stat):
+        """ Loads the sidecar index, returns the csv size it covers and the CRC-32 of those bytes ((0, 0) if it can't be used) """
+
+        try:
+            with open(index_filename, "rb") as index_file:
+                header = index_file.read(LazyReadingStore.INDEX_HEADER.size)
+                magic, inode, size, mtime_ns, crc, count = LazyReadingStore.INDEX_HEADER.unpack(header)
+                if magic != LazyReadingStore.INDEX_MAGIC or inode != file_stat.st_ino or size > file_stat.st_size:
+                    return 0, 0
+                if size == file_stat.st_size and mtime_ns != file_stat.st_mtime_ns:
+                    return 0, 0
+                # A larger file of the same inode keeps the indexed rows only if it was appended to, not edited in place
+                if size < file_stat.st_size and self._checksum(0, size) != crc:
+                    return 0, 0
+
+                seq_nums = array("q")
+                offsets = array("q")
+                seq_nums.fromfile(index_file, count)
+                offsets.fromfile(index_file, count)
+        except (OSError, EOFError, struct.error):
+            return 0, 0
+
+        self._seq_nums = seq_nums
+        self._offsets = offsets
+        return size, crc
+
+    def _checksum(self, start, end, crc=0):
+        """ Returns the CRC-32 of the mapped bytes from start to end, continuing from crc """
+
+        if self._map is None or start >= end:
+            return crc
+
+        with memoryview(self._map) as data:
+            with data[start:end] as block:
+                return zlib.crc32(block, crc)
+
+    def _write_index(self, index_filename, file_stat, crc):
+        """ Saves the index next to the csv file, skipped if the directory is read-only """
+
+        temp_filename = index_filename + ".tmp"
+        try:
+            with open(temp_filename, "wb") as index_file:
+                index_file.write(LazyReadingStore.INDEX_HEADER.pack(LazyReadingStore.INDEX_MAGIC, file_stat.st_ino,
+                                                                    file_stat.st_size, file_stat.st_mtime_ns, crc,
+                                                                    len(self._seq_nums)))
+                self._seq_nums.tofile(index_file)
+                self._offsets.tofile(index_file)
+            os.replace(temp_filename, index_filename)
+        except OSError:
+            pass
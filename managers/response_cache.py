@@ -0,0 +1,115 @@
+import collections
+import os
+import threading
+import zlib
+
+class ResponseCache:
+    """ LRU cache of serialized responses, each valid for one version of its reading manager
+
+    Entries are looked up by a key naming the request (e.g. sensor type, route and query)
+    together with the manager's current version, so any change to the readings makes the
+    entries built before it miss. ETags are built from the version too, so a client that
+    already holds the response for the current version can be answered with 304.
+
+    The cache holds up to max_entries responses and max_bytes of response bodies. A response
+    larger than a fraction of max_bytes, such as a full unpaged listing, is not cached at all,
+    so it can't push out every other entry. """
+
+    MAX_ENTRIES = "Max Entries"
+    MAX_BYTES = "Max Bytes"
+    DEFAULT_MAX_ENTRIES = 1024
+    DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+    # Responses larger than max_bytes divided by this are not cached
+    MAX_RESPONSE_FRACTION = 16
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES):
+        """ Initializes an empty cache holding up to max_entries responses and max_bytes of their bodies """
+
+        if type(max_entries) != int or max_entries <= 0:
+            raise ValueError(ResponseCache.MAX_ENTRIES + " must be a positive integer")
+        if type(max_bytes) != int or max_bytes <= 0:
+            raise ValueError(ResponseCache.MAX_BYTES + " must be a positive integer")
+
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        # (version, response, size) by key, least recently used first
+        self._entries = collections.OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        # Versions restart with the process, so ETags carry a token of this cache to never match a previous run's
+        self._etag_prefix = os.urandom(4).hex()
+        self._hits = 0
+        self._misses = 0
+        self._not_modified = 0
+        self._evictions = 0
+        self._too_large = 0
+
+    def get_etag(self, version, variant=None):
+        """ Returns the entity tag (without quotes) of the responses built from a manager version, and of a variant (e.g. media type) if not the default """
+
+        etag = "%s-%x" % (self._etag_prefix, version)
+        if variant is not None:
+            etag += "-%08x" % zlib.crc32(variant.encode())
+
+        return etag
+
+    def record_not_modified(self):
+        """ Counts a request answered with 304 from its ETag """
+
+        with self._lock:
+            self._not_modified += 1
+
+    def get(self, key, version):
+        """ Returns the cached response for the key built from this version, None if there is none """
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[1]
+
+    def put(self, key, version, response, size=0):
+        """ Caches the response for the key built from a manager version, evicting the least recently used entries if full
+
+        size is the size of the response body in bytes. Responses too large to cache are dropped """
+
+        with self._lock:
+            old_entry = self._entries.pop(key, None)
+            if old_entry is not None:
+                self._bytes -= old_entry[2]
+            if size > self._max_bytes // ResponseCache.MAX_RESPONSE_FRACTION:
+                self._too_large += 1
+                return
+
+            self._entries[key] = (version, response, size)
+            self._bytes += size
+            while len(self._entries) > self._max_entries or self._bytes > self._max_bytes:
+                self._bytes -= self._entries.popitem(last=False)[1][2]
+                self._evictions += 1
+
+    def clear(self):
+        """ Drops all cached responses """
+
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def get_stats(self):
+        """ Returns the entry count and size, hit, miss, 304, eviction and too large counters and the hit rate """
+
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "not_modified": self._not_modified,
+                "evictions": self._evictions,
+                "too_large": self._too_large
+            }
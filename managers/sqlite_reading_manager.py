@@ -0,0 +1,239 @@
+from managers.abstract_reading_manager import AbstractReadingManager
+from managers.reading_query_mixin import ReadingQueryMixin
+import datetime
+import sqlite3
+import threading
+
+class SqliteReadingManager(ReadingQueryMixin):
+    """ Reading manager keeping the readings of one sensor type in a SQLite database
+
+    Offers the same API as the csv reading managers. The database runs in WAL mode, so
+    readers in other threads and processes are not blocked by a writer, and every change
+    is a single transaction. Readings are not held in memory, every call reads the database. """
+
+    FILENAME = "File Name"
+    READING_CLASS = "Reading Class"
+    EPOCH = datetime.datetime(1970, 1, 1)
+    ONE_MICROSECOND = datetime.timedelta(microseconds=1)
+
+    # Timestamps are stored as microseconds since the epoch so they sort and compare as integers
+    CREATE_SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS readings (seq_num INTEGER PRIMARY KEY, timestamp INTEGER NOT NULL, "
+        "sensor_model TEXT NOT NULL, min REAL NOT NULL, avg REAL NOT NULL, max REAL NOT NULL, status TEXT NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS readings_timestamp ON readings (timestamp, seq_num)",
+        "CREATE INDEX IF NOT EXISTS readings_status ON readings (status, timestamp, seq_num)",
+        # Highest sequence number ever handed out, so deleted numbers are never reused
+        "CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL)",
+        "INSERT OR IGNORE INTO meta (name, value) VALUES ('last_seq_num', 0)",
+        # Bumped by every write transaction, so every process sharing the database sees the same version
+        "INSERT OR IGNORE INTO meta (name, value) VALUES ('version', 0)")
+    # The statements are constants so each connection's statement cache keeps them prepared
+    COLUMNS = "timestamp, seq_num, sensor_model, min, avg, max, status"
+    INSERT_READING = "INSERT INTO readings (" + COLUMNS + ") VALUES (?, ?, ?, ?, ?, ?, ?)"
+    UPDATE_READING = "UPDATE readings SET timestamp = ?, sensor_model = ?, min = ?, avg = ?, max = ?, status = ? WHERE seq_num = ?"
+    DELETE_READING = "DELETE FROM readings WHERE seq_num = ?"
+    SELECT_READING = "SELECT " + COLUMNS + " FROM readings WHERE seq_num = ?"
+    SELECT_AFTER = "SELECT " + COLUMNS + " FROM readings WHERE seq_num > ? ORDER BY seq_num LIMIT ?"
+    SELECT_BETWEEN = "SELECT " + COLUMNS + " FROM readings WHERE timestamp BETWEEN ? AND ? ORDER BY timestamp, seq_num"
+    SELECT_MODEL_BETWEEN = "SELECT " + COLUMNS + " FROM readings WHERE sensor_model = ? AND timestamp BETWEEN ? AND ? ORDER BY timestamp, seq_num"
+    SELECT_STATUS_BETWEEN = "SELECT " + COLUMNS + " FROM readings WHERE status = ? AND timestamp BETWEEN ? AND ? ORDER BY timestamp, seq_num"
+    SELECT_ANY = "SELECT EXISTS (SELECT 1 FROM readings)"
+    SELECT_LAST_SEQ_NUM = "SELECT MAX(value, IFNULL((SELECT MAX(seq_num) FROM readings), 0)) FROM meta WHERE name = 'last_seq_num'"
+    UPDATE_LAST_SEQ_NUM = "UPDATE meta SET value = ? WHERE name = 'last_seq_num'"
+    SELECT_VERSION = "SELECT value FROM meta WHERE name = 'version'"
+    UPDATE_VERSION = "UPDATE meta SET value = value + 1 WHERE name = 'version'"
+    # Bounds of the timestamp column used for open-ended ranges
+    MIN_TIMESTAMP = -2 ** 63
+    MAX_TIMESTAMP = 2 ** 63 - 1
+
+    def __init__(self, filename, reading_class):
+        """ Initializes the reading manager, creating the database if it doesn't exist """
+
+        AbstractReadingManager._validate_string_input(SqliteReadingManager.FILENAME, filename)
+        if reading_class is None:
+            raise ValueError(SqliteReadingManager.READING_CLASS + " cannot be undefined.")
+        self._filename = filename
+        self._reading_class = reading_class
+        # SQLite connections can't be shared between threads, so each thread opens its own
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+        connection = self._get_connection()
+        connection.execute("PRAGMA journal_mode = WAL")
+        for statement in SqliteReadingManager.CREATE_SCHEMA:
+            connection.execute(statement)
+
+    def add_reading(self, reading):
+        """ Adds reading to the database """
+
+        if not reading or reading.__class__ != self._reading_class:
+            return None
+
+        def insert(connection):
+            last_seq_num = max(connection.execute(SqliteReadingManager.SELECT_LAST_SEQ_NUM).fetchone()[0],
+                               reading.get_sequence_num()) + 1
+            reading.set_sequence_num(last_seq_num)
+            connection.execute(SqliteReadingManager.INSERT_READING, self._to_row(reading))
+            connection.execute(SqliteReadingManager.UPDATE_LAST_SEQ_NUM, (last_seq_num,))
+
+        self._write(insert)
+
+    def add_readings(self, readings):
+        """ Adds a batch of readings with a contiguous block of sequence numbers in one transaction, returns how many were added
+
+        Entries that are not readings of this manager's type are skipped, like the csv reading managers do """
+
+        if not readings:
+            return None
+
+        readings = AbstractReadingManager._filter_readings(readings, self._reading_class)
+        if not readings:
+            return 0
+
+        def insert(connection):
+            first_seq_num = connection.execute(SqliteReadingManager.SELECT_LAST_SEQ_NUM).fetchone()[0] + 1
+            for seq_num, reading in enumerate(readings, first_seq_num):
+                reading.set_sequence_num(seq_num)
+            connection.executemany(SqliteReadingManager.INSERT_READING, map(self._to_row, readings))
+            connection.execute(SqliteReadingManager.UPDATE_LAST_SEQ_NUM, (first_seq_num + len(readings) - 1,))
+
+        self._write(insert)
+        return len(readings)
+
+    def update_reading(self, reading):
+        """ Updates reading in the database """
+
+        if reading.__class__ != self._reading_class:
+            return None
+
+        def update(connection):
+            if not connection.execute(SqliteReadingManager.SELECT_ANY).fetchone()[0]:
+                return None
+
+            timestamp, seq_num, sensor_model, min, avg, max, status = self._to_row(reading)
+            return connection.execute(SqliteReadingManager.UPDATE_READING,
+                                      (timestamp, sensor_model, min, avg, max, status, seq_num)).rowcount
+
+        return self._write(update)
+
+    def delete_reading(self, seq_num):
+        """ Deletes reading from the database """
+
+        AbstractReadingManager._validate_int(AbstractReadingManager.SEQ_NUM, seq_num)
+        return self._write(lambda connection: connection.execute(SqliteReadingManager.DELETE_READING, (seq_num,)).rowcount)
+
+    def get_reading(self, seq_num):
+        """ Returns reading that matches sequence number, None if not found """
+
+        AbstractReadingManager._validate_int(AbstractReadingManager.SEQ_NUM, seq_num)
+        row = self._get_connection().execute(SqliteReadingManager.SELECT_READING, (seq_num,)).fetchone()
+        return None if row is None else self._to_reading(row)
+
+    def get_readings_after(self, seq_num, limit=None):
+        """ Returns up to limit readings with a sequence number greater than seq_num, in order """
+
+        AbstractReadingManager._validate_int(AbstractReadingManager.SEQ_NUM, seq_num)
+        if limit is not None:
+            AbstractReadingManager._validate_int(AbstractReadingManager.LIMIT, limit)
+
+        # A negative LIMIT means no limit in SQLite
+        rows = self._get_connection().execute(SqliteReadingManager.SELECT_AFTER, (seq_num, -1 if limit is None else limit))
+        return [self._to_reading(row) for row in rows]
+
+    def get_readings_between(self, start=None, end=None, model=None):
+        """ Returns the readings with start <= timestamp <= end in timestamp order (None leaves a side open), optionally of one sensor model """
+
+        start = SqliteReadingManager.MIN_TIMESTAMP if start is None else self._to_microseconds(start)
+        end = SqliteReadingManager.MAX_TIMESTAMP if end is None else self._to_microseconds(end)
+        if model is None:
+            rows = self._get_connection().execute(SqliteReadingManager.SELECT_BETWEEN, (start, end))
+        else:
+            rows = self._get_connection().execute(SqliteReadingManager.SELECT_MODEL_BETWEEN, (model, start, end))
+        return [self._to_reading(row) for row in rows]
+
+    def get_error_readings(self, start=None, end=None, status=None):
+        """ Returns the error readings with start <= timestamp <= end in timestamp order, optionally only those with a status
+
+        A status is looked up in the status index, otherwise which statuses are errors is up to
+        the reading class, so the readings in the range are read and filtered. """
+
+        if status is None:
+            return [reading for reading in self.get_readings_between(start, end) if reading.is_error()]
+
+        start = SqliteReadingManager.MIN_TIMESTAMP if start is None else self._to_microseconds(start)
+        end = SqliteReadingManager.MAX_TIMESTAMP if end is None else self._to_microseconds(end)
+        rows = self._get_connection().execute(SqliteReadingManager.SELECT_STATUS_BETWEEN, (status, start, end))
+        return [reading for reading in map(self._to_reading, rows) if reading.is_error()]
+
+    def get_version(self):
+        """ Returns a number that changes whenever the readings change, e.g. to validate cached responses """
+
+        return self._get_connection().execute(SqliteReadingManager.SELECT_VERSION).fetchone()[0]
+
+    def is_stale(self):
+        """ Returns False, every call reads the database so changes by others are always seen """
+
+        return False
+
+    def refresh(self):
+        """ Returns True, there is nothing to load since every call reads the database """
+
+        return True
+
+    def close(self):
+        """ Closes the database connections of every thread """
+
+        with self._lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections = []
+            self._local = threading.local()
+
+    def _get_connection(self):
+        """ Returns the database connection of the calling thread, opening it on first use """
+
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            # Autocommit, transactions are started explicitly by _write
+            connection = sqlite3.connect(self._filename, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA synchronous = NORMAL")
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+
+        return connection
+
+    def _write(self, operation):
+        """ Runs operation(connection) in a write transaction and returns its result """
+
+        connection = self._get_connection()
+        # IMMEDIATE takes the write lock up front, so the sequence number read inside can't go stale
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            result = operation(connection)
+            connection.execute(SqliteReadingManager.UPDATE_VERSION)
+        except:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+        return result
+
+    def _to_microseconds(self, timestamp):
+        """ Returns a timestamp as microseconds since the epoch """
+
+        return (timestamp - SqliteReadingManager.EPOCH) // SqliteReadingManager.ONE_MICROSECOND
+
+    def _to_row(self, reading):
+        """ Returns the column values of a reading """
+
+        return (self._to_microseconds(reading.get_timestamp()), reading.get_sequence_num(), reading.get_sensor_model(),
+                reading.get_min_value(), reading.get_avg_value(), reading.get_max_value(), reading.get_status())
+
+    def _to_reading(self, row):
+        """ Builds a reading from a row of column values """
+
+        timestamp, seq_num, sensor_model, min, avg, max, status = row
+        return self._reading_class.from_trusted_values(SqliteReadingManager.EPOCH + SqliteReadingManager.ONE_MICROSECOND * timestamp,
+                                                       seq_num, sensor_model, min, avg, max, status)
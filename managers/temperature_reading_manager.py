@@ -1,7 +1,6 @@
 from managers.abstract_reading_manager import AbstractReadingManager
+from managers.timestamp_parser import TimestampParser
 from readings.temperature_reading import TemperatureReading
-import datetime
-import csv
 
 class TemperatureReadingManager(AbstractReadingManager):
     """ Temperature Reading Manager """
@@ -13,23 +12,45 @@ class TemperatureReadingManager(AbstractReadingManager):
     AVG_INDEX = 4
     MAX_INDEX = 5
     STATUS_INDEX = 6
+    READING_CLASS = TemperatureReading
+    TIMESTAMP_PARSER = TimestampParser(TimestampParser.MICROSECOND_FORMAT)
 
     def _load_reading_row(self, row):
         """ Loads list into a TemperatureReading object """
         
+        return self._load_reading_rows([row])[0]
+
+    def _load_reading_rows(self, rows):
+        """ Loads a chunk of lists into TemperatureReading objects """
+
+        # Looked up once per chunk instead of once per row
+        parse_timestamp = TemperatureReadingManager.TIMESTAMP_PARSER.parse
+        create_reading = TemperatureReading.from_trusted_values
+        timestamp_index = TemperatureReadingManager.TIMESTAMP_INDEX
+        seq_num_index = TemperatureReadingManager.SEQ_NUM_INDEX
+        sensor_model_index = TemperatureReadingManager.SENSOR_MODEL_INDEX
+        min_index = TemperatureReadingManager.MIN_INDEX
+        avg_index = TemperatureReadingManager.AVG_INDEX
+        max_index = TemperatureReadingManager.MAX_INDEX
+        status_index = TemperatureReadingManager.STATUS_INDEX
+
+        temp_readings = []
         try:
-            reading_datetime = datetime.datetime.strptime(row[TemperatureReadingManager.TIMESTAMP_INDEX], "%Y-%m-%d %H:%M:%S.%f")
-            temp_reading = TemperatureReading(reading_datetime,
-                                int(row[TemperatureReadingManager.SEQ_NUM_INDEX]),
-                                row[TemperatureReadingManager.SENSOR_MODEL_INDEX],
-                                float(row[TemperatureReadingManager.MIN_INDEX]),
-                                float(row[TemperatureReadingManager.AVG_INDEX]),
-                                float(row[TemperatureReadingManager.MAX_INDEX]),
-                                row[TemperatureReadingManager.STATUS_INDEX])
+            for row in rows:
+                sensor_model = row[sensor_model_index]
+                status = row[status_index]
+                if not sensor_model or not status:
+                    raise ValueError("Invalid data entry")
+
+                # The parsed values already have the types the validators check for
+                temp_readings.append(create_reading(parse_timestamp(row[timestamp_index]),
+                                    int(row[seq_num_index]), sensor_model,
+                                    float(row[min_index]), float(row[avg_index]), float(row[max_index]),
+                                    status))
         except:
             raise ValueError("Invalid data entry")
 
-        return temp_reading
+        return temp_readings
     
     def _reading_to_list(self, reading):
         """ Returns reading object formated as a list of strings """
@@ -42,16 +63,3 @@ class TemperatureReadingManager(AbstractReadingManager):
             raise ValueError("Invalid data entry")
 
         return temp_reading
-
-
-    def _write_reading_row(self, reading):
-        """ Writes reading to a csv file """
-
-        if not reading:
-            raise ValueError("Invalid data entry")
-
-        temp_reading = self._reading_to_list(reading)
-        
-        with open(self._filename, "a") as csv_file:
-            writer = csv.writer(csv_file)
-            writer.writerow(temp_reading)
@@ -0,0 +1,70 @@
+import bisect
+
+class TimestampIndex:
+    """ Sorted index of reading timestamps to sequence numbers for range queries """
+
+    def __init__(self, entries=()):
+        """ Initializes the index from an iterable of (timestamp, sequence number) entries """
+
+        entries = sorted(entries)
+        self._timestamps = [entry[0] for entry in entries]
+        self._seq_nums = [entry[1] for entry in entries]
+
+    def add(self, timestamp, seq_num):
+        """ Adds an entry, appending in O(1) when readings arrive in time order """
+
+        if not self._timestamps or timestamp >= self._timestamps[-1]:
+            self._timestamps.append(timestamp)
+            self._seq_nums.append(seq_num)
+            return
+
+        i = bisect.bisect_right(self._timestamps, timestamp)
+        self._timestamps.insert(i, timestamp)
+        self._seq_nums.insert(i, seq_num)
+
+    def remove(self, timestamp, seq_num):
+        """ Removes the entry for the sequence number at the given timestamp """
+
+        i = bisect.bisect_left(self._timestamps, timestamp)
+        while i < len(self._timestamps) and self._timestamps[i] == timestamp:
+            if self._seq_nums[i] == seq_num:
+                del self._timestamps[i]
+                del self._seq_nums[i]
+                return
+            i += 1
+
+    def get_seq_nums_between(self, start=None, end=None):
+        """ Returns the sequence numbers with start <= timestamp <= end in timestamp order """
+
+        first = 0 if start is None else bisect.bisect_left(self._timestamps, start)
+        last = len(self._timestamps) if end is None else bisect.bisect_right(self._timestamps, end)
+        return self._seq_nums[first:last]
+
+    def get_entries_between(self, start=None, end=None):
+        """ Returns the (timestamp, sequence number) entries with start <= timestamp <= end in timestamp order """
+
+        first = 0 if start is None else bisect.bisect_left(self._timestamps, start)
+        last = len(self._timestamps) if end is None else bisect.bisect_right(self._timestamps, end)
+        return list(zip(self._timestamps[first:last], self._seq_nums[first:last]))
+
+    def iter_buckets(self, get_bucket_start, bucket_size, start=None, end=None):
+        """ Yields (bucket start, first, last) index bounds for every bucket holding a timestamp in the range """
+
+        first = 0 if start is None else bisect.bisect_left(self._timestamps, start)
+        last = len(self._timestamps) if end is None else bisect.bisect_right(self._timestamps, end)
+
+        while first < last:
+            bucket_start = get_bucket_start(self._timestamps[first])
+            bucket_last = bisect.bisect_left(self._timestamps, bucket_start + bucket_size, first, last)
+            yield bucket_start, first, bucket_last
+            first = bucket_last
+
+    def get_seq_nums_at(self, first, last):
+        """ Returns the sequence numbers between two index bounds from iter_buckets """
+
+        return self._seq_nums[first:last]
+
+    def __len__(self):
+        """ Returns the number of entries """
+
+        return len(self._timestamps)
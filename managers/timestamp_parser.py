@@ -0,0 +1,92 @@
+import datetime
+
+class TimestampParser:
+    """ Parses the fixed timestamp formats of the csv files without going through strptime
+
+    Only "%Y-%m-%d %H:%M" and "%Y-%m-%d %H:%M:%S.%f" have a fast path. Any value that
+    doesn't have exactly that shape, or that the fast path rejects, is handed to strptime,
+    so what is accepted and the errors raised stay the same as before. """
+
+    MINUTE_FORMAT = "%Y-%m-%d %H:%M"
+    MICROSECOND_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+    # Cached timestamps are dropped once the cache holds this many
+    CACHE_SIZE = 65536
+
+    def __init__(self, timestamp_format, use_cache=False):
+        """ Initializes the parser, the cache pays off when many rows share a timestamp """
+
+        self._format = timestamp_format
+        self._cache = {} if use_cache else None
+
+    def get_format(self):
+        """ Getter for the strptime format """
+
+        return self._format
+
+    def parse(self, value):
+        """ Returns the timestamp string as a datetime, raises ValueError if it doesn't match the format """
+
+        if self._cache is None:
+            return self._parse(value)
+
+        timestamp = self._cache.get(value)
+        if timestamp is None:
+            if len(self._cache) >= TimestampParser.CACHE_SIZE:
+                self._cache.clear()
+            timestamp = self._cache[value] = self._parse(value)
+
+        return timestamp
+
+    def _parse(self, value):
+        """ Parses a value using the fast path for its format when it has the expected shape """
+
+        if self._format == TimestampParser.MINUTE_FORMAT:
+            timestamp = TimestampParser._parse_minutes(value)
+        elif self._format == TimestampParser.MICROSECOND_FORMAT:
+            timestamp = TimestampParser._parse_microseconds(value)
+        else:
+            timestamp = None
+
+        if timestamp is None:
+            return datetime.datetime.strptime(value, self._format)
+
+        return timestamp
+
+    @staticmethod
+    def _parse_minutes(value):
+        """ Returns "YYYY-MM-DD HH:MM" as a datetime, None if the value has another shape """
+
+        if len(value) != 16 or value[4] != "-" or value[7] != "-" or value[10] != " " or value[13] != ":":
+            return None
+
+        digits = value[0:4] + value[5:7] + value[8:10] + value[11:13] + value[14:16]
+        if not digits.isascii() or not digits.isdigit():
+            return None
+
+        return TimestampParser._from_iso_format(value)
+
+    @staticmethod
+    def _parse_microseconds(value):
+        """ Returns "YYYY-MM-DD HH:MM:SS.ffffff" (1 to 6 fraction digits) as a datetime, None if the value has another shape """
+
+        if not 21 <= len(value) <= 26 or value[4] != "-" or value[7] != "-" or value[10] != " " \
+                or value[13] != ":" or value[16] != ":" or value[19] != ".":
+            return None
+
+        fraction = value[20:]
+        digits = value[0:4] + value[5:7] + value[8:10] + value[11:13] + value[14:16] + value[17:19] + fraction
+        if not digits.isascii() or not digits.isdigit():
+            return None
+
+        return TimestampParser._from_iso_format(value)
+
+    @staticmethod
+    def _from_iso_format(value):
+        """ Returns a value already checked to have the fixed shape as a datetime, None if it is out of range """
+
+        # Both formats are valid ISO 8601, and fromisoformat is implemented in C
+        try:
+            return datetime.datetime.fromisoformat(value)
+        except ValueError:
+            # Let strptime raise its own error
+            return None
@@ -5,11 +5,57 @@ import json
 
 from managers.temperature_reading_manager import TemperatureReadingManager
 from managers.pressure_reading_manager import PressureReadingManager
+from managers.reading_manager_registry import ReadingManagerRegistry
+from managers.sqlite_reading_manager import SqliteReadingManager
+from managers.partitioned_reading_manager import PartitionedReadingManager
+from managers.response_cache import ResponseCache
 from readings.temperature_reading import TemperatureReading
 from readings.pressure_reading import PressureReading
+from readings.reading_serializer import ReadingSerializer
 
 temp_readings_file = "data/temperature_readings.csv"
 pres_readings_file = "data/pressure_readings.csv"
+temp_readings_db = "data/temperature_readings.db"
+pres_readings_db = "data/pressure_readings.db"
+temp_readings_dir = "data/temperature_readings"
+pres_readings_dir = "data/pressure_readings"
+
+# "files" keeps the readings in the csv (or binary) files above, "sqlite" in a SQLite database per sensor type
+# and "partitioned" in a directory per sensor type with a csv file per sensor model and/or time period
+reading_manager_backend = "files"
+# Partitioning of the "partitioned" backend, partition_period is "hour", "day" or None. With retention_days set,
+# older partitions are dropped in the background, or with retention_action "archive" compressed into archives
+# that are still queried. archive_codec is "gzip", "zstd" (needs the zstandard package) or None for the best available
+partition_options = {"partition_by_model": True, "partition_period": "day", "retention_days": None,
+                     "retention_action": "drop", "archive_codec": None}
+
+# Managers are kept for the life of the process and only reloaded when the csv file changes on disk
+reading_manager_registry = ReadingManagerRegistry()
+# Options passed to every reading manager, updates and deletes are journaled instead of rewriting the csv
+# store can be set to "columnar" to hold large files in typed arrays instead of reading objects, or to "lazy"
+# to memory-map the csv file and parse rows on demand (read-mostly replicas),
+# load_workers above 1 parses large csv files in that many processes, and use_snapshot restarts from a
+# binary snapshot of the parsed readings instead of parsing the csv file again. storage_format "binary" reads
+# and writes fixed-width binary files instead (see convert_readings.py to convert the data files).
+# use_file_lock serializes writes between server worker processes sharing the data files. With a single
+# worker, commit_delay (ms) can replace it to group concurrent POSTs into one append, optionally with use_fsync
+reading_manager_options = {"use_journal": True, "store": "objects", "load_workers": 1, "use_snapshot": True,
+                           "storage_format": "csv", "use_file_lock": True, "commit_delay": 0, "use_fsync": False}
+
+# Serialized GET responses, valid until their manager's readings change. Responses carry an ETag so polling
+# clients sending If-None-Match get a 304 while nothing changed. Responses over 1/16 of max_bytes aren't cached
+response_cache = ResponseCache(max_entries=1024, max_bytes=64 * 1024 * 1024)
+
+NDJSON_MIMETYPES = ("application/x-ndjson", "application/ndjson")
+JSON_MIMETYPE = "application/json"
+# Clients accepting this media type get the sequence number and min/avg/max as JSON numbers instead of strings,
+# with the same field names in single readings and lists
+NUMERIC_JSON_MIMETYPE = "application/vnd.sensor-readings.v2+json"
+# Serializers of the single reading and list responses per media type, numeric ones use orjson if it is installed
+READING_SERIALIZERS = {
+    JSON_MIMETYPE: (ReadingSerializer(ReadingSerializer.READING_FIELDS), ReadingSerializer(ReadingSerializer.LIST_FIELDS)),
+    NUMERIC_JSON_MIMETYPE: (ReadingSerializer(numeric=True), ReadingSerializer(numeric=True))
+}
 
 app = Flask(__name__)
 
@@ -36,6 +82,40 @@ def add_reading(sensor_type):
 
     return response
 
+@app.route("/sensor/<string:sensor_type>/readings", methods=["POST"])
+def add_readings(sensor_type):
+    """ Adds a batch of readings (JSON array or NDJSON) and returns the status of each item """
+
+    reading_manager = create_reading_manager(sensor_type)
+    if not reading_manager:
+        return app.response_class(status=400)
+
+    json_readings = parse_batch_body()
+    if json_readings is None:
+        return app.response_class(status=400)
+
+    results = []
+    readings = []
+    for index, json_reading in enumerate(json_readings):
+        reading = create_reading(sensor_type, json_reading)
+        if reading:
+            readings.append(reading)
+            results.append({"index": index, "status": 200})
+        else:
+            results.append({"index": index, "status": 400, "error": "Invalid reading"})
+
+    reading_manager.add_readings(readings)
+
+    accepted_results = (result for result in results if result["status"] == 200)
+    for result, reading in zip(accepted_results, readings):
+        result["sequence_num"] = reading.get_sequence_num()
+
+    return app.response_class(
+        response=json.dumps({"accepted": len(readings), "rejected": len(results) - len(readings), "results": results}),
+        status=200 if readings else 400,
+        mimetype="application/json"
+    )
+
 @app.route("/sensor/<string:sensor_type>/reading/<int:seq_num>", methods=["PUT"])
 def update_reading(sensor_type, seq_num):
     """ Updates a reading based on sequence number """
@@ -80,61 +160,320 @@ def get_reading(sensor_type, seq_num):
     if not reading_manager:
         return app.response_class(status=400)
 
-    reading = reading_manager.get_reading(seq_num)
-    if reading:
-        json_reading = reading.to_json()
-        return app.response_class(
-            response=json_reading,
-            status=200,
-            mimetype="application/json"
-        )
-    else:
-        return app.response_class(status=404, response="Reading is not found")
+    mimetype = negotiate_mimetype()
+
+    def build():
+        reading = reading_manager.get_reading(seq_num)
+        return (READING_SERIALIZERS[mimetype][0].dumps(reading), ()) if reading else None
+
+    return cached_response((sensor_type, "reading", seq_num, mimetype), reading_manager.get_version(), mimetype, build)
 
 @app.route("/sensor/<string:sensor_type>/reading/all", methods=["GET"])
 def get_all_readings(sensor_type):
-    """ Get a reading from csv file based on sequence number """
+    """ Get readings from csv file, optionally filtered by start/end and model, paginated with cursor/limit or streamed """
 
     reading_manager = create_reading_manager(sensor_type)
     if not reading_manager:
         return app.response_class(status=400)
-    
-    readings = reading_manager.get_all_readings()
-    dict_readings = []
-    for reading in readings:
-        # Convert reading object to a dictionary with values converted to a string
-        reading_dict = dict((attr.replace("_", ""), str(v)) for attr, v in reading.__dict__.items())
-        dict_readings.append(reading_dict)
 
-    json_readings = json.dumps(dict_readings)
+    try:
+        start = parse_query_timestamp(request.args.get("start"))
+        end = parse_query_timestamp(request.args.get("end"))
+    except ValueError:
+        return app.response_class(status=400, response="Start and end must be ISO timestamps")
 
-    response = app.response_class(
-        response=json_readings,
+    model = request.args.get("model")
+    filtered = start is not None or end is not None or model is not None
+    try:
+        cursor = parse_cursor(request.args.get("cursor"), filtered)
+        limit = int(request.args["limit"]) if "limit" in request.args else None
+    except ValueError:
+        return app.response_class(status=400, response="Cursor must be an integer or a previous X-Next-Cursor, limit an integer")
+
+    stream = request.args.get("stream")
+    if stream not in (None, "json", "ndjson") or (limit is not None and limit < 0):
+        return app.response_class(status=400)
+
+    mimetype = negotiate_mimetype()
+    if stream:
+        readings = select_readings(reading_manager, cursor, limit, start, end, model, stream)
+        response = stream_readings(readings, stream, mimetype)
+        response.headers.extend(get_page_headers(readings, limit, filtered))
+        return response
+
+    def build():
+        readings = select_readings(reading_manager, cursor, limit, start, end, model)
+        return READING_SERIALIZERS[mimetype][1].dumps_list(readings), get_page_headers(readings, limit, filtered)
+
+    return cached_response((sensor_type, "all", cursor, limit, start, end, model, mimetype), reading_manager.get_version(),
+                           mimetype, build)
+
+@app.route("/sensor/<string:sensor_type>/stats", methods=["GET"])
+def get_reading_stats(sensor_type):
+    """ Get min/avg/max/range and error counts per minute, hour or day bucket """
+
+    reading_manager = create_reading_manager(sensor_type)
+    if not reading_manager:
+        return app.response_class(status=400)
+
+    try:
+        start = parse_query_timestamp(request.args.get("start"))
+        end = parse_query_timestamp(request.args.get("end"))
+        stats = reading_manager.get_stats(request.args.get("bucket", "hour"), start, end)
+    except ValueError as e:
+        return app.response_class(status=400, response=str(e))
+
+    return app.response_class(
+        response=json.dumps(stats),
         status=200,
         mimetype="application/json"
     )
-    
+
+@app.route("/sensor/<string:sensor_type>/errors", methods=["GET"])
+def get_error_readings(sensor_type):
+    """ Get the error messages of the readings within a time range, optionally of one status """
+
+    reading_manager = create_reading_manager(sensor_type)
+    if not reading_manager:
+        return app.response_class(status=400)
+
+    try:
+        start = parse_query_timestamp(request.args.get("start"))
+        end = parse_query_timestamp(request.args.get("end"))
+    except ValueError as e:
+        return app.response_class(status=400, response=str(e))
+
+    readings = reading_manager.get_error_readings(start, end, request.args.get("status"))
+    return app.response_class(
+        response=json.dumps([error_to_dict(reading) for reading in readings]),
+        status=200,
+        mimetype="application/json"
+    )
+
+def negotiate_mimetype():
+    """ Returns the reading media type the client accepts best, plain JSON unless it asks for the numeric one """
+
+    return request.accept_mimetypes.best_match(READING_SERIALIZERS, JSON_MIMETYPE)
+
+def cached_response(key, version, mimetype, build):
+    """ Returns the response to a GET from the response cache, building it with build() on a miss
+
+    build returns the body and extra headers, or None if the reading is not found. version is the
+    manager's version read before any of its readings, and clients already holding the response
+    for it get a 304 """
+
+    etag = response_cache.get_etag(version, None if mimetype == JSON_MIMETYPE else mimetype)
+    if request.if_none_match.contains(etag):
+        response_cache.record_not_modified()
+        response = app.response_class(status=304)
+        response.set_etag(etag)
+        return response
+
+    cached = response_cache.get(key, version)
+    if cached is None:
+        cached = build()
+        if cached is None:
+            return app.response_class(status=404, response="Reading is not found")
+        response_cache.put(key, version, cached, len(cached[0]))
+
+    body, headers = cached
+    response = app.response_class(
+        response=body,
+        status=200,
+        mimetype=mimetype
+    )
+    response.headers.extend(headers)
+    # The body depends on the Accept header, so shared caches must keep a copy per media type
+    response.headers["Vary"] = "Accept"
+    response.set_etag(etag)
     return response
 
+def stream_readings(readings, stream, mimetype):
+    """ Returns a streamed response with the readings as a chunked JSON array or NDJSON, encoded for the media type """
+
+    return app.response_class(generate_stream(readings, stream, mimetype), status=200, mimetype=get_stream_mimetype(stream, mimetype))
+
+def generate_stream(readings, stream, mimetype):
+    """ Returns a generator of the chunks of a JSON array or NDJSON of the readings, encoded for the media type """
+
+    serializer = READING_SERIALIZERS[mimetype][1]
+
+    def generate_json():
+        yield b"["
+        separator = b""
+        for reading in readings:
+            yield separator + serializer.dumps(reading)
+            separator = b","
+        yield b"]"
+
+    def generate_ndjson():
+        for reading in readings:
+            yield serializer.dumps(reading) + b"\n"
+
+    return generate_ndjson() if stream == "ndjson" else generate_json()
+
+def get_stream_mimetype(stream, mimetype):
+    """ Returns the media type of a streamed listing """
+
+    return NDJSON_MIMETYPES[0] if stream == "ndjson" else mimetype
+
+def select_readings(reading_manager, cursor, limit, start=None, end=None, model=None, stream=None):
+    """ Returns the readings of a page of GET /reading/all, an iterator of them if streamed without a limit
+
+    Unfiltered listings are in sequence number order after the cursor. Listings filtered by
+    start/end or model are in timestamp order, so their cursor is the (timestamp, sequence
+    number) of the last reading of the previous page, or None for the first page """
+
+    if start is None and end is None and model is None:
+        if stream and limit is None:
+            # Page through the manager so the export never holds every reading at once
+            return reading_manager.iter_readings(cursor)
+        return reading_manager.get_readings_after(cursor, limit)
+
+    readings = reading_manager.get_readings_between(start, end, model)
+    # Readings with the same timestamp are ordered by sequence number, so no page skips or repeats one of them
+    readings.sort(key=get_cursor_key)
+    if cursor is not None:
+        readings = [reading for reading in readings if get_cursor_key(reading) > cursor]
+
+    return readings if limit is None else readings[:limit]
+
+def get_page_headers(readings, limit, filtered):
+    """ Returns the X-Next-Cursor header of a full page of readings, none for the last page or an unpaged listing """
+
+    if limit is None or not readings or len(readings) != limit:
+        return ()
+
+    # Clients pass this back as the cursor to fetch the next page
+    return (("X-Next-Cursor", format_cursor(readings[-1], filtered)),)
+
+def get_cursor_key(reading):
+    """ Returns the (timestamp, sequence number) a filtered listing is ordered and paged by """
+
+    return reading.get_timestamp(), reading.get_sequence_num()
+
+def parse_cursor(value, filtered):
+    """ Returns the cursor query parameter, a sequence number, or (timestamp, sequence number) for filtered listings
+
+    Raises ValueError if it is not valid """
+
+    if not filtered:
+        return 0 if value is None else int(value)
+
+    if value is None:
+        return None
+
+    timestamp, seq_num = value.rsplit(",", 1)
+    return parse_query_timestamp(timestamp), int(seq_num)
+
+def format_cursor(reading, filtered):
+    """ Returns the X-Next-Cursor of a page ending with the reading, the inverse of parse_cursor """
+
+    if not filtered:
+        return str(reading.get_sequence_num())
+
+    return "%s,%d" % (reading.get_timestamp().isoformat(), reading.get_sequence_num())
+
+def parse_query_timestamp(value):
+    """ Returns the ISO timestamp query parameter as a datetime, None if it is not set
+
+    Raises ValueError if it is not valid or has a UTC offset, since the readings are stored without one """
+
+    if value is None:
+        return None
+
+    timestamp = datetime.datetime.fromisoformat(value)
+    if timestamp.tzinfo is not None:
+        raise ValueError("Timestamps must not have a UTC offset")
+
+    return timestamp
+
+def error_to_dict(reading):
+    """ Returns an error reading as a dictionary with its formatted error message """
+
+    return {
+        "timestamp": str(reading.get_timestamp()),
+        "sequencenum": str(reading.get_sequence_num()),
+        "status": reading.get_status(),
+        "message": reading.get_error_msg()
+    }
+
+@app.route("/cache/stats", methods=["GET"])
+def get_cache_stats():
+    """ Get the entry count, hit rate and 304 counters of the response cache """
+
+    return app.response_class(
+        response=json.dumps(response_cache.get_stats()),
+        status=200,
+        mimetype="application/json"
+    )
+
+@app.route("/registry/stats", methods=["GET"])
+def get_registry_stats():
+    """ Get the hit, miss and reload counters of the reading manager registry """
+
+    return app.response_class(
+        response=json.dumps(reading_manager_registry.get_stats()),
+        status=200,
+        mimetype="application/json"
+    )
+
 def create_reading_manager(sensor_type):
     """ Returns reading manager if valid input, None otherwise """
 
-    if sensor_type == "temperature":
-        reading_manager = TemperatureReadingManager(temp_readings_file)
+    if reading_manager_backend == "sqlite":
+        if sensor_type == "temperature":
+            reading_manager = reading_manager_registry.get_manager(SqliteReadingManager, temp_readings_db, reading_class=TemperatureReading)
+        elif sensor_type == "pressure":
+            reading_manager = reading_manager_registry.get_manager(SqliteReadingManager, pres_readings_db, reading_class=PressureReading)
+        else:
+            reading_manager = None
+    elif reading_manager_backend == "partitioned":
+        if sensor_type == "temperature":
+            reading_manager = reading_manager_registry.get_manager(PartitionedReadingManager, temp_readings_dir, reading_manager_class=TemperatureReadingManager,
+                                                                   **partition_options, **reading_manager_options)
+        elif sensor_type == "pressure":
+            reading_manager = reading_manager_registry.get_manager(PartitionedReadingManager, pres_readings_dir, reading_manager_class=PressureReadingManager,
+                                                                   **partition_options, **reading_manager_options)
+        else:
+            reading_manager = None
+    elif sensor_type == "temperature":
+        reading_manager = reading_manager_registry.get_manager(TemperatureReadingManager, temp_readings_file, **reading_manager_options)
     elif sensor_type == "pressure":
-        reading_manager = PressureReadingManager(pres_readings_file)
+        reading_manager = reading_manager_registry.get_manager(PressureReadingManager, pres_readings_file, **reading_manager_options)
     else:
         reading_manager = None
     
     return reading_manager
 
 
+def parse_batch_body():
+    """ Returns the list of json readings in the request body (JSON array or NDJSON), None if invalid """
+
+    if request.mimetype in NDJSON_MIMETYPES:
+        json_readings = []
+        for line in request.get_data(as_text=True).splitlines():
+            if not line.strip():
+                continue
+            try:
+                json_readings.append(json.loads(line))
+            except ValueError:
+                # Keep the item so its index still lines up, create_reading will reject it
+                json_readings.append(None)
+        return json_readings
+
+    json_readings = request.get_json(silent=True)
+    if not isinstance(json_readings, list):
+        return None
+
+    return json_readings
+
 def create_reading(sensor_type, json_reading, seq_num=0):
     """ Returns reading if valid input, None otherwise """
 
     if sensor_type == "temperature":    
         try:
-            reading = TemperatureReading(datetime.datetime.strptime(json_reading["timestamp"], "%Y-%m-%d %H:%M:%S.%f"),
+            reading = TemperatureReading(TemperatureReadingManager.TIMESTAMP_PARSER.parse(json_reading["timestamp"]),
                             seq_num, json_reading["model"], float(json_reading["min"]), float(json_reading["avg"]), 
                             float(json_reading["max"]), json_reading["status"])
         except:
@@ -142,7 +481,7 @@ def create_reading(sensor_type, json_reading, seq_num=0):
 
     if sensor_type == "pressure":
         try:
-            reading = PressureReading(datetime.datetime.strptime(json_reading["timestamp"], "%Y-%m-%d %H:%M"),
+            reading = PressureReading(PressureReadingManager.TIMESTAMP_PARSER.parse(json_reading["timestamp"]),
                         seq_num, json_reading["model"], float(json_reading["min"]), float(json_reading["avg"]),
                         float(json_reading["max"]), json_reading["status"])
         except:
@@ -0,0 +1,486 @@
+""" asyncio server exposing the /sensor/<type>/reading routes of reading_api.py
+
+Connections are handled by the event loop, so thousands of slow sensor connections only cost
+a coroutine each. File writes never run on the loop: a single writer task takes them from a
+bounded queue, groups the adds waiting for the same manager into one add_readings call and
+runs it in a dedicated writer thread. When the queue is full, writes are answered with 503
+and a Retry-After header instead of piling up. Manager lookups and reads wait for the
+manager's lock and may load a file, so they run in a pool of reader threads.
+
+Usage: python reading_api_async.py [host] [port]
+(defaults to 127.0.0.1:5001)
+"""
+from concurrent.futures import ThreadPoolExecutor
+import reading_api
+import asyncio
+import json
+import re
+import sys
+import urllib.parse
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 5001
+# Writes waiting for the writer task before new ones are turned away
+WRITE_QUEUE_SIZE = 10000
+# Most writes handed to the writer thread in one go
+WRITE_BATCH_SIZE = 1000
+# Threads running manager lookups and reads
+READ_WORKERS = 8
+RETRY_AFTER = 1
+# Idle keep-alive connections are closed after this many seconds
+IDLE_TIMEOUT = 60
+MAX_HEADER_COUNT = 100
+MAX_BODY_SIZE = 1024 * 1024
+
+READING_PATH = re.compile(r"^/sensor/(\w+)/reading$")
+READING_SEQ_NUM_PATH = re.compile(r"^/sensor/(\w+)/reading/(\d+)$")
+ALL_READINGS_PATH = re.compile(r"^/sensor/(\w+)/reading/all$")
+
+STATUS_TEXTS = {200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+                413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+class ReadingWriter:
+    """ Single writer task applying reading changes in a dedicated thread, in the order they were queued """
+
+    ADD = "add"
+    UPDATE = "update"
+    DELETE = "delete"
+
+    def __init__(self, queue_size=WRITE_QUEUE_SIZE):
+        """ Initializes the writer, start() must be called from the event loop """
+
+        self._queue = asyncio.Queue(queue_size)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="reading-writer")
+        self._task = None
+
+    def start(self):
+        """ Starts the writer task """
+
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """ Writes what is already queued, then stops the writer task and thread """
+
+        await self._queue.join()
+        self._task.cancel()
+        self._executor.shutdown()
+
+    def submit(self, operation, reading_manager, value):
+        """ Queues a change and returns the future of its result, raises asyncio.QueueFull when the queue is full """
+
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((operation, reading_manager, value, future))
+        return future
+
+    async def _run(self):
+        """ Writer task - takes every queued change and applies them in the writer thread """
+
+        loop = asyncio.get_running_loop()
+        while True:
+            jobs = [await self._queue.get()]
+            while len(jobs) < WRITE_BATCH_SIZE and not self._queue.empty():
+                jobs.append(self._queue.get_nowait())
+
+            await loop.run_in_executor(self._executor, self._apply, jobs, loop)
+            for job in jobs:
+                self._queue.task_done()
+
+    def _apply(self, jobs, loop):
+        """ Writer thread - applies the changes in order, adds for the same manager in a row become one batch """
+
+        i = 0
+        while i < len(jobs):
+            operation, reading_manager = jobs[i][0], jobs[i][1]
+            group = [jobs[i]]
+            if operation == ReadingWriter.ADD:
+                while i + len(group) < len(jobs) and jobs[i + len(group)][:2] == (operation, reading_manager):
+                    group.append(jobs[i + len(group)])
+
+            try:
+                if operation == ReadingWriter.ADD:
+                    reading_manager.add_readings([job[2] for job in group])
+                    results = [job[2] for job in group]
+                elif operation == ReadingWriter.UPDATE:
+                    results = [reading_manager.update_reading(group[0][2])]
+                else:
+                    results = [reading_manager.delete_reading(group[0][2])]
+            except Exception as error:
+                for job in group:
+                    loop.call_soon_threadsafe(_set_future_exception, job[3], error)
+            else:
+                for job, result in zip(group, results):
+                    loop.call_soon_threadsafe(_set_future_result, job[3], result)
+            i += len(group)
+
+
+class HttpRequest:
+    """ Method, path, query parameters, headers and body of a parsed HTTP/1.1 request """
+
+    def __init__(self, method, target, version, headers, body):
+        """ Initializes the request """
+
+        url = urllib.parse.urlsplit(target)
+        self.method = method
+        self.path = url.path
+        self.args = dict(urllib.parse.parse_qsl(url.query))
+        self.version = version
+        self.headers = headers
+        self.body = body
+
+    def get_json(self):
+        """ Returns the body parsed as JSON, None if it isn't valid JSON """
+
+        try:
+            return json.loads(self.body)
+        except ValueError:
+            return None
+
+    def keep_alive(self):
+        """ Returns True if the connection stays open after the response """
+
+        connection = self.headers.get("connection", "").lower()
+        if self.version == "HTTP/1.0":
+            return connection == "keep-alive"
+
+        return connection != "close"
+
+
+class HttpError(Exception):
+    """ Malformed request, answered with the status and the connection closed """
+
+    def __init__(self, status):
+        """ Initializes the error with the response status """
+
+        super().__init__(status)
+        self.status = status
+
+
+async def read_request(reader):
+    """ Returns the next request on the connection, None once the client closed it """
+
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+
+    try:
+        method, target, version = request_line.decode("latin-1").split()
+    except ValueError:
+        raise HttpError(400)
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        if len(headers) >= MAX_HEADER_COUNT or b":" not in line:
+            raise HttpError(400)
+        name, value = line.decode("latin-1").split(":", 1)
+        headers[name.strip().lower()] = value.strip()
+
+    if "chunked" in headers.get("transfer-encoding", "").lower():
+        # Sensors send small bodies with a length, chunked uploads are not supported
+        raise HttpError(400)
+
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        raise HttpError(400)
+    if length < 0:
+        raise HttpError(400)
+    if length > MAX_BODY_SIZE:
+        raise HttpError(413)
+
+    body = await reader.readexactly(length) if length else b""
+    return HttpRequest(method, target, version, headers, body)
+
+
+def write_response(writer, status, body="", content_type="text/html; charset=utf-8", headers=None, keep_alive=True):
+    """ Writes a response with a Content-Length to the connection """
+
+    body = body.encode() if isinstance(body, str) else body
+    lines = ["HTTP/1.1 %d %s" % (status, STATUS_TEXTS.get(status, "")),
+             "Content-Type: %s" % content_type,
+             "Content-Length: %d" % len(body),
+             "Connection: %s" % ("keep-alive" if keep_alive else "close")]
+    for name, value in (headers or {}).items():
+        lines.append("%s: %s" % (name, value))
+
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+
+
+class ReadingServer:
+    """ asyncio HTTP server for the reading routes, sharing reading_api's managers and configuration """
+
+    def __init__(self, queue_size=WRITE_QUEUE_SIZE, read_workers=READ_WORKERS):
+        """ Initializes the server, its writer and its reader threads """
+
+        self._reading_writer = ReadingWriter(queue_size)
+        self._read_executor = ThreadPoolExecutor(max_workers=read_workers, thread_name_prefix="reading-reader")
+        self._server = None
+        self._connections = {}
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """ Starts listening, returns the asyncio server """
+
+        self._reading_writer.start()
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        return self._server
+
+    async def stop(self):
+        """ Stops accepting connections, finishes the queued writes, then closes the open connections """
+
+        self._server.close()
+        await self._reading_writer.stop()
+        for writer in self._connections.values():
+            writer.close()
+        # Closing the transports ends each connection's read, so its task finishes on its own
+        if self._connections:
+            await asyncio.wait(list(self._connections))
+        await self._server.wait_closed()
+        self._read_executor.shutdown()
+
+    async def _handle_connection(self, reader, writer):
+        """ Serves the requests of one connection until it is closed """
+
+        task = asyncio.current_task()
+        self._connections[task] = writer
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(read_request(reader), IDLE_TIMEOUT)
+                except HttpError as error:
+                    write_response(writer, error.status, keep_alive=False)
+                    break
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    break
+
+                if request is None:
+                    break
+
+                keep_alive = request.keep_alive()
+                try:
+                    response = await self._dispatch(request)
+                except Exception:
+                    response = (500, "")
+                status, body = response[0], response[1]
+                options = response[2] if len(response) > 2 else {}
+                write_response(writer, status, body, keep_alive=keep_alive, **options)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            del self._connections[task]
+            writer.close()
+
+    async def _dispatch(self, request):
+        """ Routes a request, returns (status, body) or (status, body, write_response options) """
+
+        match = ALL_READINGS_PATH.match(request.path)
+        if match:
+            return await self._get_all_readings(request, match.group(1)) if request.method == "GET" else (405, "")
+
+        match = READING_SEQ_NUM_PATH.match(request.path)
+        if match:
+            sensor_type, seq_num = match.group(1), int(match.group(2))
+            if request.method == "GET":
+                return await self._get_reading(request, sensor_type, seq_num)
+            if request.method == "PUT":
+                return await self._update_reading(request, sensor_type, seq_num)
+            if request.method == "DELETE":
+                return await self._delete_reading(sensor_type, seq_num)
+            return 405, ""
+
+        match = READING_PATH.match(request.path)
+        if match:
+            return await self._add_reading(request, match.group(1)) if request.method == "POST" else (405, "")
+
+        return 404, ""
+
+    async def _add_reading(self, request, sensor_type):
+        """ Assigns a sequence number to the reading and returns the created reading """
+
+        reading_manager = await self._run_read(reading_api.create_reading_manager, sensor_type)
+        if not reading_manager:
+            return 400, ""
+
+        reading = reading_api.create_reading(sensor_type, request.get_json())
+        if not reading:
+            return 400, ""
+
+        try:
+            future = self._reading_writer.submit(ReadingWriter.ADD, reading_manager, reading)
+        except asyncio.QueueFull:
+            return _queue_full_response()
+
+        await future
+        return 200, reading.to_json(), {"content_type": "application/json"}
+
+    async def _update_reading(self, request, sensor_type, seq_num):
+        """ Updates a reading based on sequence number """
+
+        reading_manager = await self._run_read(reading_api.create_reading_manager, sensor_type)
+        if not reading_manager:
+            return 400, ""
+
+        reading = reading_api.create_reading(sensor_type, request.get_json(), seq_num)
+        if not reading:
+            return 400, ""
+
+        try:
+            future = self._reading_writer.submit(ReadingWriter.UPDATE, reading_manager, reading)
+        except asyncio.QueueFull:
+            return _queue_full_response()
+
+        if await future:
+            return 200, ""
+
+        return 404, "Reading is not found"
+
+    async def _delete_reading(self, sensor_type, seq_num):
+        """ Deletes a reading based on sequence number """
+
+        reading_manager = await self._run_read(reading_api.create_reading_manager, sensor_type)
+        if not reading_manager:
+            return 400, ""
+
+        try:
+            future = self._reading_writer.submit(ReadingWriter.DELETE, reading_manager, seq_num)
+        except asyncio.QueueFull:
+            return _queue_full_response()
+
+        if await future:
+            return 200, ""
+
+        return 404, "Reading is not found"
+
+    async def _get_reading(self, request, sensor_type, seq_num):
+        """ Gets a reading based on sequence number """
+
+        reading_manager = await self._run_read(reading_api.create_reading_manager, sensor_type)
+        if not reading_manager:
+            return 400, ""
+
+        mimetype = self._negotiate_mimetype(request)
+
+        def build():
+            reading = reading_manager.get_reading(seq_num)
+            return (reading_api.READING_SERIALIZERS[mimetype][0].dumps(reading), ()) if reading else None
+
+        version = await self._run_read(reading_manager.get_version)
+        return await self._cached_response(request, (sensor_type, "reading", seq_num, mimetype), version, mimetype, build)
+
+    async def _get_all_readings(self, request, sensor_type):
+        """ Gets readings, optionally filtered by start/end and model, paginated with cursor/limit or streamed
+
+        Takes the same parameters as reading_api's route. Streamed listings are sent in one
+        response with a length, since this server doesn't send chunked responses """
+
+        reading_manager = await self._run_read(reading_api.create_reading_manager, sensor_type)
+        if not reading_manager:
+            return 400, ""
+
+        try:
+            start = reading_api.parse_query_timestamp(request.args.get("start"))
+            end = reading_api.parse_query_timestamp(request.args.get("end"))
+        except ValueError:
+            return 400, "Start and end must be ISO timestamps"
+
+        model = request.args.get("model")
+        filtered = start is not None or end is not None or model is not None
+        try:
+            cursor = reading_api.parse_cursor(request.args.get("cursor"), filtered)
+            limit = int(request.args["limit"]) if "limit" in request.args else None
+        except ValueError:
+            return 400, "Cursor must be an integer or a previous X-Next-Cursor, limit an integer"
+
+        stream = request.args.get("stream")
+        if stream not in (None, "json", "ndjson") or (limit is not None and limit < 0):
+            return 400, ""
+
+        mimetype = self._negotiate_mimetype(request)
+        if stream:
+            def build_stream():
+                readings = reading_api.select_readings(reading_manager, cursor, limit, start, end, model, stream)
+                body = b"".join(reading_api.generate_stream(readings, stream, mimetype))
+                return body, reading_api.get_page_headers(readings, limit, filtered)
+
+            body, headers = await self._run_read(build_stream)
+            return 200, body, {"content_type": reading_api.get_stream_mimetype(stream, mimetype), "headers": dict(headers)}
+
+        def build():
+            readings = reading_api.select_readings(reading_manager, cursor, limit, start, end, model)
+            return reading_api.READING_SERIALIZERS[mimetype][1].dumps_list(readings), reading_api.get_page_headers(readings, limit, filtered)
+
+        # Keyed like reading_api's listing, so both servers share the cached responses
+        version = await self._run_read(reading_manager.get_version)
+        return await self._cached_response(request, (sensor_type, "all", cursor, limit, start, end, model, mimetype),
+                                           version, mimetype, build)
+
+    def _negotiate_mimetype(self, request):
+        """ Returns the numeric reading media type if the client accepts it, plain JSON otherwise """
+
+        accepted = [value.split(";")[0].strip() for value in request.headers.get("accept", "").split(",")]
+        return reading_api.NUMERIC_JSON_MIMETYPE if reading_api.NUMERIC_JSON_MIMETYPE in accepted else reading_api.JSON_MIMETYPE
+
+    async def _run_read(self, function, *args):
+        """ Returns the result of function(*args) run in a reader thread """
+
+        return await asyncio.get_running_loop().run_in_executor(self._read_executor, function, *args)
+
+    async def _cached_response(self, request, key, version, mimetype, build):
+        """ Returns the response to a GET from reading_api's response cache, building it with build() in a reader thread on a miss
+
+        build returns the body and extra headers, or None if the reading is not found. Clients
+        already holding the response for the manager's version get a 304 """
+
+        response_cache = reading_api.response_cache
+        etag = '"%s"' % response_cache.get_etag(version, None if mimetype == reading_api.JSON_MIMETYPE else mimetype)
+        tags = [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]
+        if etag in tags or "W/" + etag in tags or "*" in tags:
+            response_cache.record_not_modified()
+            return 304, "", {"headers": {"ETag": etag}}
+
+        cached = response_cache.get(key, version)
+        if cached is None:
+            cached = await self._run_read(build)
+            if cached is None:
+                return 404, "Reading is not found"
+            response_cache.put(key, version, cached, len(cached[0]))
+
+        body, headers = cached
+        return 200, body, {"content_type": mimetype, "headers": dict(headers, ETag=etag, Vary="Accept")}
+
+
+def _queue_full_response():
+    """ Returns the response telling a sensor to retry its write later """
+
+    return 503, "Write queue is full", {"headers": {"Retry-After": str(RETRY_AFTER)}}
+
+def _set_future_result(future, result):
+    """ Sets a future's result unless its caller went away """
+
+    if not future.done():
+        future.set_result(result)
+
+def _set_future_exception(future, error):
+    """ Sets a future's exception unless its caller went away """
+
+    if not future.done():
+        future.set_exception(error)
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """ Runs the server until it is cancelled """
+
+    reading_server = ReadingServer()
+    server = await reading_server.start(host, port)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await reading_server.stop()
+
+if __name__ == "__main__":
+    asyncio.run(serve(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_HOST,
+                      int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_PORT))
@@ -1,4 +1,4 @@
-import json
+from readings.reading_serializer import ReadingSerializer
 
 class AbstractReading:
     """ Abstract Sensor Reading """
@@ -10,6 +10,11 @@ class AbstractReading:
     READING_AVG = "Average"
     READING_MAX = "Max"
     READING_STATUS = "Status"
+    # Encodes to_json, the field names never change so one serializer serves every reading
+    SERIALIZER = ReadingSerializer()
+
+    # No per-instance dict, large files hold millions of readings
+    __slots__ = ("_timestamp", "_sequence_num", "_sensor_model", "_min", "_avg", "_max", "_status")
 
     def __init__(self, timestamp, seq_num, sensor_model, min, avg, max, status):
         """ Initializes the sensor reading """
@@ -32,6 +37,20 @@ class AbstractReading:
         AbstractReading._validate_string_input(AbstractReading.READING_STATUS, status)
         self._status = status
 
+    @classmethod
+    def from_trusted_values(cls, timestamp, seq_num, sensor_model, min, avg, max, status):
+        """ Creates a reading from values that were already validated (e.g. parsed from a csv row), skipping the validators """
+
+        reading = cls.__new__(cls)
+        reading._timestamp = timestamp
+        reading._sequence_num = seq_num
+        reading._sensor_model = sensor_model
+        reading._min = min
+        reading._avg = avg
+        reading._max = max
+        reading._status = status
+        return reading
+
     def get_timestamp(self):
         """ Getter for timestamp """
 
@@ -80,17 +99,7 @@ class AbstractReading:
     def to_json(self):
         """ Returns json object with reading data """
 
-        reading_manager_data = {
-            "timestamp": str(self.get_timestamp()),
-            "sequence_num": str(self.get_sequence_num()), 
-            "model": self.get_sensor_model(),
-            "min": str(self.get_min_value()), 
-            "avg": str(self.get_avg_value()),
-            "max": str(self.get_max_value()),
-            "status": self.get_status()
-        }
-        json_string = json.dumps(reading_manager_data, indent=4)
-        return json_string
+        return AbstractReading.SERIALIZER.dumps(self).decode()
 
     def is_error(self):
         """ Abstract Method - Is Reading an Error """
@@ -8,6 +8,8 @@ class PressureReading(AbstractReading):
     LOW_PRESS_ERROR = "LOW_PRESSURE"
     STATUS_GOOD = "GOOD"
 
+    __slots__ = ()
+
     def is_error(self):
         """ Returns True if there's a there's an error and False if there is no error """
 
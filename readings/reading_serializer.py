@@ -0,0 +1,91 @@
+from json.encoder import encode_basestring
+import math
+
+try:
+    import orjson
+except ImportError:
+    # orjson is optional, readings are encoded with string templates without it
+    orjson = None
+
+class ReadingSerializer:
+    """ Compact JSON encoder for readings, shared by the single reading and list responses
+
+    The field names are fixed per serializer, so the standard library path fills a template
+    compiled once instead of building and encoding a dict per reading, and the orjson path
+    hands orjson dicts built in a fixed key order. Either way the JSON has no whitespace.
+    Values are strings by default, or numbers for the sequence number and min/avg/max with
+    numeric=True; non-finite numbers are encoded as null. """
+
+    # Field names of the single reading response and of the list responses, in order
+    READING_FIELDS = ("timestamp", "sequence_num", "model", "min", "avg", "max", "status")
+    LIST_FIELDS = ("timestamp", "sequencenum", "sensormodel", "min", "avg", "max", "status")
+    FIELD_COUNT = 7
+
+    def __init__(self, field_names=READING_FIELDS, numeric=False, use_orjson=None):
+        """ Initializes the serializer
+
+        use_orjson defaults to orjson for numeric values if it is installed. String values are
+        converted with str() either way, and the template is then faster (see
+        benchmarks/benchmark_serialization.py) """
+
+        if len(field_names) != ReadingSerializer.FIELD_COUNT:
+            raise ValueError("Field names must name the timestamp, sequence number, model, min, avg, max and status")
+        if use_orjson and orjson is None:
+            raise ValueError("The orjson encoder needs the orjson package")
+
+        self._field_names = tuple(field_names)
+        self._numeric = numeric
+        self._use_orjson = (numeric and orjson is not None) if use_orjson is None else use_orjson
+
+        # The model and status are escaped, timestamps and numbers never need to be
+        number_format = "%s" if numeric else '"%s"'
+        value_formats = ('"%s"', number_format, "%s", number_format, number_format, number_format, "%s")
+        self._template = "{" + ",".join(encode_basestring(name) + ":" + value_format
+                                        for name, value_format in zip(self._field_names, value_formats)) + "}"
+
+    def dumps(self, reading):
+        """ Returns the reading as JSON bytes """
+
+        if self._use_orjson:
+            return orjson.dumps(dict(zip(self._field_names, self._get_values(reading))))
+
+        return self._fill_template(reading).encode()
+
+    def dumps_list(self, readings):
+        """ Returns the readings as a JSON array in bytes """
+
+        if self._use_orjson:
+            field_names = self._field_names
+            get_values = self._get_values
+            return orjson.dumps([dict(zip(field_names, get_values(reading))) for reading in readings])
+
+        fill_template = self._fill_template
+        return ("[" + ",".join([fill_template(reading) for reading in readings]) + "]").encode()
+
+    def _get_values(self, reading):
+        """ Returns the values of a reading as they are encoded, in field order """
+
+        if self._numeric:
+            return (str(reading.get_timestamp()), reading.get_sequence_num(), reading.get_sensor_model(),
+                    self._to_number(reading.get_min_value()), self._to_number(reading.get_avg_value()),
+                    self._to_number(reading.get_max_value()), reading.get_status())
+
+        return (str(reading.get_timestamp()), str(reading.get_sequence_num()), reading.get_sensor_model(),
+                str(reading.get_min_value()), str(reading.get_avg_value()), str(reading.get_max_value()), reading.get_status())
+
+    def _fill_template(self, reading):
+        """ Returns the reading as JSON text from the compiled template """
+
+        if self._numeric:
+            min, avg, max = (value if math.isfinite(value) else "null"
+                             for value in (reading.get_min_value(), reading.get_avg_value(), reading.get_max_value()))
+        else:
+            min, avg, max = reading.get_min_value(), reading.get_avg_value(), reading.get_max_value()
+
+        return self._template % (reading.get_timestamp(), reading.get_sequence_num(), encode_basestring(reading.get_sensor_model()),
+                                 min, avg, max, encode_basestring(reading.get_status()))
+
+    def _to_number(self, value):
+        """ Returns a float for orjson, None if it is not finite """
+
+        return value if math.isfinite(value) else None
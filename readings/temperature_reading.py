@@ -9,6 +9,8 @@ class TemperatureReading(AbstractReading):
     STATUS_OK = "OK"
     DEGREE_SIGN = u'\N{DEGREE SIGN}'
 
+    __slots__ = ()
+
     def is_error(self):
         """ Returns True if there's a there's an error and False if there is no error """
 
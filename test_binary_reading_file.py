@@ -0,0 +1,133 @@
+from managers.binary_reading_file import BinaryReadingFile
+from managers.csv_reading_file import CsvReadingFile
+from managers.temperature_reading_manager import TemperatureReadingManager
+from managers.pressure_reading_manager import PressureReadingManager
+from readings.pressure_reading import PressureReading
+from convert_readings import convert_readings
+from unittest import TestCase
+import datetime
+import inspect
+import os
+
+class TestBinaryReadingFile(TestCase):
+    """ Unit Tests for the BinaryReadingFile Class and the binary storage format of the reading managers """
+
+    TEST_FILE = "binary_testresults.bin"
+    TEST_CSV_FILE = "binary_testresults.csv"
+    TEST_PRES_READINGS = [
+            "2018-09-23 19:56,ABC Sensor Pres M100,1,50.163,51.435,52.103,GOOD\n",
+            "2018-09-23 20:00,ABC Sensor Pres M100,2,100.0,100.0,100.0,HIGH_PRESSURE\n",
+            "2018-09-23 20:06,ABC Sensor Pres M101,3,0.0,0.0,0.0,LOW_PRESSURE\n" ]
+
+    def logPoint(self):
+        """ Display test specific information """
+
+        currentTest = self.id().split('.')[-1]
+        callingFunction = inspect.stack()[1][3]
+        print('in %s - %s()' % (currentTest, callingFunction))
+
+    def setUp(self):
+        """ Creates fixtures before each test """
+
+        self.logPoint()
+        with open(TestBinaryReadingFile.TEST_CSV_FILE, "w") as f:
+            f.writelines(TestBinaryReadingFile.TEST_PRES_READINGS)
+        convert_readings("pressure", "binary", TestBinaryReadingFile.TEST_CSV_FILE, TestBinaryReadingFile.TEST_FILE)
+        self.binary_file = BinaryReadingFile(TestBinaryReadingFile.TEST_FILE)
+
+        reading_datetime = datetime.datetime.strptime("2018-09-23 20:10", "%Y-%m-%d %H:%M")
+        self.reading = PressureReading(reading_datetime, 1, "ABC Sensor Pres M102", 50.163, 51.435, 52.103, "GOOD")
+
+    def tearDown(self):
+        """ Create a test fixture after each test method is run """
+
+        for filename in (TestBinaryReadingFile.TEST_FILE, TestBinaryReadingFile.TEST_CSV_FILE):
+            for suffix in ("", ".seq", BinaryReadingFile.DICTIONARY_FILE_SUFFIX):
+                try:
+                    os.remove(filename + suffix)
+                except:
+                    pass
+
+        self.logPoint()
+
+    def _get_rows(self, reading_manager):
+        """ Returns the readings of a manager as csv rows """
+
+        return [reading_manager._reading_to_list(r) for r in reading_manager.get_all_readings()]
+
+    def test_read_readings_success(self):
+        """ 010A - Reads the same readings as the csv file it was converted from """
+
+        self.assertEqual(self.binary_file.get_record_count(), 3, "Must write a record per reading")
+        csv_manager = PressureReadingManager(TestBinaryReadingFile.TEST_CSV_FILE)
+        binary_manager = PressureReadingManager(TestBinaryReadingFile.TEST_FILE, storage_format="binary")
+        self.assertEqual(self._get_rows(binary_manager), self._get_rows(csv_manager), "Must keep every value")
+
+    def test_read_reading_success(self):
+        """ 020A - Reads a single record by record number """
+
+        self.assertEqual(self.binary_file.read_reading(1, PressureReading).get_status(), "HIGH_PRESSURE", "Must seek to the record")
+        self.assertEqual(self.binary_file.read_reading(3, PressureReading), None, "Must return None past the end")
+
+    def test_read_reading_fail(self):
+        """ 020B - Raises ValueError for an invalid record number or file """
+
+        with self.assertRaises(ValueError):
+            self.binary_file.read_reading(-1, PressureReading)
+
+        with self.assertRaises(ValueError):
+            BinaryReadingFile(TestBinaryReadingFile.TEST_CSV_FILE).read_readings(PressureReading)
+
+    def test_write_success(self):
+        """ 030A - Adds, updates and deletes readings in a binary file """
+
+        reading_manager = PressureReadingManager(TestBinaryReadingFile.TEST_FILE, storage_format="binary")
+        reading_manager.add_reading(self.reading)
+        self.assertEqual(self.binary_file.read_reading(3, PressureReading).get_sensor_model(), "ABC Sensor Pres M102",
+                         "Must append the record and its new model string")
+
+        reading_manager.delete_reading(2)
+        reading_manager = PressureReadingManager(TestBinaryReadingFile.TEST_FILE, storage_format="binary")
+        self.assertEqual([r.get_sequence_num() for r in reading_manager.get_all_readings()], [1, 3, 4], "Must rewrite the file")
+
+    def test_write_torn_record_success(self):
+        """ 030B - Ignores and then overwrites a partial last record """
+
+        with open(TestBinaryReadingFile.TEST_FILE, "ab") as f:
+            f.write(b"torn")
+
+        reading_manager = PressureReadingManager(TestBinaryReadingFile.TEST_FILE, storage_format="binary")
+        self.assertEqual(len(reading_manager.get_all_readings()), 3, "Must ignore the partial record")
+        reading_manager.add_reading(self.reading)
+        self.assertEqual(self.binary_file.read_reading(3, PressureReading).get_sequence_num(), 4, "Must start on a record boundary")
+
+    def test_convert_success(self):
+        """ 040A - Converts a binary file back to the same csv rows """
+
+        os.remove(TestBinaryReadingFile.TEST_CSV_FILE)
+        convert_readings("pressure", "csv", TestBinaryReadingFile.TEST_FILE, TestBinaryReadingFile.TEST_CSV_FILE)
+        with open(TestBinaryReadingFile.TEST_CSV_FILE) as f:
+            self.assertEqual(f.read(), "".join(TestBinaryReadingFile.TEST_PRES_READINGS), "Must write the csv rows")
+
+    def test_convert_fail(self):
+        """ 040B - Raises ValueError for an invalid storage format """
+
+        with self.assertRaises(ValueError):
+            convert_readings("pressure", "json", TestBinaryReadingFile.TEST_CSV_FILE, TestBinaryReadingFile.TEST_FILE)
+
+        with self.assertRaises(ValueError):
+            TemperatureReadingManager(TestBinaryReadingFile.TEST_CSV_FILE, storage_format="json")
+
+    def test_reading_files_success(self):
+        """ 050A - Reads, appends and rewrites readings the same way through the csv and binary files """
+
+        csv_manager = PressureReadingManager(TestBinaryReadingFile.TEST_CSV_FILE)
+        readings = csv_manager.get_all_readings()
+        reading_files = [CsvReadingFile(TestBinaryReadingFile.TEST_CSV_FILE, csv_manager._load_reading_chunks, csv_manager._reading_to_list),
+                         self.binary_file]
+
+        for reading_file in reading_files:
+            reading_file.write_readings(readings[:2])
+            reading_file.append_readings(readings[2:])
+            self.assertEqual([csv_manager._reading_to_list(r) for r in reading_file.read_readings(PressureReading)],
+                             [csv_manager._reading_to_list(r) for r in readings], "Must read back what was written")
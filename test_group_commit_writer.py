@@ -0,0 +1,125 @@
+from managers.group_commit_writer import GroupCommitWriter
+from managers.reading_locks import ReadWriteLock
+from managers.temperature_reading_manager import TemperatureReadingManager
+from readings.temperature_reading import TemperatureReading
+from unittest import TestCase
+import datetime
+import inspect
+import threading
+import time
+import os
+
+class TestGroupCommitWriter(TestCase):
+    """ Unit Tests for the GroupCommitWriter Class and group commit in the reading managers """
+
+    TEST_FILE = "group_commit_testresults.csv"
+    THREAD_COUNT = 8
+
+    def logPoint(self):
+        """ Display test specific information """
+
+        currentTest = self.id().split('.')[-1]
+        callingFunction = inspect.stack()[1][3]
+        print('in %s - %s()' % (currentTest, callingFunction))
+
+    def setUp(self):
+        """ Creates fixtures before each test """
+
+        self.logPoint()
+        open(TestGroupCommitWriter.TEST_FILE, "w").close()
+        self.writes = []
+        self.lock = ReadWriteLock()
+
+    def tearDown(self):
+        """ Create a test fixture after each test method is run """
+
+        for suffix in ("", ".seq", ".tmp"):
+            try:
+                os.remove(TestGroupCommitWriter.TEST_FILE + suffix)
+            except:
+                pass
+
+        self.logPoint()
+
+    def _create_reading(self):
+        """ Returns a temperature reading with no sequence number yet """
+
+        reading_datetime = datetime.datetime.strptime("2018-09-23 19:56:01.345", "%Y-%m-%d %H:%M:%S.%f")
+        return TemperatureReading(reading_datetime, 0, "ABC Sensor Temp M301A", 20.152, 21.367, 22.005, "OK")
+
+    def _run_threads(self, target):
+        """ Runs target in THREAD_COUNT threads and waits for all of them """
+
+        threads = [threading.Thread(target=target) for i in range(TestGroupCommitWriter.THREAD_COUNT)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def test_submit_success(self):
+        """ 010A - Writes items from concurrent callers together once the delay is up """
+
+        writer = GroupCommitWriter(self.writes.append, self.lock.write_locked, 50, 1000)
+        self._run_threads(lambda: writer.submit([threading.get_ident()]).wait())
+
+        self.assertEqual(sum(len(items) for items in self.writes), TestGroupCommitWriter.THREAD_COUNT, "Must write every item")
+        self.assertLess(len(self.writes), TestGroupCommitWriter.THREAD_COUNT, "Must group items into fewer writes")
+
+    def test_submit_full_batch_success(self):
+        """ 010B - Writes a batch as soon as it holds max rows """
+
+        writer = GroupCommitWriter(self.writes.append, self.lock.write_locked, 60000, 2)
+        start = time.monotonic()
+        writer.submit([1, 2]).wait()
+        self.assertLess(time.monotonic() - start, 10, "Must not wait for the delay")
+        self.assertEqual(self.writes, [[1, 2]], "Must write the full batch")
+
+    def test_submit_fail(self):
+        """ 010C - Raises the write error in every waiting caller """
+
+        def write(items):
+            raise OSError("disk full")
+
+        writer = GroupCommitWriter(write, self.lock.write_locked, 1, 10)
+        with self.assertRaises(OSError):
+            writer.submit([1]).wait()
+
+    def test_manager_success(self):
+        """ 020A - Appends grouped readings to the file in sequence number order """
+
+        reading_manager = TemperatureReadingManager(TestGroupCommitWriter.TEST_FILE, commit_delay=5, use_fsync=True)
+        self._run_threads(lambda: [reading_manager.add_reading(self._create_reading()) for i in range(10)])
+
+        reading_manager.add_readings([self._create_reading()])
+        reloaded = TemperatureReadingManager(TestGroupCommitWriter.TEST_FILE)
+        self.assertEqual([r.get_sequence_num() for r in reloaded.get_all_readings()],
+                         list(range(1, TestGroupCommitWriter.THREAD_COUNT * 10 + 2)), "Must write every reading once")
+        with open(TestGroupCommitWriter.TEST_FILE) as f:
+            self.assertEqual(len(f.readlines()), TestGroupCommitWriter.THREAD_COUNT * 10 + 1, "Must not duplicate rows")
+
+    def test_manager_rewrite_success(self):
+        """ 020B - Writes waiting readings before an update rewrites the file, and only once """
+
+        reading_manager = TemperatureReadingManager(TestGroupCommitWriter.TEST_FILE, commit_delay=60000)
+        adder = threading.Thread(target=lambda: reading_manager.add_readings([self._create_reading(), self._create_reading()]))
+        adder.start()
+        while len(reading_manager.get_all_readings()) < 2:
+            time.sleep(0.001)
+
+        reading = self._create_reading()
+        reading.set_sequence_num(1)
+        self.assertEqual(reading_manager.update_reading(reading), 1, "Must update the waiting reading")
+        adder.join(10)
+        self.assertFalse(adder.is_alive(), "Must release the waiting caller")
+
+        with open(TestGroupCommitWriter.TEST_FILE) as f:
+            self.assertEqual(len(f.readlines()), 2, "Must not duplicate rows")
+
+    def test_manager_fail(self):
+        """ 020C - Rejects group commit together with the file lock """
+
+        with self.assertRaises(ValueError):
+            TemperatureReadingManager(TestGroupCommitWriter.TEST_FILE, commit_delay=5, use_file_lock=True)
+
+        with self.assertRaises(ValueError):
+            TemperatureReadingManager(TestGroupCommitWriter.TEST_FILE, commit_delay="5")
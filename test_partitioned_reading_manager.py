@@ -0,0 +1,245 @@
+from managers.partitioned_reading_manager import PartitionedReadingManager
+from managers.temperature_reading_manager import TemperatureReadingManager
+from managers.reading_archive import ReadingArchive
+from readings.temperature_reading import TemperatureReading
+from readings.pressure_reading import PressureReading
+from unittest import TestCase
+import datetime
+import inspect
+import shutil
+import json
+import os
+
+class TestPartitionedReadingManager(TestCase):
+    """ Unit Tests for the PartitionedReadingManager Class """
+
+    TEST_DIRECTORY = "partitioned_testresults"
+    MODEL_A = "ABC Sensor Temp M301A"
+    MODEL_B = "ABC Sensor Temp M302B"
+
+    def logPoint(self):
+        """ Display test specific information """
+
+        currentTest = self.id().split('.')[-1]
+        callingFunction = inspect.stack()[1][3]
+        print('in %s - %s()' % (currentTest, callingFunction))
+
+    def setUp(self):
+        """ Creates fixtures before each test """
+
+        self.logPoint()
+        self.reading_datetime = datetime.datetime.strptime("2018-09-23 19:56:01.345", "%Y-%m-%d %H:%M:%S.%f")
+        self.reading_manager = self._open()
+        # Model A on two days and model B on one, interleaved
+        self.reading_manager.add_readings([self._create_reading(TestPartitionedReadingManager.MODEL_A, 0),
+                                           self._create_reading(TestPartitionedReadingManager.MODEL_B, 1, "HIGH_TEMP"),
+                                           self._create_reading(TestPartitionedReadingManager.MODEL_A, 1440, "LOW_TEMP")])
+        self.reading_manager.add_reading(self._create_reading(TestPartitionedReadingManager.MODEL_B, 2))
+
+    def tearDown(self):
+        """ Create a test fixture after each test method is run """
+
+        shutil.rmtree(TestPartitionedReadingManager.TEST_DIRECTORY, ignore_errors=True)
+        self.logPoint()
+
+    def _open(self, **options):
+        """ Returns a manager on the test directory partitioned by model and day """
+
+        return PartitionedReadingManager(TestPartitionedReadingManager.TEST_DIRECTORY, TemperatureReadingManager,
+                                         partition_period="day", use_journal=True, **options)
+
+    def _list_files(self):
+        """ Returns the partition files in the test directory, sorted """
+
+        return sorted(name for name in os.listdir(TestPartitionedReadingManager.TEST_DIRECTORY) if name.endswith((".csv", ReadingArchive.FILE_SUFFIX)))
+
+    def _create_reading(self, model, minutes, status="OK"):
+        """ Returns a temperature reading of a model taken some minutes after the fixture timestamp """
+
+        return TemperatureReading(self.reading_datetime + datetime.timedelta(minutes=minutes), 0, model,
+                                  20.152, 21.367, 22.005, status)
+
+    def _seq_nums(self, readings):
+        """ Returns the sequence numbers of readings """
+
+        return [reading.get_sequence_num() for reading in readings]
+
+    def test_add_reading_success(self):
+        """ 010A - Writes each model and day to its own partition with globally unique sequence numbers """
+
+        self.assertEqual(self._seq_nums(self.reading_manager.get_all_readings()), [1, 2, 3, 4], "Must number readings across partitions")
+        self.assertEqual(self.reading_manager.get_models(), [TestPartitionedReadingManager.MODEL_A, TestPartitionedReadingManager.MODEL_B],
+                         "Must list the partitioned models")
+
+        with open(os.path.join(TestPartitionedReadingManager.TEST_DIRECTORY, PartitionedReadingManager.MANIFEST_FILE)) as manifest_file:
+            manifest = json.load(manifest_file)
+        with open(os.path.join(TestPartitionedReadingManager.TEST_DIRECTORY, PartitionedReadingManager.MANIFEST_FILE +
+                               PartitionedReadingManager.MANIFEST_LOG_SUFFIX)) as log_file:
+            self.assertEqual(json.loads(log_file.readlines()[-1])["last_seq_num"], 4, "Must log the last sequence number")
+        self.assertEqual(len(manifest["partitions"]), 3, "Must create a partition per model and day")
+
+        partition_file = os.path.join(TestPartitionedReadingManager.TEST_DIRECTORY, manifest["partitions"][1]["file"])
+        self.assertEqual(self._seq_nums(TemperatureReadingManager(partition_file).get_all_readings()), [2, 4],
+                         "Must keep a partition's readings in its own csv file")
+
+    def test_reopen_success(self):
+        """ 010B - Reloads the partitions from the manifest and keeps numbering after the last reading """
+
+        self.reading_manager.delete_reading(4)
+        reading_manager = self._open()
+        self.assertEqual(reading_manager.get_reading(3).get_status(), "LOW_TEMP", "Must find a reading in its partition")
+        self.assertIsNone(reading_manager.get_reading(4), "Must not return a deleted reading")
+
+        reading = self._create_reading(TestPartitionedReadingManager.MODEL_B, 3)
+        reading_manager.add_reading(reading)
+        self.assertEqual(reading.get_sequence_num(), 5, "Must not reuse a deleted sequence number")
+
+    def test_update_delete_success(self):
+        """ 020A - Updates readings in place or moves them to their new partition, and deletes them """
+
+        reading = self._create_reading(TestPartitionedReadingManager.MODEL_A, 0, "HIGH_TEMP")
+        reading.set_sequence_num(1)
+        self.assertEqual(self.reading_manager.update_reading(reading), 1, "Must update the reading")
+
+        moved = self._create_reading(TestPartitionedReadingManager.MODEL_B, 5)
+        moved.set_sequence_num(3)
+        self.assertEqual(self.reading_manager.update_reading(moved), 1, "Must move the reading")
+        self.assertEqual(self._seq_nums(self.reading_manager.get_readings_between(model=TestPartitionedReadingManager.MODEL_B)), [2, 4, 3],
+                         "Must find the moved reading in its new partition")
+        self.assertEqual(self._seq_nums(self.reading_manager.get_all_readings()), [1, 2, 3, 4], "Must keep the reading only once")
+
+        self.assertEqual(self.reading_manager.delete_reading(2), 1, "Must delete the reading")
+        self.assertEqual(self._seq_nums(self._open().get_all_readings()), [1, 3, 4], "Must keep the changes on disk")
+
+    def test_update_delete_fail(self):
+        """ 020B - Ignores unknown sequence numbers and readings of another type """
+
+        reading = self._create_reading(TestPartitionedReadingManager.MODEL_A, 0)
+        reading.set_sequence_num(99)
+        self.assertEqual(self.reading_manager.update_reading(reading), 0, "Must not update a missing reading")
+        self.assertEqual(self.reading_manager.delete_reading(99), 0, "Must not delete a missing reading")
+        self.assertIsNone(self.reading_manager.update_reading(PressureReading(self.reading_datetime, 1, "ABC Sensor Pres M100", 50.163, 51.435, 52.103, "GOOD")),
+                          "Must reject readings of another type")
+
+        with self.assertRaises(ValueError):
+            self.reading_manager.delete_reading("1")
+
+    def test_queries_success(self):
+        """ 030A - Merges range, page, error and stats queries across partitions in order """
+
+        self.assertEqual(self._seq_nums(self.reading_manager.get_readings_after(1, 2)), [2, 3], "Must page across partitions")
+        end = self.reading_datetime + datetime.timedelta(minutes=1)
+        self.assertEqual(self._seq_nums(self.reading_manager.get_readings_between(end=end)), [1, 2], "Must filter by time")
+        self.assertEqual(self._seq_nums(self.reading_manager.get_error_readings()), [2, 3], "Must merge error readings")
+        self.assertEqual([bucket["count"] for bucket in self.reading_manager.get_stats("day")], [3, 1], "Must aggregate across partitions")
+
+    def test_pruning_success(self):
+        """ 030B - Opens only the partitions a model- and time-filtered query can match """
+
+        reading_manager = self._open()
+        readings = reading_manager.get_readings_between(end=self.reading_datetime + datetime.timedelta(minutes=10),
+                                                        model=TestPartitionedReadingManager.MODEL_A)
+        self.assertEqual(self._seq_nums(readings), [1], "Must return the model's readings in range")
+        self.assertEqual(len(reading_manager._managers), 1, "Must not open the partitions outside the model and range")
+
+    def test_constructor_fail(self):
+        """ 040A - Raises ValueError for a missing directory name, manager class or a corrupt manifest """
+
+        with self.assertRaises(ValueError):
+            PartitionedReadingManager("", TemperatureReadingManager)
+
+        with self.assertRaises(ValueError):
+            PartitionedReadingManager(TestPartitionedReadingManager.TEST_DIRECTORY, None)
+
+        with self.assertRaises(ValueError):
+            self._open(retention_days=1, retention_action="delete")
+
+        with open(os.path.join(TestPartitionedReadingManager.TEST_DIRECTORY, PartitionedReadingManager.MANIFEST_FILE), "w") as manifest_file:
+            manifest_file.write("{}")
+        with self.assertRaises(ValueError):
+            self._open()
+
+    def test_retention_drop_success(self):
+        """ 050A - Drops the partitions older than the retention period and never reuses their files or sequence numbers """
+
+        reading_manager = self._open(retention_days=1)
+        now = self.reading_datetime + datetime.timedelta(days=2)
+        self.assertEqual(reading_manager.apply_retention(now), 2, "Must drop the partitions of the first day")
+        self.assertEqual(reading_manager.apply_retention(now), 0, "Must not drop the newer partition")
+        self.assertEqual(self._seq_nums(reading_manager.get_all_readings()), [3], "Must keep only the newer readings")
+        self.assertIsNone(reading_manager.get_reading(1), "Must not find a dropped reading")
+        self.assertEqual(self._list_files(), ["partition-00003.csv"], "Must remove the dropped partition files")
+
+        reading = self._create_reading(TestPartitionedReadingManager.MODEL_B, 1441)
+        self._open().add_reading(reading)
+        self.assertEqual(reading.get_sequence_num(), 5, "Must keep numbering after the dropped readings")
+        self.assertEqual(self._list_files(), ["partition-00003.csv", "partition-00004.csv"], "Must not reuse a dropped file name")
+
+    def test_retention_archive_success(self):
+        """ 050B - Archives old partitions into gzipped files that are still queried and restored when changed """
+
+        reading_manager = self._open(retention_days=1, retention_action=PartitionedReadingManager.RETENTION_ARCHIVE)
+        now = self.reading_datetime + datetime.timedelta(days=2)
+        self.assertEqual(reading_manager.apply_retention(now), 2, "Must archive the partitions of the first day")
+        self.assertEqual(reading_manager.apply_retention(now), 0, "Must not archive a partition twice")
+        self.assertEqual(self._list_files(), ["partition-00001.csv.arc", "partition-00002.csv.arc", "partition-00003.csv"],
+                         "Must replace the csv files with archives")
+
+        reading_manager = self._open()
+        self.assertEqual(self._seq_nums(reading_manager.get_all_readings()), [1, 2, 3, 4], "Must read archived partitions")
+        self.assertEqual(reading_manager.get_reading(2).get_status(), "HIGH_TEMP", "Must find a reading in an archive")
+
+        reading = self._create_reading(TestPartitionedReadingManager.MODEL_B, 1, "LOW_TEMP")
+        reading.set_sequence_num(2)
+        self.assertEqual(reading_manager.update_reading(reading), 1, "Must update an archived reading")
+        self.assertEqual(self._list_files(), ["partition-00001.csv.arc", "partition-00002.csv", "partition-00003.csv"],
+                         "Must restore the changed partition")
+        self.assertEqual(self._open().get_reading(2).get_status(), "LOW_TEMP", "Must keep the change on disk")
+
+    def test_time_segments_success(self):
+        """ 060A - Rolls the readings of every model into one segment per period when not partitioning by model """
+
+        shutil.rmtree(TestPartitionedReadingManager.TEST_DIRECTORY)
+        reading_manager = PartitionedReadingManager(TestPartitionedReadingManager.TEST_DIRECTORY, TemperatureReadingManager,
+                                                    partition_by_model=False, partition_period="hour")
+        reading_manager.add_readings([self._create_reading(TestPartitionedReadingManager.MODEL_A, 0),
+                                      self._create_reading(TestPartitionedReadingManager.MODEL_B, 1),
+                                      self._create_reading(TestPartitionedReadingManager.MODEL_A, 60)])
+
+        self.assertEqual(self._list_files(), ["partition-00001.csv", "partition-00002.csv"], "Must write a segment per hour")
+        self.assertEqual(reading_manager.get_models(), [], "Must not list models without model partitions")
+        self.assertEqual(self._seq_nums(reading_manager.get_readings_between(model=TestPartitionedReadingManager.MODEL_A)), [1, 3],
+                         "Must filter a model within the segments")
+
+    def test_manifest_log_success(self):
+        """ 010C - Logs adds to existing partitions instead of rewriting the manifest, and reads the log back """
+
+        manifest_filename = os.path.join(TestPartitionedReadingManager.TEST_DIRECTORY, PartitionedReadingManager.MANIFEST_FILE)
+        manifest_inode = os.stat(manifest_filename).st_ino
+        self.reading_manager.add_reading(self._create_reading(TestPartitionedReadingManager.MODEL_B, 30))
+        self.assertEqual(os.stat(manifest_filename).st_ino, manifest_inode, "Must not rewrite the manifest")
+
+        reading_manager = self._open()
+        start = self.reading_datetime + datetime.timedelta(minutes=20)
+        self.assertEqual(self._seq_nums(reading_manager.get_readings_between(start, model=TestPartitionedReadingManager.MODEL_B)), [5],
+                         "Must widen the partition by the logged range")
+        reading_manager.add_reading(self._create_reading(TestPartitionedReadingManager.MODEL_A, 2880))
+        self.assertNotEqual(os.stat(manifest_filename).st_ino, manifest_inode, "Must rewrite the manifest for a new partition")
+        self.assertEqual(os.path.getsize(manifest_filename + PartitionedReadingManager.MANIFEST_LOG_SUFFIX), 0,
+                         "Must empty the log once the manifest covers it")
+        self.assertEqual(self._seq_nums(self._open().get_all_readings()), [1, 2, 3, 4, 5, 6], "Must keep numbering across the log")
+
+    def test_refresh_success(self):
+        """ 010D - Catches up with the adds of another manager in place, and asks to be reopened once the manifest is rewritten """
+
+        other_manager = self._open()
+        other_manager.add_reading(self._create_reading(TestPartitionedReadingManager.MODEL_B, 30))
+        self.assertTrue(self.reading_manager.is_stale(), "Must see the other manager's add")
+        self.assertTrue(self.reading_manager.refresh(), "Must catch up from the manifest log")
+        self.assertFalse(self.reading_manager.is_stale(), "Must be up to date after catching up")
+        start = self.reading_datetime + datetime.timedelta(minutes=20)
+        self.assertEqual(self._seq_nums(self.reading_manager.get_readings_between(start, model=TestPartitionedReadingManager.MODEL_B)), [5],
+                         "Must find the other manager's reading")
+
+        other_manager.add_reading(self._create_reading(TestPartitionedReadingManager.MODEL_A, 2880))
+        self.assertFalse(self.reading_manager.refresh(), "Must not catch up with a rewritten manifest")
@@ -0,0 +1,349 @@
+from reading_api_async import ReadingWriter, ReadingServer, HttpError, read_request
+from unittest import TestCase
+import reading_api
+import asyncio
+import urllib.parse
+import threading
+import inspect
+import json
+import glob
+import os
+
+class RecordingManager:
+    """ Stand-in reading manager recording the batches it is given """
+
+    def __init__(self):
+        """ Initializes the manager with no batches """
+
+        self.batches = []
+
+    def add_readings(self, readings):
+        """ Records a batch """
+
+        self.batches.append(list(readings))
+        return len(readings)
+
+
+class TestReadingApiAsync(TestCase):
+    """ Unit Tests for the asyncio reading server """
+
+    TEST_FILE = "reading_api_async_testresults.csv"
+    READING = {"timestamp": "2018-09-23 19:56:01.345", "model": "ABC Sensor Temp M301A",
+               "min": "20.152", "avg": "21.367", "max": "22.005", "status": "OK"}
+
+    def logPoint(self):
+        """ Display test specific information """
+
+        currentTest = self.id().split('.')[-1]
+        callingFunction = inspect.stack()[1][3]
+        print('in %s - %s()' % (currentTest, callingFunction))
+
+    def setUp(self):
+        """ Creates fixtures before each test """
+
+        self.logPoint()
+        open(TestReadingApiAsync.TEST_FILE, "w").close()
+        self.temp_readings_file = reading_api.temp_readings_file
+        reading_api.temp_readings_file = TestReadingApiAsync.TEST_FILE
+        reading_api.response_cache.clear()
+
+    def tearDown(self):
+        """ Create a test fixture after each test method is run """
+
+        reading_api.temp_readings_file = self.temp_readings_file
+        reading_api.reading_manager_registry.clear()
+        for filename in glob.glob(TestReadingApiAsync.TEST_FILE + "*"):
+            os.remove(filename)
+
+        self.logPoint()
+
+    def _parse(self, data):
+        """ Returns the request parsed from raw bytes """
+
+        async def parse():
+            reader = asyncio.StreamReader()
+            reader.feed_data(data)
+            reader.feed_eof()
+            return await read_request(reader)
+
+        return asyncio.run(parse())
+
+    async def _send(self, port, requests):
+        """ Sends raw requests on one connection and returns the status, body and headers of each response """
+
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        responses = []
+        for request in requests:
+            writer.write(request)
+            await writer.drain()
+            status = int((await reader.readline()).split()[1])
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line == b"\r\n":
+                    break
+                name, value = line.decode().split(":", 1)
+                headers[name.lower()] = value.strip()
+            responses.append((status, await reader.readexactly(int(headers["content-length"])), headers))
+
+        writer.close()
+        return responses
+
+    def _post(self, path, body):
+        """ Returns a raw POST request with a JSON body """
+
+        body = json.dumps(body).encode()
+        return b"POST %s HTTP/1.1\r\nHost: test\r\nContent-Length: %d\r\n\r\n%s" % (path.encode(), len(body), body)
+
+    def test_read_request_success(self):
+        """ 010A - Parses the method, path, query, headers and body of a request """
+
+        request = self._parse(b"PUT /sensor/temperature/reading/3?x=1 HTTP/1.1\r\nContent-Length: 2\r\nConnection: close\r\n\r\n{}")
+        self.assertEqual(request.method, "PUT", "Must parse the method")
+        self.assertEqual(request.path, "/sensor/temperature/reading/3", "Must split off the query")
+        self.assertEqual(request.args, {"x": "1"}, "Must parse the query")
+        self.assertEqual(request.get_json(), {}, "Must read the body")
+        self.assertFalse(request.keep_alive(), "Must honour Connection: close")
+        self.assertIsNone(self._parse(b""), "Must return None once the client closed the connection")
+
+    def test_read_request_fail(self):
+        """ 010B - Rejects malformed requests """
+
+        for data in (b"GARBAGE\r\n\r\n", b"POST / HTTP/1.1\r\nContent-Length: x\r\n\r\n",
+                     b"POST / HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n"):
+            with self.assertRaises(HttpError):
+                self._parse(data)
+
+    def test_writer_batch_success(self):
+        """ 020A - Writes the adds queued for the same manager in one batch, in order """
+
+        async def run():
+            reading_writer = ReadingWriter()
+            manager = RecordingManager()
+            futures = [reading_writer.submit(ReadingWriter.ADD, manager, i) for i in range(5)]
+            reading_writer.start()
+            results = await asyncio.gather(*futures)
+            await reading_writer.stop()
+            return manager.batches, results
+
+        batches, results = asyncio.run(run())
+        self.assertEqual(batches, [[0, 1, 2, 3, 4]], "Must write the queued adds together")
+        self.assertEqual(results, [0, 1, 2, 3, 4], "Must resolve every future")
+
+    def test_writer_queue_full_fail(self):
+        """ 020B - Turns writes away once the queue is full """
+
+        async def run():
+            reading_writer = ReadingWriter(1)
+            manager = RecordingManager()
+            future = reading_writer.submit(ReadingWriter.ADD, manager, 1)
+            with self.assertRaises(asyncio.QueueFull):
+                reading_writer.submit(ReadingWriter.ADD, manager, 2)
+            reading_writer.start()
+            await future
+            await reading_writer.stop()
+
+        asyncio.run(run())
+
+    def test_server_success(self):
+        """ 030A - Adds, updates, gets and deletes readings over keep-alive connections """
+
+        async def run():
+            reading_server = ReadingServer()
+            server = await reading_server.start("127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            posts = [self._post("/sensor/temperature/reading", TestReadingApiAsync.READING) for i in range(3)]
+            added = await asyncio.gather(*[self._send(port, [post]) for post in posts])
+
+            updated = dict(TestReadingApiAsync.READING, status="UPDATED")
+            body = json.dumps(updated).encode()
+            responses = await self._send(port, [
+                b"PUT /sensor/temperature/reading/2 HTTP/1.1\r\nContent-Length: %d\r\n\r\n%s" % (len(body), body),
+                b"GET /sensor/temperature/reading/2 HTTP/1.1\r\n\r\n",
+                b"DELETE /sensor/temperature/reading/1 HTTP/1.1\r\n\r\n",
+                b"GET /sensor/temperature/reading/1 HTTP/1.1\r\n\r\n",
+                b"GET /sensor/temperature/reading/all?limit=10 HTTP/1.1\r\n\r\n"])
+            await reading_server.stop()
+            return added, responses
+
+        added, responses = asyncio.run(run())
+        seq_nums = sorted(int(json.loads(response[0][1])["sequence_num"]) for response in added)
+        self.assertEqual(seq_nums, [1, 2, 3], "Must give every reading its own sequence number")
+        self.assertEqual([response[0] for response in responses], [200, 200, 200, 404, 200], "Must answer every request")
+        self.assertEqual(json.loads(responses[1][1])["status"], "UPDATED", "Must return the updated reading")
+        self.assertEqual([int(reading["sequencenum"]) for reading in json.loads(responses[4][1])], [2, 3], "Must list the remaining readings")
+
+    def test_server_fail(self):
+        """ 030B - Answers bad requests with 400 and unknown routes with 404 """
+
+        async def run():
+            reading_server = ReadingServer()
+            server = await reading_server.start("127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            responses = await self._send(port, [
+                self._post("/sensor/temperature/reading", {"min": "x"}),
+                self._post("/sensor/humidity/reading", TestReadingApiAsync.READING),
+                b"PUT /sensor/temperature/reading/9 HTTP/1.1\r\nContent-Length: 2\r\n\r\n{}",
+                b"GET /nowhere HTTP/1.1\r\n\r\n"])
+            await reading_server.stop()
+            return responses
+
+        self.assertEqual([response[0] for response in asyncio.run(run())], [400, 400, 400, 404], "Must reject the requests")
+
+    def test_etag_success(self):
+        """ 040A - Answers 304 while the readings are unchanged and serves repeated GETs from the response cache """
+
+        async def run():
+            reading_server = ReadingServer()
+            server = await reading_server.start("127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            await self._send(port, [self._post("/sensor/temperature/reading", TestReadingApiAsync.READING)])
+            first = await self._send(port, [b"GET /sensor/temperature/reading/1 HTTP/1.1\r\n\r\n"])
+            etag = first[0][2]["etag"].encode()
+            responses = await self._send(port, [
+                b"GET /sensor/temperature/reading/1 HTTP/1.1\r\nIf-None-Match: %s\r\n\r\n" % etag,
+                b"GET /sensor/temperature/reading/1 HTTP/1.1\r\n\r\n",
+                self._post("/sensor/temperature/reading", TestReadingApiAsync.READING),
+                b"GET /sensor/temperature/reading/1 HTTP/1.1\r\nIf-None-Match: %s\r\n\r\n" % etag])
+            await reading_server.stop()
+            return first + responses
+
+        responses = asyncio.run(run())
+        self.assertEqual([response[0] for response in responses], [200, 304, 200, 200, 200], "Must answer 304 only while unchanged")
+        self.assertEqual(responses[2][1], responses[0][1], "Must serve the same response from the cache")
+        self.assertNotEqual(responses[4][2]["etag"], responses[0][2]["etag"], "Must change the ETag after a write")
+        stats = reading_api.response_cache.get_stats()
+        self.assertEqual((stats["hits"], stats["not_modified"]), (1, 1), "Must count cache hits and 304s")
+
+    def test_numeric_media_type_success(self):
+        """ 040B - Answers with numeric fields and its own ETag when the client accepts the numeric media type """
+
+        async def run():
+            reading_server = ReadingServer()
+            server = await reading_server.start("127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            await self._send(port, [self._post("/sensor/temperature/reading", TestReadingApiAsync.READING)])
+            accept = reading_api.NUMERIC_JSON_MIMETYPE.encode()
+            responses = await self._send(port, [
+                b"GET /sensor/temperature/reading/all HTTP/1.1\r\nAccept: %s\r\n\r\n" % accept,
+                b"GET /sensor/temperature/reading/all HTTP/1.1\r\n\r\n"])
+            await reading_server.stop()
+            return responses
+
+        numeric, plain = asyncio.run(run())
+        self.assertEqual(numeric[2]["content-type"], reading_api.NUMERIC_JSON_MIMETYPE, "Must answer with the accepted media type")
+        self.assertEqual(json.loads(numeric[1])[0]["sequence_num"], 1, "Must encode numbers as numbers")
+        self.assertEqual(json.loads(plain[1])[0]["sequencenum"], "1", "Must keep strings by default")
+        self.assertNotEqual(numeric[2]["etag"], plain[2]["etag"], "Must tag each media type differently")
+
+    def test_filtered_cursor_success(self):
+        """ 050A - Pages a listing filtered by time by (timestamp, sequence number), without skipping or repeating readings """
+
+        with open(TestReadingApiAsync.TEST_FILE, "w") as f:
+            f.write("2018-09-23 10:00:00.000000,1,ABC Sensor Temp M301A,20.152,21.367,22.005,OK\n"
+                    "2018-09-23 09:00:00.000000,2,ABC Sensor Temp M301A,20.152,21.367,22.005,OK\n"
+                    "2018-09-23 11:00:00.000000,3,ABC Sensor Temp M301A,20.152,21.367,22.005,OK\n")
+        reading_manager = reading_api.create_reading_manager("temperature")
+        start = reading_api.parse_query_timestamp("2018-09-23")
+
+        seq_nums = []
+        cursor = reading_api.parse_cursor(None, True)
+        while True:
+            readings = reading_api.select_readings(reading_manager, cursor, 1, start)
+            if not readings:
+                break
+            seq_nums.append(readings[0].get_sequence_num())
+            cursor = reading_api.parse_cursor(reading_api.format_cursor(readings[0], True), True)
+
+        self.assertEqual(seq_nums, [2, 1, 3], "Must return every reading once, in timestamp order")
+        with self.assertRaises(ValueError):
+            reading_api.parse_cursor("3", True)
+
+    def test_filtered_listing_success(self):
+        """ 050B - Filters, pages and streams the listing with the same parameters as reading_api """
+
+        with open(TestReadingApiAsync.TEST_FILE, "w") as f:
+            f.write("2018-09-23 10:00:00.000000,1,ABC Sensor Temp M301A,20.152,21.367,22.005,OK\n"
+                    "2018-09-23 09:00:00.000000,2,ABC Sensor Temp M301B,20.152,21.367,22.005,OK\n"
+                    "2018-09-23 11:00:00.000000,3,ABC Sensor Temp M301A,20.152,21.367,22.005,OK\n")
+
+        async def run():
+            reading_server = ReadingServer()
+            server = await reading_server.start("127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            first = await self._send(port, [b"GET /sensor/temperature/reading/all?start=2018-09-23T09:30&limit=1 HTTP/1.1\r\n\r\n"])
+            cursor = urllib.parse.quote(first[0][2]["x-next-cursor"]).encode()
+            responses = await self._send(port, [
+                b"GET /sensor/temperature/reading/all?start=2018-09-23T09:30&limit=1&cursor=%s HTTP/1.1\r\n\r\n" % cursor,
+                b"GET /sensor/temperature/reading/all?model=ABC%20Sensor%20Temp%20M301B HTTP/1.1\r\n\r\n",
+                b"GET /sensor/temperature/reading/all?stream=ndjson HTTP/1.1\r\n\r\n",
+                b"GET /sensor/temperature/reading/all?start=yesterday HTTP/1.1\r\n\r\n",
+                b"GET /sensor/temperature/reading/all?stream=xml HTTP/1.1\r\n\r\n"])
+            await reading_server.stop()
+            return first + responses
+
+        responses = asyncio.run(run())
+        self.assertEqual([response[0] for response in responses], [200, 200, 200, 200, 400, 400], "Must reject bad parameters only")
+        self.assertEqual([[r["sequencenum"] for r in json.loads(response[1])] for response in responses[:3]], [["1"], ["3"], ["2"]],
+                         "Must filter by start and model and page by the returned cursor")
+        self.assertEqual(responses[3][2]["content-type"], "application/x-ndjson", "Must answer a stream with its media type")
+        self.assertEqual([json.loads(line)["sequencenum"] for line in responses[3][1].splitlines()], ["1", "2", "3"],
+                         "Must stream every reading")
+
+    def test_read_off_loop_success(self):
+        """ 050C - Keeps answering other requests while a read waits for the manager's lock """
+
+        reading_manager = reading_api.create_reading_manager("temperature")
+        locked, released = threading.Event(), threading.Event()
+
+        def hold_lock():
+            with reading_manager._lock.write_locked():
+                locked.set()
+                # Bounded, so a read blocking the loop fails the test instead of hanging it
+                released.wait(2)
+
+        async def run():
+            reading_server = ReadingServer()
+            server = await reading_server.start("127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            threading.Thread(target=hold_lock).start()
+            locked.wait()
+            try:
+                waiting_read = asyncio.create_task(self._send(port, [b"GET /sensor/temperature/reading/1 HTTP/1.1\r\n\r\n"]))
+                other = await asyncio.wait_for(self._send(port, [b"GET /unknown HTTP/1.1\r\n\r\n"]), 1)
+                self.assertFalse(waiting_read.done(), "Must still be waiting for the lock")
+            finally:
+                released.set()
+            responses = other + await waiting_read
+            await reading_server.stop()
+            return responses
+
+        responses = asyncio.run(run())
+        self.assertEqual([response[0] for response in responses], [404, 404], "Must answer both requests")
+
+    def test_stream_limit_success(self):
+        """ 050D - Streams only a page of readings when a limit is given, with the cursor of the next page """
+
+        with open(TestReadingApiAsync.TEST_FILE, "w") as f:
+            for seq_num in range(1, 4):
+                f.write("2018-09-23 19:56:01.345,%d,ABC Sensor Temp M301A,20.152,21.367,22.005,OK\n" % seq_num)
+
+        response = reading_api.app.test_client().get("/sensor/temperature/reading/all?stream=ndjson&limit=2")
+        self.assertEqual([json.loads(line)["sequencenum"] for line in response.data.splitlines()], ["1", "2"],
+                         "Must stream exactly limit readings")
+        self.assertEqual(response.headers["X-Next-Cursor"], "2", "Must page a stream like a listing")
+
+        response = reading_api.app.test_client().get("/sensor/temperature/reading/all?stream=ndjson&cursor=2&limit=2")
+        self.assertEqual(len(response.data.splitlines()), 1, "Must stream the rest after the cursor")
+        self.assertNotIn("X-Next-Cursor", response.headers, "Must not page past the last reading")
+
+    def test_offset_timestamp_fail(self):
+        """ 050E - Answers 400 to timestamps with a UTC offset, since readings are stored without one """
+
+        client = reading_api.app.test_client()
+        for path in ("/sensor/temperature/reading/all", "/sensor/temperature/stats", "/sensor/temperature/errors"):
+            response = client.get(path, query_string={"start": "2026-01-01T00:00:00+00:00"})
+            self.assertEqual(response.status_code, 400, "Must reject an offset-aware start on " + path)
+
+        response = client.get("/sensor/temperature/reading/all", query_string={"model": "M", "cursor": "2026-01-01T00:00:00+00:00,1"})
+        self.assertEqual(response.status_code, 400, "Must reject an offset-aware cursor")
@@ -0,0 +1,88 @@
+from managers.reading_archive import ReadingArchive
+from readings.temperature_reading import TemperatureReading
+from unittest import TestCase
+import datetime
+import inspect
+import os
+
+class TestReadingArchive(TestCase):
+    """ Unit Tests for the ReadingArchive Class """
+
+    TEST_FILE = "archive_testresults.arc"
+    MODEL_A = "ABC Sensor Temp M301A"
+    MODEL_B = "ABC Sensor Temp M302B"
+
+    def logPoint(self):
+        """ Display test specific information """
+
+        currentTest = self.id().split('.')[-1]
+        callingFunction = inspect.stack()[1][3]
+        print('in %s - %s()' % (currentTest, callingFunction))
+
+    def setUp(self):
+        """ Creates fixtures before each test """
+
+        self.logPoint()
+        self.reading_datetime = datetime.datetime.strptime("2018-09-23 19:56:01.345", "%Y-%m-%d %H:%M:%S.%f")
+        # Ten readings a minute apart, written newest first, model A for the even ones and every fifth an error
+        self.readings = [TemperatureReading(self.reading_datetime + datetime.timedelta(minutes=i), i + 1,
+                                            TestReadingArchive.MODEL_A if i % 2 == 0 else TestReadingArchive.MODEL_B,
+                                            20.152, 21.367, 22.005 + i, "HIGH_TEMP" if i % 5 == 4 else "OK")
+                         for i in reversed(range(10))]
+        self.archive = ReadingArchive(TestReadingArchive.TEST_FILE, TemperatureReading)
+        self.archive.write_readings(self.readings, ReadingArchive.GZIP_CODEC, 3)
+
+    def tearDown(self):
+        """ Create a test fixture after each test method is run """
+
+        try:
+            os.remove(TestReadingArchive.TEST_FILE)
+        except:
+            pass
+
+        self.logPoint()
+
+    def _seq_nums(self, readings):
+        """ Returns the sequence numbers of readings """
+
+        return [reading.get_sequence_num() for reading in readings]
+
+    def test_read_readings_success(self):
+        """ 010A - Reads back every reading and value in sequence number order """
+
+        archive = ReadingArchive(TestReadingArchive.TEST_FILE, TemperatureReading)
+        self.assertEqual(archive.get_codec(), ReadingArchive.GZIP_CODEC, "Must record the codec")
+        readings = archive.get_all_readings()
+        self.assertEqual(self._seq_nums(readings), list(range(1, 11)), "Must keep every reading")
+        self.assertEqual((readings[9].get_timestamp(), readings[9].get_max_value(), readings[9].get_status()),
+                         (self.reading_datetime + datetime.timedelta(minutes=9), 22.005 + 9, "HIGH_TEMP"), "Must keep every value")
+        self.assertEqual(self._seq_nums(archive.get_readings_after(8)), [9, 10], "Must page by sequence number")
+        self.assertEqual(archive.get_reading(7).get_sensor_model(), TestReadingArchive.MODEL_A, "Must find a reading")
+        self.assertIsNone(archive.get_reading(11), "Must return None for a missing reading")
+
+    def test_read_blocks_success(self):
+        """ 020A - Decompresses only the blocks a range query can match """
+
+        archive = ReadingArchive(TestReadingArchive.TEST_FILE, TemperatureReading)
+        start = self.reading_datetime + datetime.timedelta(minutes=4)
+        end = self.reading_datetime + datetime.timedelta(minutes=5)
+        self.assertEqual(self._seq_nums(archive.get_readings_between(start, end)), [5, 6], "Must filter by time")
+        self.assertEqual(list(archive._block_cache), [1], "Must decompress only the block in range")
+
+        self.assertEqual(self._seq_nums(archive.get_readings_between(start=end, model=TestReadingArchive.MODEL_A)), [7, 9],
+                         "Must filter by model in timestamp order")
+        self.assertEqual(self._seq_nums(archive.get_error_readings(status="HIGH_TEMP")), [5, 10], "Must find the errors")
+
+    def test_read_readings_fail(self):
+        """ 020B - Raises ValueError for an unknown codec, invalid block size or a file that is not an archive """
+
+        with self.assertRaises(ValueError):
+            self.archive.write_readings(self.readings, "lz4")
+
+        with self.assertRaises(ValueError):
+            self.archive.write_readings(self.readings, ReadingArchive.GZIP_CODEC, 0)
+
+        with open(TestReadingArchive.TEST_FILE, "r+b") as archive_file:
+            archive_file.write(b"XXXX")
+        with self.assertRaises(ValueError):
+            ReadingArchive(TestReadingArchive.TEST_FILE, TemperatureReading).get_all_readings()
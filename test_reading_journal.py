@@ -0,0 +1,107 @@
+from managers.reading_journal import ReadingJournal
+from managers.pressure_reading_manager import PressureReadingManager
+from readings.pressure_reading import PressureReading
+from unittest import TestCase
+import datetime
+import inspect
+import os
+import time
+
+class TestReadingJournal(TestCase):
+    """ Unit Tests for journaled updates and deletes in the reading managers """
+
+    TEST_FILE = "journal_testresults.csv"
+    TEST_PRES_READINGS = [
+            "2018-09-23 19:56,ABC Sensor Pres M100,1,50.163,51.435,52.103,GOOD\n",
+            "2018-09-23 20:00,ABC Sensor Pres M100,2,100.0,100.0,100.0,HIGH_PRESSURE\n",
+            "2018-09-23 20:06,ABC Sensor Pres M100,3,0.0,0.0,0.0,LOW_PRESSURE\n" ]
+
+    def logPoint(self):
+        """ Display test specific information """
+
+        currentTest = self.id().split('.')[-1]
+        callingFunction = inspect.stack()[1][3]
+        print('in %s - %s()' % (currentTest, callingFunction))
+
+    def setUp(self):
+        """ Creates fixtures before each test """
+
+        self.logPoint()
+        with open(TestReadingJournal.TEST_FILE, "w") as f:
+            f.writelines(TestReadingJournal.TEST_PRES_READINGS)
+        self.reading_manager = PressureReadingManager(TestReadingJournal.TEST_FILE, use_journal=True)
+
+        reading_datetime = datetime.datetime.strptime("2018-09-23 19:56", "%Y-%m-%d %H:%M")
+        self.reading_update = PressureReading(reading_datetime, 1, "ABC Sensor Pres M100", 50.163, 51.435, 52.103, "UPDATED")
+
+    def tearDown(self):
+        """ Create a test fixture after each test method is run """
+
+        for suffix in ("", ".seq", ReadingJournal.FILE_SUFFIX):
+            try:
+                os.remove(TestReadingJournal.TEST_FILE + suffix)
+            except:
+                pass
+
+        self.logPoint()
+
+    def _read_csv_lines(self):
+        """ Returns the lines of the csv file """
+
+        with open(TestReadingJournal.TEST_FILE) as f:
+            return f.readlines()
+
+    def test_update_delete_keep_csv_success(self):
+        """ 010A - Journals updates and deletes without rewriting the csv file """
+
+        self.reading_manager.update_reading(self.reading_update)
+        self.reading_manager.delete_reading(2)
+        self.assertEqual(self._read_csv_lines(), TestReadingJournal.TEST_PRES_READINGS, "Must not rewrite the csv file")
+        self.assertEqual(len(ReadingJournal(TestReadingJournal.TEST_FILE).read_records()), 2, "Must journal both changes")
+
+    def test_replay_success(self):
+        """ 010B - Replays the journal when the manager is loaded """
+
+        self.reading_manager.update_reading(self.reading_update)
+        self.reading_manager.delete_reading(2)
+
+        reloaded_manager = PressureReadingManager(TestReadingJournal.TEST_FILE, use_journal=True)
+        self.assertEqual(reloaded_manager.get_reading(1).get_status(), "UPDATED", "Must replay updates")
+        self.assertEqual(reloaded_manager.get_reading(2), None, "Must replay deletes")
+        self.assertEqual(len(reloaded_manager.get_all_readings()), 2, "Must keep the other readings")
+
+    def test_replay_torn_record_success(self):
+        """ 010C - Ignores a partially written last journal record """
+
+        self.reading_manager.delete_reading(2)
+        with open(TestReadingJournal.TEST_FILE + ReadingJournal.FILE_SUFFIX, "a") as f:
+            f.write("D,")
+
+        reloaded_manager = PressureReadingManager(TestReadingJournal.TEST_FILE, use_journal=True)
+        self.assertEqual(len(reloaded_manager.get_all_readings()), 2, "Must ignore the torn record")
+
+    def test_compact_journal_success(self):
+        """ 010D - Folds the journal into the csv file """
+
+        self.reading_manager.update_reading(self.reading_update)
+        self.reading_manager.delete_reading(2)
+        self.reading_manager.compact_journal()
+
+        self.assertEqual(len(self._read_csv_lines()), 2, "Must write the changes to the csv file")
+        self.assertIn("UPDATED", self._read_csv_lines()[0], "Must write the updated reading")
+        self.assertEqual(ReadingJournal(TestReadingJournal.TEST_FILE).get_size(), 0, "Must empty the journal")
+        self.assertFalse(os.path.exists(TestReadingJournal.TEST_FILE + ".tmp"), "Must not leave the temporary file behind")
+
+    def test_compact_journal_background_success(self):
+        """ 010E - Compacts in the background once the journal passes the size threshold """
+
+        self.reading_manager.JOURNAL_COMPACT_SIZE = 0
+        self.reading_manager.delete_reading(2)
+
+        for i in range(100):
+            if not self.reading_manager._compacting:
+                break
+            time.sleep(0.01)
+
+        self.assertEqual(len(self._read_csv_lines()), 2, "Must compact the journal into the csv file")
+        self.assertFalse(self.reading_manager.is_stale(), "Must not consider its own compaction an external change")
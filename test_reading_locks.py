@@ -0,0 +1,157 @@
+from managers.reading_locks import ReadWriteLock, FileLock
+from managers.pressure_reading_manager import PressureReadingManager
+from readings.pressure_reading import PressureReading
+from unittest import TestCase
+import multiprocessing
+import datetime
+import inspect
+import threading
+import os
+
+TEST_FILE = "locks_testresults.csv"
+THREAD_COUNT = 8
+WRITES_PER_THREAD = 25
+
+def create_reading(status="GOOD"):
+    """ Returns a pressure reading with no sequence number yet """
+
+    reading_datetime = datetime.datetime.strptime("2018-09-23 19:56", "%Y-%m-%d %H:%M")
+    return PressureReading(reading_datetime, 0, "ABC Sensor Pres M100", 50.163, 51.435, 52.103, status)
+
+def add_readings_in_process(count):
+    """ Process worker - adds readings one at a time through its own manager """
+
+    reading_manager = PressureReadingManager(TEST_FILE, use_file_lock=True)
+    for i in range(count):
+        reading_manager.add_reading(create_reading())
+
+class TestReadingLocks(TestCase):
+    """ Unit Tests for the ReadWriteLock and FileLock Classes and concurrent use of the reading managers """
+
+    def logPoint(self):
+        """ Display test specific information """
+
+        currentTest = self.id().split('.')[-1]
+        callingFunction = inspect.stack()[1][3]
+        print('in %s - %s()' % (currentTest, callingFunction))
+
+    def setUp(self):
+        """ Creates fixtures before each test """
+
+        self.logPoint()
+        open(TEST_FILE, "w").close()
+
+    def tearDown(self):
+        """ Create a test fixture after each test method is run """
+
+        for suffix in ("", ".seq", ".journal", ".snap", FileLock.FILE_SUFFIX):
+            try:
+                os.remove(TEST_FILE + suffix)
+            except:
+                pass
+
+        self.logPoint()
+
+    def _run_threads(self, target):
+        """ Runs target in THREAD_COUNT threads and waits for all of them """
+
+        threads = [threading.Thread(target=target) for i in range(THREAD_COUNT)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def test_read_write_lock_success(self):
+        """ 010A - Lets readers share the lock and keeps writers out until they are done """
+
+        lock = ReadWriteLock()
+        events = []
+        lock.acquire_read()
+
+        reader = threading.Thread(target=lambda: (lock.acquire_read(), events.append("read"), lock.release_read()))
+        reader.start()
+        reader.join(5)
+        self.assertEqual(events, ["read"], "Must let a second reader in")
+
+        writer = threading.Thread(target=lambda: (lock.acquire_write(), events.append("write"), lock.release_write()))
+        writer.start()
+        writer.join(0.1)
+        self.assertEqual(events, ["read"], "Must keep the writer out while a reader holds the lock")
+
+        lock.release_read()
+        writer.join(5)
+        self.assertEqual(events, ["read", "write"], "Must let the writer in once the readers are done")
+
+    def test_read_write_lock_reentrant_success(self):
+        """ 010B - Lets the writer take the lock again """
+
+        lock = ReadWriteLock()
+        with lock.write_locked():
+            with lock.read_locked():
+                with lock.write_locked():
+                    pass
+
+        with lock.write_locked():
+            pass
+
+    def test_threads_success(self):
+        """ 020A - Keeps sequence numbers unique and the file intact with concurrent writes and reads """
+
+        for use_journal in (False, True):
+            open(TEST_FILE, "w").close()
+            reading_manager = PressureReadingManager(TEST_FILE, use_journal=use_journal)
+
+            def write():
+                for i in range(WRITES_PER_THREAD):
+                    reading = create_reading()
+                    reading_manager.add_reading(reading)
+                    reading_manager.update_reading(PressureReading(reading.get_timestamp(), reading.get_sequence_num(),
+                                                                   "ABC Sensor Pres M100", 1.0, 2.0, 3.0, "UPDATED"))
+                    reading_manager.get_all_readings()
+                    if i % 5 == 0:
+                        reading_manager.delete_reading(reading.get_sequence_num())
+
+            self._run_threads(write)
+
+            expected_count = THREAD_COUNT * (WRITES_PER_THREAD - WRITES_PER_THREAD // 5)
+            seq_nums = [r.get_sequence_num() for r in reading_manager.get_all_readings()]
+            self.assertEqual(len(set(seq_nums)), expected_count, "Must not hand out a seq num twice")
+
+            reloaded = PressureReadingManager(TEST_FILE, use_journal=use_journal)
+            readings = reloaded.get_all_readings()
+            self.assertEqual([r.get_sequence_num() for r in readings], seq_nums, "Must write every change to the file")
+            self.assertTrue(all(r.get_status() == "UPDATED" for r in readings), "Must keep every update")
+
+    def test_processes_success(self):
+        """ 030A - Keeps sequence numbers unique across processes sharing the file """
+
+        processes = [multiprocessing.Process(target=add_readings_in_process, args=(WRITES_PER_THREAD,)) for i in range(4)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+
+        reading_manager = PressureReadingManager(TEST_FILE)
+        self.assertEqual([r.get_sequence_num() for r in reading_manager.get_all_readings()], list(range(1, 4 * WRITES_PER_THREAD + 1)),
+                         "Must append every reading with a unique seq num")
+
+    def test_catch_up_success(self):
+        """ 030B - Loads only what another manager appended to the file and journal before writing """
+
+        for use_snapshot in (False, True):
+            open(TEST_FILE, "w").close()
+            first_manager = PressureReadingManager(TEST_FILE, use_journal=True, use_file_lock=True, use_snapshot=use_snapshot)
+            second_manager = PressureReadingManager(TEST_FILE, use_journal=True, use_file_lock=True, use_snapshot=use_snapshot)
+            first_manager.add_reading(create_reading())
+            second_manager.add_reading(create_reading())
+            second_manager.add_reading(create_reading())
+            second_manager.delete_reading(1)
+
+            full_reads = []
+            read_reading_from_file = first_manager._read_reading_from_file
+            first_manager._read_reading_from_file = lambda: full_reads.append(True) or read_reading_from_file()
+            first_manager.add_reading(create_reading())
+
+            self.assertEqual(full_reads, [], "Must not read the whole file again")
+            self.assertEqual([r.get_sequence_num() for r in first_manager.get_all_readings()], [2, 3, 4],
+                             "Must pick up the other manager's readings and delete")
@@ -0,0 +1,115 @@
+from managers.reading_manager_registry import ReadingManagerRegistry
+from managers.temperature_reading_manager import TemperatureReadingManager
+from unittest import TestCase
+import threading
+import inspect
+import os
+import time
+
+class TestReadingManagerRegistry(TestCase):
+    """ Unit Tests for the ReadingManagerRegistry Class """
+
+    TEST_FILE = "registry_testresults.csv"
+    OTHER_TEST_FILE = "registry_other_testresults.csv"
+    TEST_TEMP_READING = "2018-09-23 19:56:01.345,1,ABC Sensor Temp M301A,20.152,21.367,22.005,OK\n"
+
+    def logPoint(self):
+        """ Display test specific information """
+
+        currentTest = self.id().split('.')[-1]
+        callingFunction = inspect.stack()[1][3]
+        print('in %s - %s()' % (currentTest, callingFunction))
+
+    def setUp(self):
+        """ Creates fixtures before each test """
+
+        self.logPoint()
+        with open(TestReadingManagerRegistry.TEST_FILE, "w") as f:
+            f.write(TestReadingManagerRegistry.TEST_TEMP_READING)
+        self.registry = ReadingManagerRegistry()
+
+    def tearDown(self):
+        """ Create a test fixture after each test method is run """
+
+        for filename in (TestReadingManagerRegistry.TEST_FILE, TestReadingManagerRegistry.TEST_FILE + ".seq",
+                         TestReadingManagerRegistry.OTHER_TEST_FILE, TestReadingManagerRegistry.OTHER_TEST_FILE + ".seq"):
+            try:
+                os.remove(filename)
+            except:
+                pass
+
+        self.logPoint()
+
+    def test_get_manager_fail(self):
+        """ 010A - Raises ValueError when the manager class or filename is invalid """
+
+        with self.assertRaises(ValueError):
+            self.registry.get_manager(None, TestReadingManagerRegistry.TEST_FILE)
+        with self.assertRaises(ValueError):
+            self.registry.get_manager(TemperatureReadingManager, "")
+
+    def test_get_manager_cached_success(self):
+        """ 010B - Returns the same manager while the file is unchanged """
+
+        first_manager = self.registry.get_manager(TemperatureReadingManager, TestReadingManagerRegistry.TEST_FILE)
+        second_manager = self.registry.get_manager(TemperatureReadingManager, TestReadingManagerRegistry.TEST_FILE)
+        self.assertIs(first_manager, second_manager, "Must reuse the cached manager")
+        self.assertEqual(self.registry.get_stats()["misses"], 1, "Must count the first lookup as a miss")
+        self.assertEqual(self.registry.get_stats()["hits"], 1, "Must count the second lookup as a hit")
+
+    def test_get_manager_own_write_success(self):
+        """ 010C - Keeps the manager cached after it writes to its own file """
+
+        manager = self.registry.get_manager(TemperatureReadingManager, TestReadingManagerRegistry.TEST_FILE)
+        manager.delete_reading(1)
+        self.assertIs(self.registry.get_manager(TemperatureReadingManager, TestReadingManagerRegistry.TEST_FILE), manager,
+                      "Must not reload after the manager's own writes")
+
+    def test_get_manager_refresh_success(self):
+        """ 010D - Catches the manager up in place when rows are appended externally """
+
+        manager = self.registry.get_manager(TemperatureReadingManager, TestReadingManagerRegistry.TEST_FILE)
+        time.sleep(0.01)
+        with open(TestReadingManagerRegistry.TEST_FILE, "a") as f:
+            f.write(TestReadingManagerRegistry.TEST_TEMP_READING.replace(",1,", ",2,"))
+
+        refreshed_manager = self.registry.get_manager(TemperatureReadingManager, TestReadingManagerRegistry.TEST_FILE)
+        self.assertIs(manager, refreshed_manager, "Must keep a manager whose file was appended to")
+        self.assertEqual(len(refreshed_manager.get_all_readings()), 2, "Must pick up the external change")
+        self.assertEqual((self.registry.get_stats()["refreshes"], self.registry.get_stats()["reloads"]), (1, 0),
+                         "Must count the refresh")
+
+    def test_get_manager_during_write_success(self):
+        """ 010E - Returns other managers while a write holds up the staleness check of one """
+
+        with open(TestReadingManagerRegistry.OTHER_TEST_FILE, "w") as f:
+            f.write(TestReadingManagerRegistry.TEST_TEMP_READING)
+        manager = self.registry.get_manager(TemperatureReadingManager, TestReadingManagerRegistry.TEST_FILE)
+
+        with manager._lock.write_locked():
+            waiting_thread = threading.Thread(target=self.registry.get_manager,
+                                              args=(TemperatureReadingManager, TestReadingManagerRegistry.TEST_FILE))
+            waiting_thread.start()
+            time.sleep(0.05)
+
+            other_thread = threading.Thread(target=self.registry.get_manager,
+                                            args=(TemperatureReadingManager, TestReadingManagerRegistry.OTHER_TEST_FILE))
+            other_thread.start()
+            other_thread.join(1)
+            self.assertFalse(other_thread.is_alive(), "Must not wait for a write on another file")
+
+        waiting_thread.join()
+        self.assertEqual(self.registry.get_stats()["hits"], 1, "Must return the cached manager after the write")
+
+    def test_get_manager_reload_success(self):
+        """ 010F - Reloads the manager when the file is replaced externally """
+
+        manager = self.registry.get_manager(TemperatureReadingManager, TestReadingManagerRegistry.TEST_FILE)
+        with open(TestReadingManagerRegistry.TEST_FILE + ".tmp", "w") as f:
+            f.write(TestReadingManagerRegistry.TEST_TEMP_READING.replace(",1,", ",2,"))
+        os.replace(TestReadingManagerRegistry.TEST_FILE + ".tmp", TestReadingManagerRegistry.TEST_FILE)
+
+        reloaded_manager = self.registry.get_manager(TemperatureReadingManager, TestReadingManagerRegistry.TEST_FILE)
+        self.assertIsNot(manager, reloaded_manager, "Must reload a manager whose file was replaced")
+        self.assertEqual([r.get_sequence_num() for r in reloaded_manager.get_all_readings()], [2], "Must read the new file")
+        self.assertEqual(self.registry.get_stats()["reloads"], 1, "Must count the reload")
@@ -0,0 +1,65 @@
+from readings.reading_serializer import ReadingSerializer
+from readings.temperature_reading import TemperatureReading
+from unittest import TestCase
+import datetime
+import inspect
+import json
+
+class TestReadingSerializer(TestCase):
+    """ Unit Tests for the ReadingSerializer Class """
+
+    def logPoint(self):
+        """ Display test specific information """
+
+        currentTest = self.id().split('.')[-1]
+        callingFunction = inspect.stack()[1][3]
+        print('in %s - %s()' % (currentTest, callingFunction))
+
+    def setUp(self):
+        """ Creates fixtures before each test """
+
+        self.logPoint()
+        reading_datetime = datetime.datetime.strptime("2018-09-23 19:56:01.345", "%Y-%m-%d %H:%M:%S.%f")
+        self.reading = TemperatureReading(reading_datetime, 1, "ABC Sensor Temp \"M301A\"", 20.152, 21.367, 22.005, "OK")
+        self.error_reading = TemperatureReading(reading_datetime, 2, "ABC Sensor Temp M301A", 100.0, float("nan"), 100.0, "HIGH_TEMP")
+
+    def tearDown(self):
+        """ Create a test fixture after each test method is run """
+
+        self.logPoint()
+
+    def _serializers(self, field_names, numeric):
+        """ Returns the standard library serializer and, if orjson is installed, the orjson one """
+
+        serializers = [ReadingSerializer(field_names, numeric, use_orjson=False)]
+        if ReadingSerializer(field_names, True)._use_orjson:
+            serializers.append(ReadingSerializer(field_names, numeric, use_orjson=True))
+        return serializers
+
+    def test_dumps_success(self):
+        """ 010A - Encodes a reading as compact JSON with string values in the field order """
+
+        for serializer in self._serializers(ReadingSerializer.READING_FIELDS, False):
+            data = serializer.dumps(self.reading)
+            self.assertNotIn(b", ", data, "Must not pretty-print")
+            self.assertEqual(list(json.loads(data).items()), [
+                ("timestamp", "2018-09-23 19:56:01.345000"), ("sequence_num", "1"), ("model", "ABC Sensor Temp \"M301A\""),
+                ("min", "20.152"), ("avg", "21.367"), ("max", "22.005"), ("status", "OK")], "Must keep the field order and escape strings")
+
+        self.assertEqual(json.loads(self.reading.to_json())["sequence_num"], "1", "Must serialize to_json the same way")
+
+    def test_dumps_numeric_success(self):
+        """ 010B - Encodes the sequence number and values as numbers, non-finite ones as null """
+
+        for serializer in self._serializers(ReadingSerializer.LIST_FIELDS, True):
+            readings = json.loads(serializer.dumps_list([self.reading, self.error_reading]))
+            self.assertEqual([reading["sequencenum"] for reading in readings], [1, 2], "Must encode sequence numbers as numbers")
+            self.assertEqual([readings[0]["min"], readings[1]["avg"]], [20.152, None], "Must encode values as numbers or null")
+
+        self.assertEqual(ReadingSerializer().dumps_list([]), b"[]", "Must encode an empty list")
+
+    def test_constructor_fail(self):
+        """ 020A - Raises ValueError for a wrong number of field names """
+
+        with self.assertRaises(ValueError):
+            ReadingSerializer(("timestamp", "status"))
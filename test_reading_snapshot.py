@@ -0,0 +1,92 @@
+from managers.reading_snapshot import ReadingSnapshot
+from managers.temperature_reading_manager import TemperatureReadingManager
+from readings.temperature_reading import TemperatureReading
+from unittest import TestCase
+import datetime
+import inspect
+import os
+
+class TestReadingSnapshot(TestCase):
+    """ Unit Tests for the ReadingSnapshot Class and snapshot loading in the reading managers """
+
+    TEST_FILE = "snapshot_testresults.csv"
+    TEST_TEMP_READINGS = [
+            "2018-09-23 19:56:01.345000,1,ABC Sensor Temp M301A,20.152,21.367,22.005,OK\n",
+            "2018-09-23 19:57:01.345000,3,ABC Sensor Temp M301A,20.152,21.367,22.005,HIGH_TEMP\n",
+            "2018-09-23 19:58:01.345000,2,ABC Sensor Temp M301A,20.152,21.367,22.005,LOW_TEMP\n" ]
+
+    def logPoint(self):
+        """ Display test specific information """
+
+        currentTest = self.id().split('.')[-1]
+        callingFunction = inspect.stack()[1][3]
+        print('in %s - %s()' % (currentTest, callingFunction))
+
+    def setUp(self):
+        """ Creates fixtures before each test """
+
+        self.logPoint()
+        with open(TestReadingSnapshot.TEST_FILE, "w") as f:
+            f.writelines(TestReadingSnapshot.TEST_TEMP_READINGS)
+        self.reading_manager = TemperatureReadingManager(TestReadingSnapshot.TEST_FILE, use_snapshot=True)
+        self.snapshot = ReadingSnapshot(TestReadingSnapshot.TEST_FILE)
+
+        reading_datetime = datetime.datetime.strptime("2018-09-23 19:59:01.345", "%Y-%m-%d %H:%M:%S.%f")
+        self.reading = TemperatureReading(reading_datetime, 1, "ABC Sensor Temp M301A", 20.152, 21.367, 22.005, "OK")
+
+    def tearDown(self):
+        """ Create a test fixture after each test method is run """
+
+        for suffix in ("", ".seq", ReadingSnapshot.FILE_SUFFIX):
+            try:
+                os.remove(TestReadingSnapshot.TEST_FILE + suffix)
+            except:
+                pass
+
+        self.logPoint()
+
+    def _get_rows(self, reading_manager):
+        """ Returns the readings of a manager as csv rows """
+
+        return [reading_manager._reading_to_list(r) for r in reading_manager.get_all_readings()]
+
+    def test_load_snapshot_success(self):
+        """ 010A - Loads the same readings from the snapshot as from the csv file """
+
+        csv_size, csv_crc, readings = self.snapshot.read(TemperatureReading)
+        self.assertEqual(csv_size, os.path.getsize(TestReadingSnapshot.TEST_FILE), "Must cover the whole csv file")
+        self.assertEqual(len(readings), 3, "Must hold every reading")
+
+        reading_manager = TemperatureReadingManager(TestReadingSnapshot.TEST_FILE, use_snapshot=True)
+        self.assertEqual(self._get_rows(reading_manager), self._get_rows(self.reading_manager), "Must load the same readings")
+        self.assertEqual(reading_manager.get_reading(3).get_timestamp(), self.reading_manager.get_reading(3).get_timestamp(),
+                         "Must keep timestamps to the microsecond")
+
+    def test_load_appended_success(self):
+        """ 010B - Parses only the rows appended since the snapshot and refreshes it """
+
+        self.reading_manager.add_reading(self.reading)
+
+        reading_manager = TemperatureReadingManager(TestReadingSnapshot.TEST_FILE, use_snapshot=True)
+        self.assertEqual([r.get_sequence_num() for r in reading_manager.get_all_readings()], [1, 2, 3, 4], "Must load the appended row")
+        self.assertEqual(self.snapshot.read(TemperatureReading)[0], os.path.getsize(TestReadingSnapshot.TEST_FILE), "Must refresh the snapshot")
+
+    def test_load_rewritten_success(self):
+        """ 010C - Parses the whole csv file again when it no longer matches the snapshot """
+
+        # Same size and row count, so only the checksum can tell the files apart
+        with open(TestReadingSnapshot.TEST_FILE, "w") as f:
+            f.writelines(row.replace("HIGH_TEMP", "LOW_TEMP1") for row in TestReadingSnapshot.TEST_TEMP_READINGS)
+
+        reading_manager = TemperatureReadingManager(TestReadingSnapshot.TEST_FILE, use_snapshot=True)
+        self.assertEqual(reading_manager.get_reading(3).get_status(), "LOW_TEMP1", "Must not use a stale snapshot")
+
+    def test_load_snapshot_fail(self):
+        """ 020A - Ignores an unreadable snapshot """
+
+        with open(self.snapshot.get_filename(), "wb") as f:
+            f.write(b"RSN1 truncated")
+
+        self.assertEqual(self.snapshot.read(TemperatureReading), None, "Must reject a truncated snapshot")
+        reading_manager = TemperatureReadingManager(TestReadingSnapshot.TEST_FILE, use_snapshot=True)
+        self.assertEqual(self._get_rows(reading_manager), self._get_rows(self.reading_manager), "Must parse the csv file")
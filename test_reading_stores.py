@@ -0,0 +1,178 @@
+from managers.reading_stores import ObjectReadingStore, ColumnarReadingStore, LazyReadingStore
+from managers.temperature_reading_manager import TemperatureReadingManager
+from readings.temperature_reading import TemperatureReading
+from unittest import TestCase
+import datetime
+import inspect
+import os
+
+class TestReadingStores(TestCase):
+    """ Unit Tests for the ObjectReadingStore and ColumnarReadingStore Classes """
+
+    TEST_FILE = "stores_testresults.csv"
+
+    def logPoint(self):
+        """ Display test specific information """
+
+        currentTest = self.id().split('.')[-1]
+        callingFunction = inspect.stack()[1][3]
+        print('in %s - %s()' % (currentTest, callingFunction))
+
+    def setUp(self):
+        """ Creates fixtures before each test """
+
+        self.logPoint()
+        reading_datetime = datetime.datetime.strptime("2018-09-23 19:56:01.345", "%Y-%m-%d %H:%M:%S.%f")
+        self.readings = [TemperatureReading(reading_datetime + datetime.timedelta(minutes=i), i, "ABC Sensor Temp M301A",
+                                            20.152, 21.367, 22.005, "OK" if i % 2 else "HIGH_TEMP") for i in (3, 1, 2)]
+        self.stores = [ObjectReadingStore(), ColumnarReadingStore(TemperatureReading), LazyReadingStore(None, 1)]
+        for store in self.stores:
+            store.load(self.readings)
+
+    def tearDown(self):
+        """ Create a test fixture after each test method is run """
+
+        for filename in (TestReadingStores.TEST_FILE, TestReadingStores.TEST_FILE + LazyReadingStore.INDEX_FILE_SUFFIX):
+            try:
+                os.remove(filename)
+            except:
+                pass
+
+        self.logPoint()
+
+    def test_load_success(self):
+        """ 010A - Loads readings in sequence number order """
+
+        for store in self.stores:
+            self.assertEqual([r.get_sequence_num() for r in store.values()], [1, 2, 3], "Must sort readings by seq num")
+            self.assertEqual(store.get_last_seq_num(), 3, "Must return the highest seq num")
+            self.assertEqual(len(store), 3, "Must hold every reading")
+
+    def test_get_success(self):
+        """ 020A - Returns the same reading values that were stored """
+
+        for store in self.stores:
+            reading = store.get(2)
+            self.assertEqual(reading.get_timestamp(), self.readings[2].get_timestamp(), "Must keep the timestamp")
+            self.assertEqual(reading.get_sensor_model(), "ABC Sensor Temp M301A", "Must keep the sensor model")
+            self.assertEqual(reading.get_avg_value(), 21.367, "Must keep the values")
+            self.assertEqual(reading.get_status(), "HIGH_TEMP", "Must keep the status")
+            self.assertIsInstance(reading, TemperatureReading, "Must build readings of the store's class")
+            self.assertEqual(store.get(4), None, "Must return None if seq num is not in the store")
+
+    def test_put_remove_success(self):
+        """ 030A - Replaces, removes and re-adds readings """
+
+        for store in self.stores:
+            updated = TemperatureReading(self.readings[0].get_timestamp(), 3, "ABC Sensor Temp M301A", 1.0, 2.0, 3.0, "UPDATED")
+            self.assertEqual(store.put(updated).get_status(), "OK", "Must return the replaced reading")
+            self.assertEqual(store.get(3).get_status(), "UPDATED", "Must replace the reading")
+
+            self.assertEqual(store.remove(2).get_sequence_num(), 2, "Must return the removed reading")
+            self.assertEqual(store.remove(2), None, "Must return None when removing a missing reading")
+            self.assertNotIn(2, store, "Must remove the reading")
+            self.assertEqual([r.get_sequence_num() for r in store.get_after(1)], [3], "Must skip removed readings when paging")
+
+            store.put(self.readings[2])
+            self.assertEqual([r.get_sequence_num() for r in store.values()], [1, 2, 3], "Must re-add a removed reading in order")
+            self.assertEqual([r.get_sequence_num() for r in store.get_after(1, 1)], [2], "Must page a re-added reading in order")
+
+    def test_columnar_manager_success(self):
+        """ 040A - Serves the manager API from the columnar store """
+
+        with open(TestReadingStores.TEST_FILE, "w") as f:
+            f.write("2018-09-23 19:56:01.345000,1,ABC Sensor Temp M301A,20.152,21.367,22.005,OK\n")
+
+        reading_manager = TemperatureReadingManager(TestReadingStores.TEST_FILE, store="columnar")
+        reading_manager.add_reading(self.readings[0])
+        reading_manager.delete_reading(1)
+        self.assertEqual([r.get_sequence_num() for r in reading_manager.get_all_readings()], [4], "Must add and delete readings")
+        self.assertEqual(reading_manager.get_stats("day")[0]["count"], 1, "Must aggregate readings")
+
+    def test_columnar_manager_fail(self):
+        """ 040B - Raises ValueError for an unknown store """
+
+        with self.assertRaises(ValueError):
+            TemperatureReadingManager(TestReadingStores.TEST_FILE, store="rows")
+
+    def test_parallel_load_success(self):
+        """ 050A - Loads the same readings in worker processes as in-process """
+
+        with open(TestReadingStores.TEST_FILE, "w") as f:
+            for i in (5, 1, 4, 2, 3):
+                f.write("2018-09-23 19:5%d:01.345000,%d,ABC Sensor Temp M301A,20.152,21.367,22.005,OK\n" % (i, i))
+
+        TemperatureReadingManager.PARALLEL_LOAD_MIN_SIZE = 0
+        try:
+            reading_manager = TemperatureReadingManager(TestReadingStores.TEST_FILE, load_workers=2)
+        finally:
+            del TemperatureReadingManager.PARALLEL_LOAD_MIN_SIZE
+
+        serial_manager = TemperatureReadingManager(TestReadingStores.TEST_FILE)
+        to_row = reading_manager._reading_to_list
+        self.assertEqual([to_row(r) for r in reading_manager.get_all_readings()],
+                         [to_row(r) for r in serial_manager.get_all_readings()], "Must load the same readings")
+        self.assertEqual([r.get_sequence_num() for r in reading_manager.get_all_readings()], [1, 2, 3, 4, 5],
+                         "Must merge the chunks in seq num order")
+
+    def test_parallel_load_fail(self):
+        """ 050B - Raises ValueError for an invalid number of load workers """
+
+        with self.assertRaises(ValueError):
+            TemperatureReadingManager(TestReadingStores.TEST_FILE, load_workers="2")
+
+    def test_lazy_manager_success(self):
+        """ 060A - Serves readings parsed on demand from the mapped file and its sidecar index """
+
+        with open(TestReadingStores.TEST_FILE, "w") as f:
+            for i in (1, 3, 2, 3):
+                f.write("2018-09-23 19:5%d:01.345000,%d,ABC Sensor Temp M301A,20.152,21.367,22.005,OK%d\n" % (i, i, i))
+
+        reading_manager = TemperatureReadingManager(TestReadingStores.TEST_FILE, store="lazy")
+        self.assertTrue(os.path.exists(TestReadingStores.TEST_FILE + LazyReadingStore.INDEX_FILE_SUFFIX), "Must save the index")
+        self.assertEqual(reading_manager.get_reading(2).get_status(), "OK2", "Must parse the row on demand")
+        self.assertEqual([r.get_sequence_num() for r in reading_manager.get_readings_after(1)], [2, 3], "Must page in order")
+
+        reading_manager.add_reading(self.readings[0])
+        reading_manager.delete_reading(2)
+        self.assertEqual([r.get_sequence_num() for r in reading_manager.get_all_readings()], [1, 3, 4], "Must apply changes")
+
+        # The delete rewrote the file, so the index is rebuilt
+        reading_manager = TemperatureReadingManager(TestReadingStores.TEST_FILE, store="lazy")
+        self.assertEqual([r.get_sequence_num() for r in reading_manager.get_all_readings()], [1, 3, 4], "Must reload the file")
+        self.assertEqual(reading_manager.get_reading(3).get_status(), "OK3", "Must keep the last row of a duplicate")
+        self.assertEqual(len(reading_manager.get_readings_between(end=self.readings[0].get_timestamp())), 3,
+                         "Must serve time-range queries")
+
+        # An append keeps the indexed rows and only the new row is indexed
+        reading_manager.add_reading(self.readings[1])
+        reading_manager = TemperatureReadingManager(TestReadingStores.TEST_FILE, store="lazy")
+        self.assertEqual([r.get_sequence_num() for r in reading_manager.get_all_readings()], [1, 3, 4, 5], "Must index the appended row")
+
+    def test_lazy_manager_fail(self):
+        """ 060B - Raises ValueError for a row without a valid sequence number """
+
+        with open(TestReadingStores.TEST_FILE, "w") as f:
+            f.write("2018-09-23 19:56:01.345000,one,ABC Sensor Temp M301A,20.152,21.367,22.005,OK\n")
+
+        with self.assertRaises(ValueError):
+            TemperatureReadingManager(TestReadingStores.TEST_FILE, store="lazy")
+
+    def test_lazy_manager_edited_success(self):
+        """ 060C - Rebuilds the sidecar index when the file was edited in place rather than appended to """
+
+        with open(TestReadingStores.TEST_FILE, "w") as f:
+            for i in (1, 2, 3):
+                f.write("2018-09-23 19:5%d:01.345000,%d,ABC Sensor Temp M301A,20.152,21.367,22.005,OK%d\n" % (i, i, i))
+        TemperatureReadingManager(TestReadingStores.TEST_FILE, store="lazy")
+
+        # Same inode and a larger file, but every row after the first moved
+        with open(TestReadingStores.TEST_FILE, "r+") as f:
+            rows = f.read().replace("M301A", "M301A-2", 1)
+            f.seek(0)
+            f.write(rows)
+
+        reading_manager = TemperatureReadingManager(TestReadingStores.TEST_FILE, store="lazy")
+        self.assertEqual([(r.get_sensor_model(), r.get_status()) for r in reading_manager.get_all_readings()],
+                         [("ABC Sensor Temp M301A-2", "OK1"), ("ABC Sensor Temp M301A", "OK2"), ("ABC Sensor Temp M301A", "OK3")],
+                         "Must read the rows where they are now")
@@ -0,0 +1,85 @@
+from managers.response_cache import ResponseCache
+from unittest import TestCase
+import inspect
+
+class TestResponseCache(TestCase):
+    """ Unit Tests for the ResponseCache Class """
+
+    def logPoint(self):
+        """ Display test specific information """
+
+        currentTest = self.id().split('.')[-1]
+        callingFunction = inspect.stack()[1][3]
+        print('in %s - %s()' % (currentTest, callingFunction))
+
+    def setUp(self):
+        """ Creates fixtures before each test """
+
+        self.logPoint()
+        self.response_cache = ResponseCache(max_entries=2)
+        self.response_cache.put(("temperature", "reading", 1), 5, "one")
+
+    def tearDown(self):
+        """ Create a test fixture after each test method is run """
+
+        self.logPoint()
+
+    def test_constructor_fail(self):
+        """ 010A - Raises ValueError when the entry count or byte size is not a positive integer """
+
+        with self.assertRaises(ValueError):
+            ResponseCache(0)
+
+        with self.assertRaises(ValueError):
+            ResponseCache("10")
+
+        with self.assertRaises(ValueError):
+            ResponseCache(10, 0)
+
+    def test_get_success(self):
+        """ 020A - Returns a response only for the version it was built from """
+
+        self.assertEqual(self.response_cache.get(("temperature", "reading", 1), 5), "one", "Must hit for the same version")
+        self.assertIsNone(self.response_cache.get(("temperature", "reading", 1), 6), "Must miss once the readings changed")
+        self.assertIsNone(self.response_cache.get(("temperature", "reading", 2), 5), "Must miss for another request")
+        self.assertEqual(self.response_cache.get_stats(), {"entries": 1, "bytes": 0, "hits": 1, "misses": 2, "hit_rate": 1 / 3,
+                                                           "not_modified": 0, "evictions": 0, "too_large": 0},
+                         "Must count hits and misses")
+
+    def test_eviction_success(self):
+        """ 020B - Evicts the least recently used response when full """
+
+        self.response_cache.put(("temperature", "reading", 2), 5, "two")
+        self.response_cache.get(("temperature", "reading", 1), 5)
+        self.response_cache.put(("temperature", "reading", 3), 5, "three")
+        self.assertIsNone(self.response_cache.get(("temperature", "reading", 2), 5), "Must evict the least recently used")
+        self.assertEqual(self.response_cache.get(("temperature", "reading", 1), 5), "one", "Must keep the recently used")
+        self.assertEqual(self.response_cache.get_stats()["evictions"], 1, "Must count evictions")
+
+    def test_eviction_bytes_success(self):
+        """ 020C - Evicts the least recently used responses to stay within the byte size and skips responses too large to cache """
+
+        response_cache = ResponseCache(max_entries=10, max_bytes=160)
+        response_cache.put(("temperature", "reading", 1), 5, "one", 10)
+        response_cache.put(("temperature", "reading", 2), 5, "two", 10)
+        response_cache.put(("temperature", "all"), 5, "all", 11)
+        self.assertIsNone(response_cache.get(("temperature", "all"), 5), "Must not cache a response over the size limit")
+        self.assertEqual(response_cache.get(("temperature", "reading", 1), 5), "one", "Must keep the other responses")
+
+        for seq_num in range(3, 17):
+            response_cache.put(("temperature", "reading", seq_num), 5, "more", 10)
+        stats = response_cache.get_stats()
+        self.assertEqual((stats["entries"], stats["bytes"], stats["too_large"]), (10, 100, 1), "Must count entries, bytes and skips")
+
+        response_cache = ResponseCache(max_entries=100, max_bytes=160)
+        for seq_num in range(1, 18):
+            response_cache.put(("temperature", "reading", seq_num), 5, "big", 10)
+        self.assertEqual(response_cache.get_stats()["bytes"], 160, "Must stay within the byte size")
+        self.assertIsNone(response_cache.get(("temperature", "reading", 1), 5), "Must evict the least recently used")
+
+    def test_get_etag_success(self):
+        """ 030A - Builds a different entity tag per version and per cache """
+
+        self.assertEqual(self.response_cache.get_etag(5), self.response_cache.get_etag(5), "Must be stable for a version")
+        self.assertNotEqual(self.response_cache.get_etag(5), self.response_cache.get_etag(6), "Must change with the version")
+        self.assertNotEqual(self.response_cache.get_etag(5), ResponseCache().get_etag(5), "Must not match another process")
@@ -0,0 +1,160 @@
+from managers.sqlite_reading_manager import SqliteReadingManager
+from readings.temperature_reading import TemperatureReading
+from readings.pressure_reading import PressureReading
+from unittest import TestCase
+import datetime
+import inspect
+import os
+import threading
+
+class TestSqliteReadingManager(TestCase):
+    """ Unit Tests for the SqliteReadingManager Class """
+
+    TEST_FILE = "sqlite_testresults.db"
+
+    def logPoint(self):
+        """ Display test specific information """
+
+        currentTest = self.id().split('.')[-1]
+        callingFunction = inspect.stack()[1][3]
+        print('in %s - %s()' % (currentTest, callingFunction))
+
+    def setUp(self):
+        """ Creates fixtures before each test """
+
+        self.logPoint()
+        self.reading_datetime = datetime.datetime.strptime("2018-09-23 19:56:01.345", "%Y-%m-%d %H:%M:%S.%f")
+        self.reading_manager = SqliteReadingManager(TestSqliteReadingManager.TEST_FILE, TemperatureReading)
+        self.reading_manager.add_readings([self._create_reading(i) for i in range(3)])
+
+    def tearDown(self):
+        """ Create a test fixture after each test method is run """
+
+        self.reading_manager.close()
+        for suffix in ("", "-wal", "-shm"):
+            try:
+                os.remove(TestSqliteReadingManager.TEST_FILE + suffix)
+            except:
+                pass
+
+        self.logPoint()
+
+    def _create_reading(self, minutes, status="OK"):
+        """ Returns a temperature reading taken some minutes after the fixture timestamp """
+
+        return TemperatureReading(self.reading_datetime + datetime.timedelta(minutes=minutes), 0, "ABC Sensor Temp M301A",
+                                  20.152, 21.367, 22.005, status)
+
+    def test_add_reading_success(self):
+        """ 010A - Adds readings with the next sequence numbers """
+
+        reading = self._create_reading(10)
+        self.reading_manager.add_reading(reading)
+        self.assertEqual(reading.get_sequence_num(), 4, "Must assign the next seq num")
+        self.assertEqual(self.reading_manager.get_reading(4).get_timestamp(), reading.get_timestamp(), "Must keep the timestamp")
+        self.assertEqual(self.reading_manager.add_readings([]), None, "Must return None for an empty batch")
+
+    def test_add_reading_never_reuses_seq_num(self):
+        """ 010B - Keeps sequence numbers of deleted readings out of use, across managers """
+
+        self.reading_manager.delete_reading(3)
+        reading_manager = SqliteReadingManager(TestSqliteReadingManager.TEST_FILE, TemperatureReading)
+        reading_manager.add_reading(self._create_reading(10))
+        self.assertEqual([r.get_sequence_num() for r in reading_manager.get_all_readings()], [1, 2, 4], "Must not reuse 3")
+        reading_manager.close()
+
+    def test_update_delete_success(self):
+        """ 020A - Updates and deletes readings by sequence number """
+
+        reading = self._create_reading(0, "HIGH_TEMP")
+        reading.set_sequence_num(2)
+        self.assertEqual(self.reading_manager.update_reading(reading), 1, "Must update one reading")
+        self.assertEqual(self.reading_manager.get_reading(2).get_status(), "HIGH_TEMP", "Must save the update")
+
+        self.assertEqual(self.reading_manager.delete_reading(2), 1, "Must delete one reading")
+        self.assertEqual(self.reading_manager.delete_reading(2), 0, "Must return 0 for a missing reading")
+        self.assertEqual(self.reading_manager.get_reading(2), None, "Must return None for a deleted reading")
+
+    def test_update_delete_fail(self):
+        """ 020B - Rejects readings of another type and invalid sequence numbers """
+
+        reading = PressureReading(self.reading_datetime, 1, "ABC Sensor Pres M100", 50.163, 51.435, 52.103, "GOOD")
+        self.assertEqual(self.reading_manager.update_reading(reading), None, "Must reject another reading type")
+
+        with self.assertRaises(ValueError):
+            self.reading_manager.delete_reading("1")
+
+        with self.assertRaises(ValueError):
+            self.reading_manager.get_reading(None)
+
+    def test_range_queries_success(self):
+        """ 030A - Pages by sequence number and filters by timestamp """
+
+        self.assertEqual([r.get_sequence_num() for r in self.reading_manager.get_readings_after(1, 1)], [2], "Must page")
+        self.assertEqual([r.get_sequence_num() for r in self.reading_manager.iter_readings(page_size=2)], [1, 2, 3],
+                         "Must iterate every page")
+
+        start = self.reading_datetime + datetime.timedelta(minutes=1)
+        self.assertEqual([r.get_sequence_num() for r in self.reading_manager.get_readings_between(start)], [2, 3],
+                         "Must filter by start time")
+        self.assertEqual([r.get_sequence_num() for r in self.reading_manager.get_readings_between(end=start)], [1, 2],
+                         "Must filter by end time")
+
+    def test_stats_success(self):
+        """ 040A - Aggregates readings per bucket """
+
+        self.reading_manager.add_reading(self._create_reading(0, "HIGH_TEMP"))
+        stats = self.reading_manager.get_stats("minute")
+        self.assertEqual([s["count"] for s in stats], [2, 1, 1], "Must group readings by minute")
+        self.assertEqual(stats[0]["error_count"], 1, "Must count errors")
+        self.assertEqual(self.reading_manager.get_stats("day")[0]["count"], 4, "Must group readings by day")
+
+        with self.assertRaises(ValueError):
+            self.reading_manager.get_stats("week")
+
+    def test_error_readings_success(self):
+        """ 040B - Gets the error readings in timestamp order, optionally of one status """
+
+        self.reading_manager.add_readings([self._create_reading(2, "LOW_TEMP"), self._create_reading(1, "HIGH_TEMP")])
+        self.assertEqual([r.get_sequence_num() for r in self.reading_manager.get_error_readings()], [5, 4],
+                         "Must return only error readings")
+        self.assertEqual([r.get_sequence_num() for r in self.reading_manager.get_error_readings(status="LOW_TEMP")], [4],
+                         "Must filter by status")
+        self.assertEqual(self.reading_manager.get_error_readings(status="OK"), [], "Must not return readings without an error")
+
+    def test_threads_success(self):
+        """ 050A - Adds readings from several threads without losing any """
+
+        def add_readings():
+            for i in range(20):
+                self.reading_manager.add_reading(self._create_reading(i))
+
+        threads = [threading.Thread(target=add_readings) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual([r.get_sequence_num() for r in self.reading_manager.get_all_readings()], list(range(1, 84)),
+                         "Must assign unique seq nums")
+
+    def test_get_version_success(self):
+        """ 060A - Shares the version with every manager on the database and moves it on every write """
+
+        reading_manager = SqliteReadingManager(TestSqliteReadingManager.TEST_FILE, TemperatureReading)
+        version = self.reading_manager.get_version()
+        self.assertEqual(reading_manager.get_version(), version, "Must read the version from the database")
+        reading_manager.delete_reading(1)
+        self.assertNotEqual(self.reading_manager.get_version(), version, "Must see the other manager's change")
+        reading_manager.close()
+
+    def test_add_readings_invalid_success(self):
+        """ 010C - Skips entries of a batch that are not readings of the manager's type and returns how many were added """
+
+        pressure_reading = PressureReading(self.reading_datetime, 0, "ABC Sensor Pres M100", 50.163, 51.435, 52.103, "GOOD")
+        readings = [self._create_reading(10), None, pressure_reading, self._create_reading(11)]
+        self.assertEqual(self.reading_manager.add_readings(readings), 2, "Must return the number of readings added")
+        self.assertEqual([r.get_sequence_num() for r in self.reading_manager.get_all_readings()], [1, 2, 3, 4, 5],
+                         "Must add the valid readings")
+        self.assertIsNone(self.reading_manager.add_reading(pressure_reading), "Must reject a reading of another type")
+        self.assertEqual(self.reading_manager.add_readings([None]), 0, "Must add nothing from a batch without readings")
@@ -1,5 +1,6 @@
 from managers.temperature_reading_manager import TemperatureReadingManager
 from readings.temperature_reading import TemperatureReading
+from readings.pressure_reading import PressureReading
 from unittest import TestCase
 from unittest.mock import MagicMock
 from unittest.mock import patch,mock_open
@@ -28,8 +29,10 @@ class TestTemperatureReadingManager(TestCase):
         """ Creates fixtures before each test """
 
         self.logPoint()
-        # This mocks the csv reader to return our test readings
-        csv.reader = MagicMock(return_value=test_readings)
+        # This mocks the csv reader to return our test readings, until the test is done
+        csv_reader_patcher = patch("csv.reader", MagicMock(return_value=test_readings))
+        csv_reader_patcher.start()
+        self.addCleanup(csv_reader_patcher.stop)
         self.reading_manager = TemperatureReadingManager("temp_testresults.csv")
 
         reading_datetime = datetime.datetime.strptime("2018-09-23 19:56:01.345", "%Y-%m-%d %H:%M:%S.%f")
@@ -39,10 +42,11 @@ class TestTemperatureReadingManager(TestCase):
     def tearDown(self):
         """ Create a test fixture after each test method is run """
 
-        try: 
-            os.remove("temp_testresults.csv")
-        except:
-            pass
+        for filename in ("temp_testresults.csv", "temp_testresults.csv.seq"):
+            try: 
+                os.remove(filename)
+            except:
+                pass
 
         self.logPoint()
 
@@ -58,6 +62,19 @@ class TestTemperatureReadingManager(TestCase):
 
         self.assertIsInstance(self.reading_manager, TemperatureReadingManager, "Must create a temperature reading manager with valid attributes")
 
+    def test_constructor_invalid_row_fail(self):
+        """ 010C - Raises ValueError when a row in the file is invalid """
+
+        with self.assertRaises(ValueError):
+            self.setUp([["2018-09-23 19:56:01.345", "1", "", "20.152", "21.367", "22.005", "OK"]])
+
+    def test_constructor_compact_readings_success(self):
+        """ 010D - Loads readings without a per-instance dict """
+
+        reading = self.reading_manager.get_reading(1)
+        self.assertFalse(hasattr(reading, "__dict__"), "Must load slotted readings")
+        self.assertEqual(reading.get_error_msg(), None, "Must keep the reading API")
+
     def test_add_reading_list_success(self):
         """ 020A - Adds a TemperatureReading to a list of readings """
 
@@ -97,6 +114,41 @@ class TestTemperatureReadingManager(TestCase):
         self.setUp([])
         self.assertEqual(self.reading_manager.add_reading(None), None, "Must return none for invalid input")
 
+    def test_add_reading_seq_num_not_reused_success(self):
+        """ 020E - Doesn't reuse the sequence number of a deleted reading """
+
+        self.reading_manager.delete_reading(3)
+        with open("temp_testresults.csv.seq") as f:
+            self.assertEqual(f.read(), "3", "Must persist the highest seq num")
+
+        self.reading_manager.add_reading(self.reading)
+        self.assertEqual(self.reading.get_sequence_num(), 4, "Must not reuse a deleted seq num")
+
+    def test_add_readings_success(self):
+        """ 020F - Adds a batch of readings with contiguous seq nums in one write """
+
+        open("temp_testresults.csv", 'w').close()
+        readings = [self.reading, self.reading_update]
+        self.assertEqual(self.reading_manager.add_readings(readings), 2, "Must return the number of readings added")
+        self.assertEqual([r.get_sequence_num() for r in readings], [4, 5], "Must assign contiguous seq nums")
+
+        with open("temp_testresults.csv") as f:
+            self.assertEqual(sum(1 for line in f), 2, "Must write the batch to the csv file")
+
+    def test_add_readings_fail(self):
+        """ 020G - Returns None for an empty batch """
+
+        self.assertEqual(self.reading_manager.add_readings([]), None, "Must return None for an empty batch")
+
+    def test_add_readings_invalid_success(self):
+        """ 020H - Skips entries of a batch that are not temperature readings and returns how many were added """
+
+        open("temp_testresults.csv", 'w').close()
+        pressure_reading = PressureReading(self.reading.get_timestamp(), 0, "ABC Sensor Pres M100", 50.163, 51.435, 52.103, "GOOD")
+        self.assertEqual(self.reading_manager.add_readings([self.reading, None, pressure_reading]), 1, "Must return the number of readings added")
+        self.assertEqual(self.reading_manager.add_readings([None]), 0, "Must add nothing from a batch without readings")
+        self.assertIsNone(self.reading_manager.add_reading(pressure_reading), "Must reject a reading of another type")
+
     def test_update_reading_list_success(self):
         """ 030A - Updates TemperatureReading in a list of readings """
 
@@ -169,6 +221,13 @@ class TestTemperatureReadingManager(TestCase):
 
         self.assertEqual(self.reading_manager.get_reading(0), None, "Must return None if seq num is not in the list")
 
+    def test_get_reading_after_delete_success(self):
+        """ 050D - Returns None for a sequence number that was deleted """
+
+        self.reading_manager.delete_reading(2)
+        self.assertEqual(self.reading_manager.get_reading(2), None, "Must not return deleted readings")
+        self.assertEqual(self.reading_manager.get_reading(3).get_sequence_num(), 3, "Must still find the other readings")
+
     def test_get_all_readings_success(self):
         """ 060A - Gets a TemperatureReading from a list of readings """
 
@@ -181,3 +240,104 @@ class TestTemperatureReadingManager(TestCase):
         self.setUp([])
         test_readings = self.reading_manager.get_all_readings()
         self.assertEqual(test_readings, [], "Must return empty list if the file is empty")
+
+    def test_get_readings_after_success(self):
+        """ 060C - Gets a page of readings after a sequence number """
+
+        test_readings = self.reading_manager.get_readings_after(1, 1)
+        self.assertEqual([r.get_sequence_num() for r in test_readings], [2], "Must return the page after the cursor")
+        self.assertEqual(len(self.reading_manager.get_readings_after(0)), 3, "Must return all readings without a limit")
+        self.assertEqual(self.reading_manager.get_readings_after(3, 10), [], "Must return empty list past the last reading")
+
+    def test_get_readings_after_fail(self):
+        """ 060D - Raises ValueError when the cursor is invalid """
+
+        with self.assertRaises(ValueError):
+            self.reading_manager.get_readings_after(None)
+
+    def test_iter_readings_success(self):
+        """ 060E - Iterates over all readings page by page """
+
+        self.reading_manager.delete_reading(2)
+        test_readings = list(self.reading_manager.iter_readings(page_size=1))
+        self.assertEqual(test_readings, self.reading_manager.get_all_readings(), "Must iterate over all readings in order")
+
+    def test_get_readings_between_success(self):
+        """ 070A - Gets the readings between two timestamps, inclusive """
+
+        start = datetime.datetime.strptime("2018-09-23 19:57:00.000", "%Y-%m-%d %H:%M:%S.%f")
+        end = datetime.datetime.strptime("2018-09-23 20:04:02.001", "%Y-%m-%d %H:%M:%S.%f")
+        test_readings = self.reading_manager.get_readings_between(start, end)
+        self.assertEqual([r.get_sequence_num() for r in test_readings], [2, 3], "Must return readings within the range")
+        self.assertEqual([r.get_sequence_num() for r in self.reading_manager.get_readings_between(end=start)], [1], "Must allow an open start")
+
+    def test_get_readings_between_changes_success(self):
+        """ 070B - Keeps the timestamp index up to date after adds, updates and deletes """
+
+        self.reading_manager.get_readings_between()
+        self.reading_manager.delete_reading(2)
+        self.reading_manager.update_reading(self.reading_update)
+        self.reading_manager.add_reading(self.reading)
+        test_readings = self.reading_manager.get_readings_between()
+        self.assertEqual([r.get_sequence_num() for r in test_readings], [1, 4, 3], "Must return readings in timestamp order")
+        self.assertEqual(test_readings[0].get_status(), self.reading_update.get_status(), "Must return the updated reading")
+
+    def test_get_stats_success(self):
+        """ 080A - Aggregates readings per hour bucket """
+
+        stats = self.reading_manager.get_stats("hour")
+        self.assertEqual([bucket["count"] for bucket in stats], [1, 2], "Must group readings by hour")
+        self.assertEqual([bucket["error_count"] for bucket in stats], [0, 2], "Must count error readings")
+        self.assertEqual(stats[1]["max"], 100.0, "Must return the max of the bucket")
+        self.assertEqual(stats[1]["range"], stats[1]["max"] - stats[1]["min"], "Must return the range of the bucket")
+
+    def test_get_stats_cache_invalidated_success(self):
+        """ 080B - Recomputes a cached bucket after one of its readings changes """
+
+        self.reading_manager.get_stats("hour")
+        self.reading_manager.delete_reading(1)
+        self.assertEqual([bucket["count"] for bucket in self.reading_manager.get_stats("hour")], [2], "Must not return stale buckets")
+
+    def test_get_stats_fail(self):
+        """ 080C - Raises ValueError for an unknown bucket size """
+
+        with self.assertRaises(ValueError):
+            self.reading_manager.get_stats("week")
+
+    def test_get_error_readings_success(self):
+        """ 090A - Gets the error readings in timestamp order, optionally of one status """
+
+        test_readings = self.reading_manager.get_error_readings()
+        self.assertEqual([r.get_sequence_num() for r in test_readings], [2, 3], "Must return only error readings")
+        self.assertEqual([r.get_sequence_num() for r in self.reading_manager.get_error_readings(status="LOW_TEMP")], [3], "Must filter by status")
+        start = datetime.datetime.strptime("2018-09-23 20:01:00.000", "%Y-%m-%d %H:%M:%S.%f")
+        self.assertEqual([r.get_sequence_num() for r in self.reading_manager.get_error_readings(start)], [3], "Must filter by time")
+        self.assertEqual(self.reading_manager.get_error_readings(status="OK"), [], "Must not return readings without an error")
+
+    def test_get_error_readings_changes_success(self):
+        """ 090B - Keeps the error index up to date after adds, updates and deletes """
+
+        self.reading_manager.get_error_readings()
+        self.reading_manager.delete_reading(2)
+        self.reading_manager.update_reading(self.reading_update)
+        self.reading_manager.add_reading(self.reading)
+        test_readings = self.reading_manager.get_error_readings()
+        self.assertEqual([r.get_sequence_num() for r in test_readings], [1, 3], "Must return the current error readings in timestamp order")
+        self.assertEqual(test_readings[0].get_status(), self.reading_update.get_status(), "Must return the updated reading")
+
+    def test_get_version_success(self):
+        """ 100A - Moves to a new version on every add, update and delete, and never reuses one """
+
+        versions = [self.reading_manager.get_version()]
+        self.reading_manager.get_all_readings()
+        self.assertEqual(self.reading_manager.get_version(), versions[0], "Must keep the version while nothing changes")
+
+        for change in (lambda: self.reading_manager.add_reading(self.reading),
+                       lambda: self.reading_manager.update_reading(self.reading_update),
+                       lambda: self.reading_manager.delete_reading(2)):
+            change()
+            versions.append(self.reading_manager.get_version())
+        self.assertEqual(len(set(versions)), 4, "Must change the version with the readings")
+
+        self.setUp()
+        self.assertNotIn(self.reading_manager.get_version(), versions, "Must not repeat the version of another manager")
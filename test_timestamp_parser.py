@@ -0,0 +1,65 @@
+from managers.timestamp_parser import TimestampParser
+from unittest import TestCase
+import datetime
+import inspect
+
+class TestTimestampParser(TestCase):
+    """ Unit Tests for the TimestampParser Class """
+
+    TEST_MINUTE_VALUES = ["2018-09-23 19:56", "2018-9-23 19:56", "2018-09-23 19:5", "2018-13-23 19:56",
+                          "2018-09-23T19:56", "2018-09-23 19:56:01", "２018-09-23 19:56", "", "garbage"]
+    TEST_MICROSECOND_VALUES = ["2018-09-23 19:56:01.345", "2018-09-23 19:56:01.345000", "2018-09-23 19:56:01.3",
+                               "2018-09-23 19:56:01", "2018-09-23 19:56:01.1234567", "2018-09-23 19:56:61.345",
+                               "2018-09-23 1:56:01.345", "2018-02-30 19:56:01.345", ""]
+
+    def logPoint(self):
+        """ Display test specific information """
+
+        currentTest = self.id().split('.')[-1]
+        callingFunction = inspect.stack()[1][3]
+        print('in %s - %s()' % (currentTest, callingFunction))
+
+    def setUp(self):
+        """ Creates fixtures before each test """
+
+        self.logPoint()
+
+    def tearDown(self):
+        """ Create a test fixture after each test method is run """
+
+        self.logPoint()
+
+    def _assert_same_as_strptime(self, parser, values):
+        """ Asserts the parser returns or raises exactly what strptime does for every value """
+
+        for value in values:
+            try:
+                expected = datetime.datetime.strptime(value, parser.get_format())
+            except ValueError:
+                with self.assertRaises(ValueError, msg=value):
+                    parser.parse(value)
+            else:
+                self.assertEqual(parser.parse(value), expected, "Must parse %s like strptime" % value)
+
+    def test_parse_minutes_success(self):
+        """ 010A - Parses minute timestamps like strptime """
+
+        self._assert_same_as_strptime(TimestampParser(TimestampParser.MINUTE_FORMAT), TestTimestampParser.TEST_MINUTE_VALUES)
+
+    def test_parse_microseconds_success(self):
+        """ 010B - Parses microsecond timestamps like strptime """
+
+        self._assert_same_as_strptime(TimestampParser(TimestampParser.MICROSECOND_FORMAT), TestTimestampParser.TEST_MICROSECOND_VALUES)
+
+    def test_parse_cached_success(self):
+        """ 020A - Returns cached timestamps and still rejects invalid ones """
+
+        parser = TimestampParser(TimestampParser.MINUTE_FORMAT, use_cache=True)
+        self.assertIs(parser.parse("2018-09-23 19:56"), parser.parse("2018-09-23 19:56"), "Must reuse the cached timestamp")
+        self._assert_same_as_strptime(parser, TestTimestampParser.TEST_MINUTE_VALUES)
+
+    def test_parse_other_format_success(self):
+        """ 030A - Falls back to strptime for other formats """
+
+        parser = TimestampParser("%d/%m/%Y")
+        self.assertEqual(parser.parse("23/09/2018"), datetime.datetime(2018, 9, 23), "Must parse other formats")